@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Add-on NVDA - Module d'application du service ProtonVPN
+Fichier: protonvpn_backend.py
+
+ProtonVPNService.exe est le service en arrière-plan de ProtonVPN : il n'a pas
+d'interface. Ce module vide lui est associé (voir globalPlugins/protonvpn_bridge.py)
+pour que NVDA n'y charge pas le module de l'interface graphique.
+"""
+
+import appModuleHandler
+
+
+class AppModule(appModuleHandler.AppModule):
+    """Module d'application sans effet pour le service ProtonVPN."""
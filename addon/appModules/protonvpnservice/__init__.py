@@ -0,0 +1,659 @@
+# -*- coding: utf-8 -*-
+"""
+Add-on NVDA - Module d'application ProtonVPN
+Fichier: protonvpnservice/__init__.py
+Version: 1.0.0
+
+Améliore l'accessibilité de ProtonVPN avec :
+- Extraction des valeurs dynamiques via UIA (IP, Pays, Fournisseur)
+- Labellisation intelligente par position/siblings
+- Bouton VPN Plus promo avec texte marketing accessible
+- Pas d'OCR requis - utilise uniquement l'arbre UIA
+
+Ce fichier n'est qu'un point d'entrée : seuls config, diagnostics et instrumentation sont
+importés avec lui ; détecteurs, extracteurs, overlays, parcours et outils d'inspection
+sont des sous-modules importés au premier usage.
+- config          : constantes ajustables
+- diagnostics     : journal de diagnostic et mode débogage
+- instrumentation : mesure des latences
+- traversal       : parcours d'arbre borné (profondeur, nombre de noeuds, échéance)
+- breaker         : chronométrage des appels UIA et disjoncteur (ProtonVPN bloqué)
+- uiautils        : accès UIA, ancêtres, instantanés de sous-arbre
+- detectors       : détection des boutons à labelliser
+- extractors      : extraction des valeurs et textes
+- keywords        : mots-clés de l'interface par langue (automate de recherche)
+- textclassifier  : étiquetage des textes en une passe (IP, débit, volume, libellés)
+- widgets         : registre des widgets de la colonne droite et de leur état
+- overlays        : classes overlay
+- classification  : table de règles compilée et cache de la classe overlay
+- events          : événements UIA
+- search          : recherche native UIA (conditions, FindFirst / FindAll)
+- scanning        : thread de parcours et index des AutomationId
+- windowscan      : passe unique sur la fenêtre (collecteurs, instantané partagé)
+- warmup          : préchauffage des caches au retour dans ProtonVPN
+- live            : ConnectionDetailsPage et confirmation de connexion
+- throughput      : série temporelle du débit
+- debugtools      : inspection et instantanés de l'arbre
+- paths           : chemins des fichiers produits
+
+RACCOURCIS (dans ProtonVPN uniquement):
+- Ctrl+Shift+I : Inspecter le contrôle (infos basiques)
+- Ctrl+Shift+U : Sauvegarder dans uiainfo.txt
+- Ctrl+Shift+J : Debug étendu (parents, siblings, descendants Text)
+- Ctrl+Shift+L : Lire le texte long (description) du bouton VPN Plus
+"""
+
+import time
+
+_import_start = time.perf_counter()
+
+# ============================================================================
+# IMPORTS
+# ============================================================================
+import sys
+
+import appModuleHandler
+import api
+import ui
+from logHandler import log
+
+try:
+    import addonHandler
+    addonHandler.initTranslation()
+except Exception as e:
+    log.error(f"PROTONVPN: addonHandler error: {e}")
+
+from . import config
+from .diagnostics import diag, is_debug_mode, load_debug_mode, load_setting, save_setting, set_debug_mode
+from .instrumentation import first_gesture, instrumented, latency
+
+
+def _loaded(name):
+    """Retourne le sous-module `name` s'il a déjà été importé, sinon None (sans l'importer)."""
+    return sys.modules.get(f"{__name__}.{name}")
+
+
+# ============================================================================
+# CLASSE APPMODULE
+# ============================================================================
+
+class AppModule(appModuleHandler.AppModule):
+    """Module d'application NVDA pour ProtonVPN."""
+
+    _structure_subscription = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        debug = load_debug_mode()
+        self._watchdog_enabled = bool(load_setting("connectionWatchdog", config.CONNECTION_WATCHDOG_ENABLED))
+        log.info(f"PROTONVPN: AppModule v1.0.0 loaded (debug mode = {debug})")
+        diag.debug("import", "protonvpnservice imported in %.1f ms", _import_ms)
+        if debug:
+            ui.message("Add-on ProtonVPN actif")
+
+    @instrumented("chooseNVDAObjectOverlayClasses")
+    def chooseNVDAObjectOverlayClasses(self, obj, clsList):
+        """Choisit les classes overlay appropriées (mémorisées par RuntimeId)."""
+        try:
+            from . import classification
+            overlay = classification.get_overlay_class(obj)
+            if overlay is not None:
+                clsList.insert(0, overlay)
+        except Exception as e:
+            log.error(f"PROTONVPN: chooseNVDAObjectOverlayClasses error: {e}")
+
+        super().chooseNVDAObjectOverlayClasses(obj, clsList)
+
+    def getScript(self, gesture):
+        """Tout appui de touche interrompt le préchauffage ; le premier script après gainFocus est chronométré."""
+        script = super().getScript(gesture)
+        warmup = _loaded("warmup")
+        if script is not None:
+            first_gesture.on_gesture(warmup.cache_warmup.state if warmup else "cold")
+        if warmup:
+            warmup.cache_warmup.cancel()
+        return script
+
+    # ========================================================================
+    # EVENEMENTS
+    # ========================================================================
+
+    def event_appModule_gainFocus(self):
+        """
+        Abonne la fenêtre ProtonVPN aux événements StructureChanged, démarre l'échantillonnage
+        du débit et la surveillance de la connexion, et programme le préchauffage des caches.
+        """
+        self._register_structure_events()
+        from .throughput import throughput_sampler
+        throughput_sampler.start(self)
+        if self._watchdog_enabled:
+            fg = api.getForegroundObject()
+            window_handle = getattr(fg, 'windowHandle', None) if fg else None
+            from .live import connection_watchdog
+            if connection_watchdog.enabled:
+                # Surveillance en cours : sondage avancé seulement si la fenêtre a changé
+                connection_watchdog.set_window(window_handle)
+            else:
+                connection_watchdog.start(window_handle)
+        first_gesture.arm()
+        if config.WARMUP_ENABLED:
+            from .warmup import cache_warmup
+            cache_warmup.schedule()
+
+    def event_appModule_loseFocus(self):
+        """
+        Vide le cache des valeurs extraites, arrête l'échantillonnage du débit (la série est
+        conservée), détache le modèle de ConnectionDetailsPage et retire le handler
+        StructureChanged de la fenêtre : ils reprennent au retour dans ProtonVPN.
+        """
+        warmup = _loaded("warmup")
+        if warmup:
+            warmup.cache_warmup.reset()
+        throughput = _loaded("throughput")
+        if throughput:
+            throughput.throughput_sampler.stop()
+        live = _loaded("live")
+        if live:
+            live.connection_details.detach()
+        # Plus d'écoute hors de ProtonVPN : caches invalidés au réabonnement du prochain gainFocus
+        self._unregister_structure_events()
+        overlays = _loaded("overlays")
+        if overlays:
+            diag.debug("events", "loseFocus: %s", overlays.overlay_text_cache.format_stats().strip())
+            overlays.overlay_text_cache.clear()
+
+    def event_nameChange(self, obj, nextHandler):
+        """Invalide les caches de l'élément dont le nom a changé."""
+        from .events import uia_events
+        from .uiautils import get_runtime_id
+        runtime_id = get_runtime_id(obj)
+        if runtime_id is not None:
+            uia_events.notify_name_changed(runtime_id)
+        nextHandler()
+
+    def event_stateChange(self, obj, nextHandler):
+        """Marque l'état du widget concerné à relire (TogglePattern)."""
+        from .events import uia_events
+        from .uiautils import get_runtime_id
+        runtime_id = get_runtime_id(obj)
+        if runtime_id is not None:
+            uia_events.notify_state_changed(runtime_id)
+        nextHandler()
+
+    def _register_structure_events(self):
+        """
+        Abonne la fenêtre au premier plan aux événements StructureChanged (une fois par fenêtre),
+        depuis le thread de fond (voir events.UIAEventSubscription).
+        """
+        try:
+            fg = api.getForegroundObject()
+            window_handle = getattr(fg, 'windowHandle', None) if fg else None
+            if not window_handle:
+                return
+            subscription = self._structure_subscription
+            if subscription is not None and subscription.window_handle == window_handle:
+                return
+            self._unregister_structure_events()
+            from .events import UIAEventSubscription, uia_events
+            subscription = UIAEventSubscription(window_handle)
+            subscription.add_structure_handler(uia_events.notify_structure_changed)
+            self._structure_subscription = subscription
+
+            def on_subscribed(added):
+                if added:
+                    # La fenêtre a pu changer pendant que nous n'écoutions pas
+                    uia_events.notify_structure_changed(None)
+                    diag.debug("events", "StructureChanged handler registered")
+
+            subscription.subscribe(on_subscribed)
+        except Exception as e:
+            log.error(f"PROTONVPN: _register_structure_events error: {e}")
+
+    def _unregister_structure_events(self):
+        """Retire le handler StructureChanged s'il est enregistré (depuis le thread de fond)."""
+        subscription = self._structure_subscription
+        if subscription is None:
+            return
+        self._structure_subscription = None
+        try:
+            subscription.unsubscribe()
+        except Exception as e:
+            log.error(f"PROTONVPN: _unregister_structure_events error: {e}")
+
+    def terminate(self):
+        self._unregister_structure_events()
+        warmup = _loaded("warmup")
+        if warmup:
+            warmup.cache_warmup.reset()
+        # Seuls les sous-modules déjà chargés ont un état à nettoyer
+        classification = _loaded("classification")
+        if classification:
+            classification.classification_cache.clear()
+        throughput = _loaded("throughput")
+        if throughput:
+            throughput.throughput_sampler.stop()
+        overlays = _loaded("overlays")
+        if overlays:
+            overlays.overlay_text_cache.clear()
+        uiautils = _loaded("uiautils")
+        if uiautils:
+            uiautils.sibling_index.clear()
+        live = _loaded("live")
+        if live:
+            live.vpn_state_waiter.cancel()
+            live.connection_details.detach()
+            live.connection_watchdog.stop()
+        scanning = _loaded("scanning")
+        if scanning:
+            scanning.automation_id_index.clear()
+            scanning.scan_worker.stop()
+        widgets = _loaded("widgets")
+        if widgets:
+            widgets.widget_registry.clear()
+        windowscan = _loaded("windowscan")
+        if windowscan:
+            windowscan.window_scanner.clear()
+        breaker = _loaded("breaker")
+        if breaker:
+            breaker.uia_breaker.stop()
+        super().terminate()
+
+    # ========================================================================
+    # SCRIPTS - ACTIONS VPN
+    # ========================================================================
+    
+    def _invoke_element(self, obj):
+        """Invoque un élément (clic/appui Entrée)."""
+        try:
+            if hasattr(obj, 'UIAElement') and obj.UIAElement:
+                # Essayer InvokePattern
+                try:
+                    import UIAHandler
+                    pattern = obj.UIAElement.GetCurrentPattern(UIAHandler.UIA_InvokePatternId)
+                    if pattern:
+                        pattern.QueryInterface(UIAHandler.IUIAutomationInvokePattern).Invoke()
+                        return True
+                except:
+                    pass
+            
+            # Fallback: doAction
+            try:
+                obj.doAction()
+                return True
+            except:
+                pass
+            
+            # Fallback: focus + Enter
+            try:
+                obj.setFocus()
+                import time
+                time.sleep(0.1)
+                import winUser
+                winUser.sendMessage(obj.windowHandle, 0x0100, 0x0D, 0)  # WM_KEYDOWN VK_RETURN
+                winUser.sendMessage(obj.windowHandle, 0x0101, 0x0D, 0)  # WM_KEYUP VK_RETURN
+                return True
+            except:
+                pass
+            
+            return False
+        except Exception as e:
+            log.error(f"PROTONVPN: _invoke_element error: {e}")
+            return False
+    
+    @instrumented("script_toggleVPN")
+    def script_toggleVPN(self, gesture):
+        """Connecter ou déconnecter le VPN."""
+        diag.info("scripts.toggleVPN", "script_toggleVPN triggered!")
+        from .scanning import scan_worker
+        from .windowscan import window_scanner
+        scan_worker.cancel()
+        window_scanner.request(self._toggle_vpn_from_snapshot)
+    
+    def _toggle_vpn_from_snapshot(self, snapshot):
+        # Bouton Déconnecter (VPN connecté) ou Connecter, par AutomationId ou à défaut par Name
+        result = snapshot.get("connect_button") if snapshot else None
+        if not result:
+            ui.message("Bouton connexion introuvable")
+            log.error("PROTONVPN: Neither Connect nor Disconnect button found")
+            return
+        ref, is_disconnecting = result
+        try:
+            btn = snapshot.get_object(ref)
+        except Exception as e:
+            log.error(f"PROTONVPN: connect button resolve error: {e}")
+            btn = None
+        if btn is None:
+            ui.message("Action indisponible")
+            return
+        self._toggle_vpn(btn, is_disconnecting)
+    
+    def _toggle_vpn(self, btn, is_disconnecting):
+        # Annoncer immédiatement l'action
+        if is_disconnecting:
+            ui.message("Déconnexion")
+            diag.info("scripts.toggleVPN", "Disconnecting VPN...")
+        else:
+            ui.message("Connexion")
+            diag.info("scripts.toggleVPN", "Connecting VPN...")
+        
+        # Invoquer le bouton
+        if self._invoke_element(btn):
+            diag.info("scripts.toggleVPN", "Button invoked successfully")
+            # Confirmer dès que le bouton opposé apparaît (événements UIA)
+            try:
+                from .live import vpn_state_waiter
+                vpn_state_waiter.start(is_disconnecting)
+            except Exception as e:
+                log.error(f"PROTONVPN: vpn_state_waiter error: {e}")
+        else:
+            ui.message("Action indisponible")
+    
+    script_toggleVPN.__doc__ = "Connecter ou déconnecter le VPN (toggle)"
+    script_toggleVPN.category = "ProtonVPN"
+    
+    @instrumented("script_toggleKillSwitch")
+    def script_toggleKillSwitch(self, gesture):
+        """Activer ou désactiver le Kill Switch."""
+        diag.info("scripts.toggleKillSwitch", "script_toggleKillSwitch triggered!")
+        from .widgets import KILL_SWITCH, widget_registry
+        widget_registry.request(lambda: self._toggle_widget(KILL_SWITCH))
+    
+    def _toggle_widget(self, key):
+        try:
+            from .widgets import WIDGET_LABELS, widget_registry
+            info = widget_registry.get(key)
+            if info is None:
+                ui.message(f"{WIDGET_LABELS[key]} introuvable")
+                return
+            ui.message(info.label)
+            # Le nouvel état est annoncé à l'arrivée de l'événement StateChanged / NameChanged
+            widget_registry.announce_next_change(key)
+            if self._invoke_element(info.obj):
+                diag.info("scripts.toggleWidget", "%s toggled (was %s)", key, info.state)
+            else:
+                widget_registry.stale = True
+                ui.message("Action indisponible")
+        except Exception as e:
+            log.error(f"PROTONVPN: _toggle_widget error: {e}")
+            ui.message("Action indisponible")
+    
+    script_toggleKillSwitch.__doc__ = "Activer ou désactiver le Kill Switch"
+    script_toggleKillSwitch.category = "ProtonVPN"
+    
+    @instrumented("script_announceWidgets")
+    def script_announceWidgets(self, gesture):
+        """Annoncer l'état des widgets (NetShield, Kill Switch, Split tunneling, Redirection de port)."""
+        diag.info("scripts.announceWidgets", "script_announceWidgets triggered!")
+        from .widgets import widget_registry
+        widget_registry.request(self._announce_widgets)
+    
+    def _announce_widgets(self):
+        try:
+            from .widgets import widget_registry
+            widgets = widget_registry.all()
+            if widgets:
+                ui.message(". ".join(info.describe_state() for info in widgets))
+            else:
+                ui.message("Widgets introuvables")
+        except Exception as e:
+            log.error(f"PROTONVPN: script_announceWidgets error: {e}")
+            ui.message("Action indisponible")
+    
+    script_announceWidgets.__doc__ = "Annoncer l'état des widgets NetShield, Kill Switch, Split tunneling et Redirection de port"
+    script_announceWidgets.category = "ProtonVPN"
+    
+    @instrumented("script_openCountrySelector")
+    def script_openCountrySelector(self, gesture):
+        """Ouvrir le sélecteur de pays."""
+        diag.info("scripts.openCountrySelector", "script_openCountrySelector triggered!")
+        from .scanning import scan_worker
+        from .windowscan import window_scanner
+        scan_worker.cancel()
+        window_scanner.request(self._open_country_selector_from_snapshot)
+    
+    def _open_country_selector_from_snapshot(self, snapshot):
+        # Boutons sous LocationDetailsPage (collecteur "location_buttons")
+        location_btns = snapshot.get("location_buttons") if snapshot else None
+        try:
+            # Le bouton Pays est généralement le 2ème (index 1)
+            if location_btns and len(location_btns) >= 2:
+                country_btn = snapshot.get_object(location_btns[1])
+                ui.message("Sélecteur de pays")
+                if country_btn is not None and self._invoke_element(country_btn):
+                    diag.info("scripts.openCountrySelector", "Country selector opened")
+                else:
+                    ui.message("Action indisponible")
+            else:
+                ui.message("Sélecteur de pays introuvable")
+        except Exception as e:
+            log.error(f"PROTONVPN: script_openCountrySelector error: {e}")
+            ui.message("Action indisponible")
+    
+    script_openCountrySelector.__doc__ = "Ouvrir le sélecteur de pays"
+    script_openCountrySelector.category = "ProtonVPN"
+    
+    @instrumented("script_announceTraffic")
+    def script_announceTraffic(self, gesture):
+        """Annoncer les informations de trafic."""
+        diag.info("scripts.announceTraffic", "script_announceTraffic triggered!")
+        from .live import connection_details
+        if connection_details.attached:
+            # Modèle déjà abonné aux événements de la page : lecture en mémoire, sans index
+            self._announce_traffic_from_model(attach=False)
+            return
+        from .scanning import automation_id_index, scan_worker
+        scan_worker.cancel()
+        automation_id_index.refresh_async(self._announce_traffic_from_model)
+    
+    def _announce_traffic_from_model(self, attach=True):
+        try:
+            # Valeurs tenues à jour par les événements UIA de ConnectionDetailsPage
+            from .live import connection_details
+            if attach:
+                connection_details.attach()
+            traffic_info = []
+            for field in ("total_traffic", "current_throughput"):
+                entry = connection_details.get(field)
+                if entry and entry.values:
+                    traffic_info.append(entry.as_text())
+            
+            if traffic_info:
+                message = ". ".join(traffic_info)
+                ui.message(message)
+                diag.info("scripts.announceTraffic", "Traffic announced: %s", message)
+            else:
+                ui.message("Informations de trafic indisponibles. VPN non connecté?")
+        except Exception as e:
+            log.error(f"PROTONVPN: script_announceTraffic error: {e}")
+            ui.message("Action indisponible")
+    
+    script_announceTraffic.__doc__ = "Annoncer les informations de trafic"
+    script_announceTraffic.category = "ProtonVPN"
+    
+    @instrumented("script_announceThroughputStats")
+    def script_announceThroughputStats(self, gesture):
+        """Annoncer le débit actuel, moyen et maximal."""
+        diag.info("scripts.announceThroughputStats", "script_announceThroughputStats triggered!")
+        
+        from .live import connection_details
+        from .throughput import throughput_sampler
+        throughput_sampler.start(self)
+        if connection_details.attached:
+            self._announce_throughput_stats(attach=False)
+            return
+        from .scanning import automation_id_index, scan_worker
+        scan_worker.cancel()
+        automation_id_index.refresh_async(self._announce_throughput_stats)
+
+    def _announce_throughput_stats(self, attach=True):
+        try:
+            from .live import connection_details
+            from .throughput import format_throughput, throughput_sampler, throughput_series
+            if attach:
+                connection_details.attach()
+            if not len(throughput_series):
+                throughput_sampler.sample()
+            current = throughput_series.latest()
+            if current is None:
+                ui.message("Débit indisponible. VPN non connecté?")
+                return
+            span = config.THROUGHPUT_WINDOWS_S[1]
+            mean, peak, _p95 = throughput_series.stats(span)
+            minutes = span // 60
+            message = (
+                f"Débit actuel {format_throughput(current)}. "
+                f"Moyenne {minutes} minutes {format_throughput(mean)}. "
+                f"Pic {minutes} minutes {format_throughput(peak)}"
+            )
+            ui.message(message)
+        except Exception as e:
+            log.error(f"PROTONVPN: script_announceThroughputStats error: {e}")
+            ui.message("Action indisponible")
+    
+    script_announceThroughputStats.__doc__ = "Annoncer le débit actuel, moyen et maximal"
+    script_announceThroughputStats.category = "ProtonVPN"
+
+    @instrumented("script_saveTreeSnapshot")
+    def script_saveTreeSnapshot(self, gesture):
+        """Enregistrer l'arbre UIA de la fenêtre ProtonVPN dans un fichier JSON."""
+        diag.info("scripts.saveTreeSnapshot", "script_saveTreeSnapshot triggered!")
+        
+        try:
+            import json
+            from .debugtools import capture_uia_tree_snapshot
+            from .paths import get_uia_snapshot_file_path
+            fg = api.getForegroundObject()
+            snapshot = capture_uia_tree_snapshot(fg) if fg else None
+            if not snapshot:
+                ui.message("Capture de l'arbre UIA indisponible")
+                return
+            path = get_uia_snapshot_file_path()
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=1)
+            ui.message("Arbre UIA enregistré")
+            diag.info("scripts.saveTreeSnapshot", "UIA tree snapshot saved to %s", path)
+        except Exception as e:
+            log.error(f"PROTONVPN: script_saveTreeSnapshot error: {e}")
+            ui.message("Action indisponible")
+    
+    script_saveTreeSnapshot.__doc__ = "Enregistrer l'arbre UIA de la fenêtre (instantané JSON pour les benchmarks)"
+    script_saveTreeSnapshot.category = "ProtonVPN"
+
+    def script_toggleLatencyInstrumentation(self, gesture):
+        """Activer ou désactiver la mesure des latences de l'add-on."""
+        latency.enabled = not latency.enabled
+        if latency.enabled:
+            latency.reset()
+            overlays = _loaded("overlays")
+            if overlays:
+                overlays.overlay_text_cache.reset_stats()
+            ui.message("Mesure des latences activée")
+        else:
+            ui.message("Mesure des latences désactivée")
+    
+    script_toggleLatencyInstrumentation.__doc__ = "Activer ou désactiver la mesure des latences de l'add-on"
+    script_toggleLatencyInstrumentation.category = "ProtonVPN"
+    
+    def script_reportLatency(self, gesture):
+        """Annoncer un résumé des latences et l'enregistrer dans un fichier."""
+        rows = latency.summary()
+        if not rows:
+            ui.message("Aucune latence mesurée" if latency.enabled else "Mesure des latences désactivée")
+            return
+        key, count, mean, p50, p95, p99, maximum = rows[0]
+        message = (
+            f"{len(rows)} fonctions mesurées. Plus lente : {key}, "
+            f"{count} appels, p95 {p95 * 1000:.1f} millisecondes, p99 {p99 * 1000:.1f} millisecondes"
+        )
+        try:
+            from .paths import get_latency_report_file_path
+            path = get_latency_report_file_path()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(latency.format_summary())
+                overlays = _loaded("overlays")
+                if overlays:
+                    f.write("\n" + overlays.overlay_text_cache.format_stats())
+                traversal = _loaded("traversal")
+                if traversal:
+                    f.write("\n" + traversal.traversal_stats.format_stats())
+                breaker = _loaded("breaker")
+                if breaker:
+                    f.write("\n" + breaker.uia_breaker.format_stats())
+            diag.info("scripts.reportLatency", "Latency report saved to %s", path)
+            message += ". Rapport enregistré"
+        except Exception as e:
+            log.error(f"PROTONVPN: script_reportLatency error: {e}")
+        ui.message(message)
+    
+    script_reportLatency.__doc__ = "Annoncer et enregistrer le résumé des latences de l'add-on"
+    script_reportLatency.category = "ProtonVPN"
+
+    def script_toggleConnectionWatchdog(self, gesture):
+        """Activer ou désactiver la surveillance de la connexion (réglage enregistré)."""
+        from .live import connection_watchdog
+        self._watchdog_enabled = not self._watchdog_enabled
+        save_setting("connectionWatchdog", self._watchdog_enabled)
+        if self._watchdog_enabled:
+            fg = api.getForegroundObject()
+            connection_watchdog.start(getattr(fg, 'windowHandle', None) if fg else None)
+            ui.message("Surveillance de la connexion activée")
+        else:
+            connection_watchdog.stop()
+            ui.message("Surveillance de la connexion désactivée")
+
+    script_toggleConnectionWatchdog.__doc__ = "Activer ou désactiver l'annonce des coupures et changements de connexion VPN"
+    script_toggleConnectionWatchdog.category = "ProtonVPN"
+
+    # ========================================================================
+    # SCRIPTS - DIAGNOSTIC
+    # ========================================================================
+
+    def script_toggleDebugMode(self, gesture):
+        """Activer ou désactiver le mode débogage de l'add-on (réglage enregistré)."""
+        enabled = not is_debug_mode()
+        set_debug_mode(enabled)
+        ui.message("Mode débogage activé" if enabled else "Mode débogage désactivé")
+
+    script_toggleDebugMode.__doc__ = "Activer ou désactiver le mode débogage de l'add-on"
+    script_toggleDebugMode.category = "ProtonVPN"
+
+    def script_dumpDiagnostics(self, gesture):
+        """Enregistrer les derniers événements de diagnostic dans un fichier."""
+        events = diag.events()
+        if not events:
+            ui.message("Aucun événement de diagnostic")
+            return
+        try:
+            from .paths import get_diagnostics_file_path
+            path = get_diagnostics_file_path()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(diag.format_events())
+            log.info(f"PROTONVPN: Diagnostics saved to {path}")
+            ui.message(f"{len(events)} événements de diagnostic enregistrés")
+        except Exception as e:
+            log.error(f"PROTONVPN: script_dumpDiagnostics error: {e}")
+            ui.message("Action indisponible")
+
+    script_dumpDiagnostics.__doc__ = "Enregistrer les derniers événements de diagnostic de l'add-on dans un fichier"
+    script_dumpDiagnostics.category = "ProtonVPN"
+
+    # ========================================================================
+    # RACCOURCIS
+    # ========================================================================
+    __gestures = {
+        "kb:control+shift+d": "toggleVPN",
+        "kb:control+shift+k": "toggleKillSwitch",
+        "kb:control+shift+w": "announceWidgets",
+        "kb:control+shift+c": "openCountrySelector",
+        "kb:control+shift+t": "announceTraffic",
+        "kb:control+shift+r": "announceThroughputStats",
+        "kb:control+shift+alt+w": "toggleConnectionWatchdog",
+        "kb:control+shift+alt+u": "saveTreeSnapshot",
+        "kb:control+shift+alt+m": "toggleLatencyInstrumentation",
+        "kb:control+shift+alt+p": "reportLatency",
+        "kb:control+shift+alt+d": "toggleDebugMode",
+        "kb:control+shift+alt+l": "dumpDiagnostics",
+    }
+
+
+_import_ms = (time.perf_counter() - _import_start) * 1000
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Surveillance des appels UIA inter-processus et disjoncteur.
+
+Quand ProtonVPN.Client.exe ne répond plus (reconnexion, mise à jour), chaque lecture de
+propriété UIA bloque le thread appelant, et le thread principal de NVDA avec elle. Les
+appels de l'add-on sont chronométrés (`with uia_breaker.timed(clé)`) :
+
+- un appel plus long que UIA_HANG_THRESHOLD_MS, ou UIA_SLOW_CALLS_TO_TRIP appels lents
+  consécutifs (UIA_SLOW_CALL_MS), ouvrent le disjoncteur ;
+- un thread de surveillance, réveillé seulement pendant les appels, l'ouvre dès qu'un appel
+  en cours dépasse UIA_HANG_THRESHOLD_MS, sans attendre son retour (p.ex. passe de fond
+  bloquée : le thread principal n'émet plus d'appels pendant ce temps).
+
+Disjoncteur ouvert, pendant UIA_BREAKER_COOLDOWN_S : aucun nouvel appel UIA (les accesseurs
+rendent leur valeur vide, les overlays leur nom en cache ou le nom d'origine). À l'issue du
+délai, le disjoncteur se referme et le prochain appel lent le rouvre.
+"""
+
+import threading
+import time
+
+from . import config
+from .diagnostics import diag
+
+
+class _TimedCall:
+    """Contexte d'un appel chronométré (voir UIACircuitBreaker.timed)."""
+
+    __slots__ = ("breaker", "key", "bulk", "start", "reported", "nested")
+
+    def __init__(self, breaker, key, bulk):
+        self.breaker = breaker
+        self.key = key
+        self.bulk = bulk
+        # Signalé bloqué par la surveillance (sa durée finale est journalisée à son retour)
+        self.reported = False
+        # Des appels chronométrés ont eu lieu pendant celui-ci (jugés à sa place)
+        self.nested = False
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.breaker._begin(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.breaker._end(self, time.perf_counter() - self.start)
+        return False
+
+
+class UIACircuitBreaker:
+    """Chronométrage des appels UIA, détection d'un fournisseur bloqué et délai de refroidissement."""
+
+    def __init__(self):
+        # Protège l'état du disjoncteur, les compteurs d'appels lents et les appels en cours :
+        # modifiés par le thread principal, le thread de parcours et le thread de surveillance
+        self._lock = threading.RLock()
+        self._open_until = 0.0
+        self._opened_at = None
+        self._skipped_at_open = 0
+        self._slow_calls = 0
+        self._slow_ms = 0.0
+        # thread -> pile des appels en cours (appels imbriqués : le plus récent en dernier)
+        self._in_flight = {}
+        self._wake = threading.Event()
+        self._monitor = None
+        self._stopping = False
+        self.trips = 0
+        self.skipped = 0
+        self.last_trip = None
+
+    @property
+    def is_open(self):
+        """Vrai pendant le délai de refroidissement qui suit un déclenchement."""
+        if not self._open_until:
+            return False
+        with self._lock:
+            if not self._open_until:
+                return False
+            if time.monotonic() < self._open_until:
+                return True
+            self._close()
+            return False
+
+    def should_skip(self):
+        """Disjoncteur ouvert : l'appelant renonce à ses appels UIA (compté dans `skipped`)."""
+        if not self.is_open:
+            return False
+        with self._lock:
+            self.skipped += 1
+        return True
+
+    def timed(self, key, bulk=False):
+        """
+        Contexte chronométrant un appel UIA. bulk=True pour les appels dont la durée dépend de
+        la taille de l'arbre (BuildUpdatedCache d'un sous-arbre) : seul le seuil de blocage compte.
+        Les contextes peuvent s'imbriquer (pile par thread) : seuls les appels les plus imbriqués
+        sont jugés, l'appel englobant ne compte pas une seconde fois leur durée.
+        """
+        return _TimedCall(self, key, bulk)
+
+    def _begin(self, call):
+        with self._lock:
+            stack = self._in_flight.setdefault(threading.get_ident(), [])
+            if stack:
+                stack[-1].nested = True
+            stack.append(call)
+        if not self._wake.is_set():
+            self._ensure_monitor()
+            self._wake.set()
+
+    def _end(self, call, duration):
+        duration_ms = duration * 1000
+        thread_id = threading.get_ident()
+        with self._lock:
+            stack = self._in_flight.get(thread_id, [])
+            if call in stack:
+                stack.remove(call)
+            if not stack:
+                self._in_flight.pop(thread_id, None)
+            if call.reported:
+                diag.info("breaker.hung", "UIA call %s returned after %.0f ms", call.key, duration_ms)
+            elif call.nested:
+                # Appel englobant : ses appels imbriqués ont été jugés un par un
+                pass
+            elif duration_ms >= config.UIA_HANG_THRESHOLD_MS:
+                self._trip(call.key, duration_ms, "hang")
+            elif not call.bulk and duration_ms >= config.UIA_SLOW_CALL_MS:
+                self._slow_calls += 1
+                self._slow_ms += duration_ms
+                if self._slow_calls >= config.UIA_SLOW_CALLS_TO_TRIP:
+                    self._trip(call.key, duration_ms, f"{self._slow_calls} slow calls, {self._slow_ms:.0f} ms in total")
+            else:
+                self._slow_calls = 0
+                self._slow_ms = 0.0
+
+    def _trip(self, key, duration_ms, reason):
+        """Ouvre (ou prolonge) le disjoncteur ; appelé avec _lock."""
+        self._slow_calls = 0
+        self._slow_ms = 0.0
+        now = time.monotonic()
+        if not self._open_until:
+            self._opened_at = now
+            self._skipped_at_open = self.skipped
+            self.trips += 1
+        self._open_until = now + config.UIA_BREAKER_COOLDOWN_S
+        self.last_trip = (key, duration_ms, reason)
+        diag.warning("breaker.trip", "UIA circuit breaker tripped (%s): %s took %.0f ms, no UIA calls for %.0f s",
+                     reason, key, duration_ms, config.UIA_BREAKER_COOLDOWN_S)
+
+    def _close(self):
+        """Referme le disjoncteur à l'issue du délai ; appelé avec _lock."""
+        opened_s = time.monotonic() - self._opened_at if self._opened_at is not None else 0.0
+        self._open_until = 0.0
+        self._opened_at = None
+        diag.info("breaker.close", "UIA circuit breaker closed after %.1f s, %d calls skipped",
+                  opened_s, self.skipped - self._skipped_at_open)
+
+    # ========================================================================
+    # THREAD DE SURVEILLANCE
+    # ========================================================================
+
+    def _ensure_monitor(self):
+        if self._monitor is not None or self._stopping:
+            return
+        self._monitor = threading.Thread(target=self._run, name="ProtonVPN UIA hang monitor", daemon=True)
+        self._monitor.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait()
+            if self._stopping:
+                break
+            time.sleep(config.UIA_HANG_CHECK_INTERVAL_MS / 1000.0)
+            self.check_hung()
+            if not self._in_flight:
+                self._wake.clear()
+                # Appel commencé entre le test et clear() : rester éveillé
+                if self._in_flight:
+                    self._wake.set()
+
+    def check_hung(self):
+        """Ouvre le disjoncteur si un appel en cours (le plus imbriqué de chaque thread) dépasse UIA_HANG_THRESHOLD_MS."""
+        now = time.perf_counter()
+        with self._lock:
+            for stack in self._in_flight.values():
+                call = stack[-1]
+                elapsed_ms = (now - call.start) * 1000
+                if elapsed_ms >= config.UIA_HANG_THRESHOLD_MS and not call.reported:
+                    call.reported = True
+                    self._trip(call.key, elapsed_ms, "no response")
+
+    def reset(self):
+        """Referme le disjoncteur et oublie les appels lents (tests, terminate)."""
+        with self._lock:
+            self._open_until = 0.0
+            self._opened_at = None
+            self._slow_calls = 0
+            self._slow_ms = 0.0
+
+    def stop(self):
+        """Arrête le thread de surveillance (terminate)."""
+        self._stopping = True
+        self._wake.set()
+        if self._monitor is not None:
+            self._monitor.join(config.WORKER_START_TIMEOUT_S)
+            self._monitor = None
+        self._stopping = False
+        self._wake.clear()
+        self.reset()
+
+    def format_stats(self):
+        last = ""
+        if self.last_trip is not None:
+            key, duration_ms, reason = self.last_trip
+            last = f", last: {key} {duration_ms:.0f} ms ({reason})"
+        state = "open" if self.is_open else "closed"
+        return f"UIA circuit breaker: {state}, {self.trips} trips, {self.skipped} calls skipped{last}\n"
+
+
+uia_breaker = UIACircuitBreaker()
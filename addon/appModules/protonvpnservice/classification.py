@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Choix de la classe overlay d'un bouton, mémorisé par RuntimeId.
+
+Les règles sont déclarées dans OVERLAY_RULES (ordre = priorité) et compilées au chargement
+en un arbre de décision : rôle, FrameworkId et AutomationId sont lus une seule fois et
+sélectionnent les règles candidates ; nom, ancêtres et descendants Text sont lus au plus
+une fois, les descendants en dernier.
+"""
+
+from collections import OrderedDict
+
+import controlTypes
+from logHandler import log
+
+from . import config, keywords
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .events import uia_events
+from .keywords import scan_keywords
+from .overlays import (
+    ProtonVPNConnectButton,
+    ProtonVPNConnectionDetailsButton,
+    ProtonVPNGenericButton,
+    ProtonVPNLocationDetailsButton,
+    ProtonVPNOverlayPromoButton,
+    ProtonVPNPlusPromoButton,
+    ProtonVPNSideWidgetButton,
+    ProtonVPNWidgetButton,
+)
+from .uiautils import get_ancestry, get_automation_id, get_framework_id, get_runtime_id, get_text_descendants
+
+
+# ============================================================================
+# CACHE DE CLASSIFICATION
+# ============================================================================
+
+class OverlayClassificationCache:
+    """
+    Mémorise, par RuntimeId UIA, la classe overlay attribuée à un élément (ou None).
+    Taille bornée avec éviction LRU.
+    """
+
+    MISSING = object()
+
+    def __init__(self, max_size=config.CLASSIFICATION_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, runtime_id):
+        """Retourne la classe mémorisée (éventuellement None) ou MISSING."""
+        if runtime_id is None:
+            return self.MISSING
+        try:
+            cls = self._entries[runtime_id]
+        except KeyError:
+            return self.MISSING
+        self._entries.move_to_end(runtime_id)
+        return cls
+
+    def put(self, runtime_id, cls):
+        if runtime_id is None:
+            return
+        self._entries[runtime_id] = cls
+        self._entries.move_to_end(runtime_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, runtime_id):
+        self._entries.pop(runtime_id, None)
+
+    def clear(self, runtime_id=None):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+classification_cache = OverlayClassificationCache()
+# Un nom modifié ne change que la classification de l'élément lui-même ; une modification
+# de structure peut changer celle des ancêtres (descendants Text) et des descendants (parents).
+uia_events.add_name_listener(classification_cache.invalidate)
+uia_events.add_structure_listener(classification_cache.clear)
+
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+
+def get_overlay_class(obj):
+    """
+    Classe overlay de l'objet (ou None), mémorisée par RuntimeId.
+    Disjoncteur ouvert : classe mémorisée seulement, sinon aucun overlay (nom d'origine).
+    """
+    runtime_id = get_runtime_id(obj)
+    overlay = classification_cache.get(runtime_id)
+    if overlay is OverlayClassificationCache.MISSING:
+        if uia_breaker.should_skip():
+            return None
+        overlay = classify_overlay(obj)
+        # Classification faite sans réponse de ProtonVPN : non mémorisée
+        if not uia_breaker.is_open:
+            classification_cache.put(runtime_id, overlay)
+    return overlay
+
+
+# ============================================================================
+# REGLES DECLARATIVES
+# ============================================================================
+
+class OverlayRule:
+    """
+    Contraintes sur un objet -> classe overlay. Toutes les contraintes renseignées sont requises.
+
+    - role, framework_id : rôle NVDA et FrameworkId UIA
+    - automation_ids : AutomationId acceptés ("" = sans AutomationId) ; None = tous
+    - ancestor_automation_id : un des ancestor_levels premiers parents porte cet AutomationId
+    - ancestor_keyword : un des ancestor_levels premiers parents a un nom contenant un mot-clé
+      de ce concept (keywords, toutes langues chargées)
+    - descendant_keyword : les descendants Text (profondeur 5) contiennent un mot-clé de ce concept
+    - min_text_descendants : nombre minimum de descendants Text
+    - short_name : nom vide ou d'au plus 2 caractères
+    """
+
+    def __init__(self, overlay, role=controlTypes.Role.BUTTON, framework_id="XAML", automation_ids=None,
+                 ancestor_automation_id=None, ancestor_keyword=None, ancestor_levels=4,
+                 descendant_keyword=None, min_text_descendants=0, short_name=False):
+        self.overlay = overlay
+        self.role = role
+        self.framework_id = framework_id
+        self.automation_ids = frozenset(automation_ids) if automation_ids is not None else None
+        self.ancestor_automation_id = ancestor_automation_id
+        self.ancestor_keyword = ancestor_keyword
+        self.ancestor_levels = ancestor_levels
+        self.descendant_keyword = descendant_keyword
+        self.min_text_descendants = min_text_descendants
+        self.short_name = short_name
+
+    @property
+    def has_deferred_checks(self):
+        """Contraintes sur les descendants : évaluées après celles de toutes les règles prioritaires."""
+        return self.descendant_keyword is not None or self.min_text_descendants > 0
+
+    @property
+    def is_unconditional(self):
+        """Aucune contrainte au-delà de rôle, FrameworkId et AutomationId."""
+        return not (self.ancestor_automation_id or self.ancestor_keyword or self.short_name or self.has_deferred_checks)
+
+    def matches_early(self, context):
+        """Contraintes sur le nom et les ancêtres."""
+        if self.short_name and len(context.name.strip()) > 2:
+            return False
+        if self.ancestor_automation_id or self.ancestor_keyword:
+            ancestry = context.ancestry
+            if self.ancestor_automation_id and not ancestry.has_automation_id(self.ancestor_automation_id, self.ancestor_levels):
+                return False
+            if self.ancestor_keyword and not ancestry.has_name_keyword(self.ancestor_keyword, self.ancestor_levels):
+                return False
+        return True
+
+    def matches_deferred(self, context):
+        """Contraintes sur les descendants Text."""
+        if self.min_text_descendants and len(context.texts) < self.min_text_descendants:
+            return False
+        if self.descendant_keyword and self.descendant_keyword not in context.text_keywords:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"OverlayRule({self.overlay.__name__})"
+
+
+OVERLAY_RULES = (
+    # Bouton principal de connexion
+    OverlayRule(ProtonVPNConnectButton, automation_ids={"ConnectionCardConnectButton"}),
+    # Bouton VPN Plus promo : parent "gratuit" et descendant "VPN Plus"
+    OverlayRule(ProtonVPNPlusPromoButton, ancestor_keyword=keywords.FREE, ancestor_levels=6,
+                descendant_keyword=keywords.VPN_PLUS),
+    # Carte promo OverlayMessage
+    OverlayRule(ProtonVPNOverlayPromoButton, automation_ids={""}, ancestor_automation_id="OverlayMessage",
+                min_text_descendants=2),
+    # Boutons ConnectionDetailsPage (IP VPN, Trafic - VPN connecté)
+    OverlayRule(ProtonVPNConnectionDetailsButton, ancestor_automation_id="ConnectionDetailsPage"),
+    # Boutons LocationDetailsPage (IP/Pays/Fournisseur)
+    OverlayRule(ProtonVPNLocationDetailsButton, automation_ids={""}, ancestor_automation_id="LocationDetailsPage"),
+    # Widgets colonne droite
+    OverlayRule(ProtonVPNWidgetButton, automation_ids={"WidgetButton"}),
+    OverlayRule(ProtonVPNSideWidgetButton,
+                automation_ids={"PortForwardingWidgetButton", "SettingsButton", "TitleBarMenuButton"}),
+    # Fallback : boutons sans nom
+    OverlayRule(ProtonVPNGenericButton, short_name=True),
+)
+
+
+class _MatchContext:
+    """Propriétés de l'objet lues à la demande, au plus une fois par classification."""
+
+    __slots__ = ("obj", "ancestry_levels", "_name", "_ancestry", "_texts", "_text_keywords")
+
+    def __init__(self, obj, ancestry_levels):
+        self.obj = obj
+        self.ancestry_levels = ancestry_levels
+        self._name = None
+        self._ancestry = None
+        self._texts = None
+        self._text_keywords = None
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = self.obj.name or ""
+        return self._name
+
+    @property
+    def ancestry(self):
+        if self._ancestry is None:
+            self._ancestry = get_ancestry(self.obj, self.ancestry_levels)
+        return self._ancestry
+
+    @property
+    def texts(self):
+        if self._texts is None:
+            self._texts = get_text_descendants(self.obj, max_depth=5)
+        return self._texts
+
+    @property
+    def text_keywords(self):
+        """Concepts des mots-clés présents dans les descendants Text (un seul parcours)."""
+        if self._text_keywords is None:
+            self._text_keywords = scan_keywords(" ".join(text for text, _rect in self.texts))
+        return self._text_keywords
+
+
+class CompiledOverlayRules:
+    """
+    Arbre de décision compilé depuis une table de règles :
+    rôle -> FrameworkId -> AutomationId -> règles candidates (ordre de priorité).
+
+    Les règles qui suivent une règle sans condition dans une liste candidate sont
+    inatteignables et retirées à la compilation.
+    """
+
+    # Clé des AutomationId absents de la table
+    OTHER = object()
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.ancestry_levels = max([rule.ancestor_levels for rule in self.rules] + [config.ANCESTRY_MAX_DEPTH])
+        self._tree = {}
+        for rule in self.rules:
+            self._tree.setdefault(rule.role, {}).setdefault(rule.framework_id, None)
+        for role, frameworks in self._tree.items():
+            for framework_id in frameworks:
+                group = [rule for rule in self.rules if rule.role == role and rule.framework_id == framework_id]
+                frameworks[framework_id] = self._compile_buckets(group)
+
+    def _compile_buckets(self, rules):
+        ids = set()
+        for rule in rules:
+            if rule.automation_ids is not None:
+                ids.update(rule.automation_ids)
+        buckets = {}
+        for key in list(ids) + [self.OTHER]:
+            candidates = []
+            for rule in rules:
+                if rule.automation_ids is None or (key is not self.OTHER and key in rule.automation_ids):
+                    candidates.append(rule)
+                    if rule.is_unconditional:
+                        break
+            buckets[key] = tuple(candidates)
+        return buckets
+
+    def candidates(self, role, framework_id, automation_id):
+        frameworks = self._tree.get(role)
+        if not frameworks:
+            return ()
+        buckets = frameworks.get(framework_id)
+        if not buckets:
+            return ()
+        candidates = buckets.get(automation_id)
+        return candidates if candidates is not None else buckets[self.OTHER]
+
+    def classify(self, obj):
+        """Retourne la classe overlay de la première règle satisfaite, ou None."""
+        role = obj.role
+        if role not in self._tree:
+            return None
+        candidates = self.candidates(role, get_framework_id(obj), get_automation_id(obj))
+        if not candidates:
+            return None
+        context = _MatchContext(obj, self.ancestry_levels)
+        # Règles prioritaires dont il ne reste que les contraintes sur les descendants
+        deferred = []
+        for rule in candidates:
+            if not rule.matches_early(context):
+                continue
+            if rule.has_deferred_checks:
+                deferred.append(rule)
+                continue
+            for pending in deferred:
+                if pending.matches_deferred(context):
+                    return pending.overlay
+            return rule.overlay
+        for pending in deferred:
+            if pending.matches_deferred(context):
+                return pending.overlay
+        return None
+
+
+compiled_overlay_rules = CompiledOverlayRules(OVERLAY_RULES)
+
+
+def classify_overlay(obj):
+    """Détermine la classe overlay d'un objet, ou None."""
+    try:
+        overlay = compiled_overlay_rules.classify(obj)
+    except Exception as e:
+        log.error(f"PROTONVPN: classify_overlay error: {e}")
+        return None
+    if overlay is not None:
+        diag.debug("classification", "→ %s", overlay.__name__)
+    return overlay
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration de l'add-on ProtonVPN (constantes ajustables).
+
+Les autres sous-modules lisent ces valeurs via `config.NOM` au moment de l'appel,
+pour qu'une modification à l'exécution soit prise en compte.
+"""
+
+
+# Valeur par défaut du mode débogage ; le réglage courant est enregistré dans la
+# configuration NVDA (voir diagnostics.py, Ctrl+Shift+Alt+D)
+DEBUG_MODE = False
+
+# Journal de diagnostic : événements conservés en mémoire, et messages écrits dans
+# nvda.log par clé de message et par fenêtre
+DIAGNOSTICS_BUFFER_SIZE = 500
+DIAGNOSTICS_RATE_LIMIT = 5
+DIAGNOSTICS_RATE_WINDOW_S = 10
+
+# Plage Y pour détecter les boutons LocationDetailsPage (ajustable)
+LOCATION_DETAILS_Y_MIN = 900
+LOCATION_DETAILS_Y_MAX = 1300
+
+# Dictionnaires de mots-clés toujours chargés (voir keywords.py) ; celui de la langue
+# de l'interface est ajouté s'il existe
+KEYWORD_LANGUAGES = ("fr", "en")
+
+# ControlType UIA des éléments Text
+UIA_TEXT_CONTROL_TYPE = 50020
+UIA_BUTTON_CONTROL_TYPE = 50000
+
+# Format des instantanés d'arbre UIA (rejouables hors NVDA, voir benchmarks/)
+UIA_SNAPSHOT_FORMAT = "protonvpn-uia-snapshot"
+UIA_SNAPSHOT_VERSION = 1
+UIA_SNAPSHOT_MAX_DEPTH = 40
+
+# Mesure des latences (chooseNVDAObjectOverlayClasses, propriétés des overlays, scripts).
+# Désactivée par défaut : coût d'un test booléen par appel.
+LATENCY_INSTRUMENTATION_ENABLED = False
+
+# Budget des parcours d'arbre du thread principal (voir traversal.py) : nombre de noeuds
+# et durée maximale (ms) ; au-delà, le parcours s'arrête et renvoie ce qu'il a trouvé
+TRAVERSAL_MAX_NODES = 5000
+TRAVERSAL_MAX_TIME_MS = 100
+
+# Budget de la passe de fond sur la fenêtre (windowscan) et de l'enregistrement de l'arbre
+# (Ctrl+Shift+Alt+U)
+WINDOW_SCAN_MAX_NODES = 200000
+WINDOW_SCAN_MAX_TIME_MS = 3000
+UIA_SNAPSHOT_MAX_NODES = 200000
+UIA_SNAPSHOT_MAX_TIME_MS = 10000
+
+# Instantané du sous-arbre en un seul appel UIA (BuildUpdatedCache) au lieu
+# d'un parcours node.children ; repli automatique si indisponible
+USE_SUBTREE_SNAPSHOT = True
+
+# ControlType dont le sous-arbre, de taille connue, est lu en un seul appel (TreeScope_Subtree) :
+# bouton, case à cocher, lien, élément de liste, bouton radio, texte. Pire cas mesuré
+# (benchmarks/bench_subtree_snapshot.py) : carte promo, une quinzaine de noeuds. Les autres
+# éléments (volets, groupes, fenêtres) sont lus niveau par niveau, dans le budget du parcours.
+SUBTREE_SNAPSHOT_CONTROL_TYPES = frozenset((UIA_BUTTON_CONTROL_TYPE, 50002, 50005, 50007, 50013, UIA_TEXT_CONTROL_TYPE))
+
+# Nombre maximum d'éléments mémorisés par le cache de classification (LRU)
+CLASSIFICATION_CACHE_MAX_SIZE = 256
+
+# Valeurs extraites des overlays : nombre d'entrées et taille totale estimée (LRU),
+# âge maximal (filet de sécurité si un événement NameChanged / StructureChanged n'arrive pas)
+OVERLAY_TEXT_CACHE_MAX_SIZE = 128
+OVERLAY_TEXT_CACHE_MAX_BYTES = 256 * 1024
+OVERLAY_TEXT_CACHE_MAX_AGE_S = 2.0
+
+# Nombre maximum d'enfants indexés par l'index des frères avant remise à zéro
+SIBLING_INDEX_MAX_ENTRIES = 1024
+
+# Profondeur de l'instantané de chacun des boutons LocationDetailsPage (libellé et valeur)
+LOCATION_PAGE_SNAPSHOT_DEPTH = 5
+
+# Widgets de la colonne droite : profondeur de l'instantané d'un widget (textes d'état),
+# délai maximal d'annonce du nouvel état après un basculement, et nombre de niveaux de
+# parents suivis (un StructureChanged sur l'un d'eux périme le registre)
+WIDGET_SNAPSHOT_DEPTH = 4
+WIDGET_ANNOUNCE_TIMEOUT_S = 3.0
+WIDGET_CONTAINER_MAX_LEVELS = 12
+
+# Profondeur de la chaîne de parents mémorisée par élément (Ancestry)
+ANCESTRY_MAX_DEPTH = 6
+
+# Âge maximal de l'instantané de la fenêtre réutilisé par un geste suivant (secondes),
+# s'il n'a pas été invalidé par un événement StructureChanged
+WINDOW_SNAPSHOT_REUSE_S = 2.0
+
+# Préchauffage des caches au retour dans ProtonVPN : délai avant la passe de fond (ms),
+# intervalle entre deux étapes du thread principal (ms), et âge maximal de l'instantané
+# du préchauffage réutilisé par le premier geste (secondes, hors StructureChanged)
+WARMUP_ENABLED = True
+WARMUP_DELAY_MS = 300
+WARMUP_STEP_INTERVAL_MS = 20
+WARMUP_SNAPSHOT_REUSE_S = 30.0
+
+# Délai de regroupement des événements de ConnectionDetailsPage avant ré-extraction (ms)
+CONNECTION_DETAILS_REFRESH_DELAY_MS = 150
+
+# Échantillonnage du débit actuel (bouton "E") et fenêtres glissantes des statistiques
+THROUGHPUT_SAMPLE_INTERVAL_MS = 1000
+THROUGHPUT_WINDOWS_S = (60, 300, 900)
+
+# Confirmation de connexion/déconnexion : délai maximal, annonce "en cours",
+# et délai de regroupement des événements UIA avant vérification (ms)
+VPN_CONFIRM_TIMEOUT_MS = 30000
+VPN_CONFIRM_PROGRESS_MS = 3000
+VPN_CONFIRM_CHECK_DELAY_MS = 100
+
+# Surveillance de la connexion (Ctrl+Shift+Alt+W, réglage enregistré) : intervalle de
+# sondage initial, doublé tant que l'état est stable jusqu'au maximum (ms)
+CONNECTION_WATCHDOG_ENABLED = False
+CONNECTION_WATCHDOG_MIN_INTERVAL_MS = 1000
+CONNECTION_WATCHDOG_MAX_INTERVAL_MS = 60000
+
+# Disjoncteur des appels UIA (voir breaker.py) : un appel plus long que le seuil de blocage,
+# ou plusieurs appels lents consécutifs, suspendent les appels UIA de l'add-on pendant le
+# délai de refroidissement ; intervalle de vérification des appels en cours (ms)
+UIA_HANG_THRESHOLD_MS = 1500
+UIA_SLOW_CALL_MS = 250
+UIA_SLOW_CALLS_TO_TRIP = 3
+UIA_BREAKER_COOLDOWN_S = 10.0
+UIA_HANG_CHECK_INTERVAL_MS = 250
+
+# Attente maximale du démarrage/arrêt du thread de parcours UIA (secondes)
+WORKER_START_TIMEOUT_S = 2
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Outils d'inspection : résumé UIA d'un contrôle, rapport étendu, instantané de l'arbre.
+
+Chargé uniquement par les scripts de débogage.
+"""
+
+from datetime import datetime
+
+from logHandler import log
+
+from . import config
+from .detectors import (
+    get_location_button_index,
+    get_location_button_label,
+    is_connection_details_dynamic_button,
+    is_location_details_dynamic_button,
+    is_overlay_promo_button,
+    is_vpn_plus_promo_button,
+)
+from .extractors import (
+    extract_connection_details_label_and_values,
+    extract_dynamic_value,
+    extract_overlay_promo_text,
+    extract_vpn_plus_long_text,
+)
+from .uiautils import (
+    get_automation_id,
+    get_bounding_rect,
+    get_control_type,
+    get_framework_id,
+    get_subtree_snapshot,
+    get_text_descendants,
+)
+
+
+# ============================================================================
+# PRESSE-PAPIERS
+# ============================================================================
+
+def copy_to_clipboard(text):
+    """Copie le texte dans le presse-papiers Windows."""
+    try:
+        import ctypes
+        ctypes.windll.user32.OpenClipboard(0)
+        ctypes.windll.user32.EmptyClipboard()
+        text_bytes = text.encode('utf-16-le') + b'\x00\x00'
+        GMEM_MOVEABLE = 0x0002
+        h_mem = ctypes.windll.kernel32.GlobalAlloc(GMEM_MOVEABLE, len(text_bytes))
+        ptr = ctypes.windll.kernel32.GlobalLock(h_mem)
+        ctypes.memmove(ptr, text_bytes, len(text_bytes))
+        ctypes.windll.kernel32.GlobalUnlock(h_mem)
+        ctypes.windll.user32.SetClipboardData(13, h_mem)
+        ctypes.windll.user32.CloseClipboard()
+        return True
+    except Exception as e:
+        log.error(f"PROTONVPN: Clipboard error: {e}")
+        return False
+
+
+# ============================================================================
+# INSPECTION
+# ============================================================================
+
+def get_uia_info(obj):
+    """Recupere les informations UIA basiques d'un objet."""
+    info = {}
+    try:
+        info['name'] = obj.name or "(vide)"
+    except:
+        info['name'] = "(erreur)"
+    try:
+        info['role'] = str(obj.role)
+    except:
+        info['role'] = "(erreur)"
+    try:
+        info['automationId'] = get_automation_id(obj) or "(vide)"
+    except:
+        info['automationId'] = "(erreur)"
+    try:
+        info['controlType'] = str(get_control_type(obj))
+    except:
+        info['controlType'] = "(erreur)"
+    try:
+        info['className'] = getattr(obj, 'windowClassName', None) or "(vide)"
+    except:
+        info['className'] = "(erreur)"
+    return info
+
+def format_uia_info(info):
+    """Formate les infos UIA basiques."""
+    lines = [
+        "=" * 50,
+        "INFORMATIONS UIA - PROTONVPN",
+        "=" * 50,
+        f"Nom          : {info.get('name', 'N/A')}",
+        f"Role         : {info.get('role', 'N/A')}",
+        f"AutomationId : {info.get('automationId', 'N/A')}",
+        f"ControlType  : {info.get('controlType', 'N/A')}",
+        f"ClassName    : {info.get('className', 'N/A')}",
+        "=" * 50,
+    ]
+    return "\n".join(lines)
+
+def get_object_summary(obj):
+    """Retourne un résumé court d'un objet."""
+    if not obj:
+        return "(null)"
+    try:
+        name = obj.name or "(vide)"
+        role = obj.role
+        automationId = get_automation_id(obj)
+        controlType = get_control_type(obj) or "(N/A)"
+        return f"[Name={name}, Role={role}, ID={automationId}, CT={controlType}]"
+    except Exception as e:
+        return f"(erreur: {e})"
+
+def get_parent_chain(obj, max_levels=4):
+    """Retourne la chaîne de parents jusqu'à max_levels."""
+    chain = []
+    current = obj
+    for i in range(max_levels):
+        try:
+            parent = current.parent
+            if not parent:
+                break
+            chain.append(get_object_summary(parent))
+            current = parent
+        except:
+            break
+    return chain
+
+def snapshot_node_to_dict(node):
+    """Convertit un SubtreeSnapshotNode en dictionnaire sérialisable (format d'instantané)."""
+    return {
+        "name": node.name,
+        "controlType": node.controlType,
+        "automationId": node.automationId,
+        "frameworkId": node.frameworkId,
+        "rect": list(node.rect) if node.rect else None,
+        "children": [snapshot_node_to_dict(child) for child in node.children],
+    }
+
+def capture_uia_tree_snapshot(obj, max_depth=config.UIA_SNAPSHOT_MAX_DEPTH):
+    """
+    Capture l'arbre UIA de l'objet (propriétés + structure) : en un seul appel UIA pour un
+    contrôle de taille connue, niveau par niveau sinon (voir get_subtree_snapshot).
+    Retourne le dictionnaire d'instantané, ou None si l'objet n'est pas UIA.
+    "truncated" indique que le budget (UIA_SNAPSHOT_MAX_NODES / _TIME_MS) a été atteint.
+    """
+    snapshot = get_subtree_snapshot(obj, max_depth, config.UIA_SNAPSHOT_MAX_NODES, config.UIA_SNAPSHOT_MAX_TIME_MS)
+    if snapshot is None:
+        return None
+    return {
+        "format": config.UIA_SNAPSHOT_FORMAT,
+        "version": config.UIA_SNAPSHOT_VERSION,
+        "captured": datetime.now().isoformat(timespec="seconds"),
+        "truncated": snapshot.truncated,
+        "root": snapshot_node_to_dict(snapshot),
+    }
+
+def format_extended_uia_info(obj):
+    """Formate les infos UIA étendues avec descendants Text."""
+    info = {}
+    
+    try:
+        info['name'] = obj.name or "(vide)"
+    except:
+        info['name'] = "(erreur)"
+    try:
+        info['role'] = str(obj.role)
+    except:
+        info['role'] = "(erreur)"
+    
+    info['automationId'] = get_automation_id(obj) or "(vide)"
+    info['frameworkId'] = get_framework_id(obj) or "(vide)"
+    
+    rect = get_bounding_rect(obj)
+    info['boundingRect'] = str(rect) if rect else "(N/A)"
+    
+    info['controlType'] = get_control_type(obj) or "(N/A)"
+    
+    parents = get_parent_chain(obj, 4)
+    desc_texts = get_text_descendants(obj, 5)
+    
+    is_location_btn = is_location_details_dynamic_button(obj)
+    location_index = get_location_button_index(obj) if is_location_btn else -1
+    extracted_value = extract_dynamic_value(obj, location_index) if is_location_btn else None
+    
+    is_vpn_plus = is_vpn_plus_promo_button(obj)
+    vpn_plus_text = extract_vpn_plus_long_text(obj) if is_vpn_plus else None
+    
+    lines = [
+        "=" * 70,
+        "DEBUG ETENDU UIA - PROTONVPN v1.0.0",
+        "=" * 70,
+        "",
+        "--- ELEMENT COURANT ---",
+        f"Nom          : {info.get('name', 'N/A')}",
+        f"Role         : {info.get('role', 'N/A')}",
+        f"AutomationId : {info.get('automationId', 'N/A')}",
+        f"ControlType  : {info.get('controlType', 'N/A')}",
+        f"FrameworkId  : {info.get('frameworkId', 'N/A')}",
+        f"BoundingRect : {info.get('boundingRect', 'N/A')}",
+        "",
+        "--- DETECTION LOCATIONDETAILSPAGE ---",
+        f"IsLocationDetailsButton : {is_location_btn}",
+        f"ButtonIndex             : {location_index}",
+        f"Label                   : {get_location_button_label(location_index) if location_index >= 0 else 'N/A'}",
+        f"ExtractedValue          : {extracted_value}",
+        "",
+        "--- DETECTION VPN PLUS PROMO ---",
+        f"IsVPNPlusPromoButton    : {is_vpn_plus}",
+        f"LongText                : {vpn_plus_text[:100] if vpn_plus_text else 'N/A'}...",
+        "",
+        "--- DETECTION CONNECTIONDETAILSPAGE ---",
+        f"IsConnectionDetailsBtn  : {is_connection_details_dynamic_button(obj)}",
+    ]
+    
+    # Ajouter extraction ConnectionDetails si applicable
+    if is_connection_details_dynamic_button(obj):
+        conn_label, conn_values = extract_connection_details_label_and_values(obj)
+        lines.append(f"Label                   : {conn_label}")
+        lines.append(f"ExtractedValue(s)       : {', '.join(conn_values) if conn_values else 'N/A'}")
+    else:
+        lines.append(f"Label                   : N/A")
+        lines.append(f"ExtractedValue(s)       : N/A")
+    
+    # Ajouter détection OverlayPromoButton
+    is_overlay_promo = is_overlay_promo_button(obj)
+    lines.extend([
+        "",
+        "--- DETECTION OVERLAYPROMOBUTTON ---",
+        f"IsOverlayPromoButton    : {is_overlay_promo}",
+    ])
+    if is_overlay_promo:
+        lines.append(f"PromoText               : {extract_overlay_promo_text(obj)[:80]}...")
+    else:
+        lines.append(f"PromoText               : N/A")
+    
+    lines.extend([
+        "",
+        "--- DESCENDANTS TEXT ---",
+    ])
+    
+    for i, (text, trect) in enumerate(desc_texts[:10]):
+        lines.append(f"  [{i}] \"{text}\" @ {trect}")
+    if not desc_texts:
+        lines.append("  (aucun texte descendant)")
+    
+    lines.append("")
+    lines.append("--- CHAINE DE PARENTS ---")
+    for i, p in enumerate(parents):
+        lines.append(f"  Parent {i+1}: {p}")
+    
+    lines.append("")
+    lines.append("=" * 70)
+    
+    return "\n".join(lines)
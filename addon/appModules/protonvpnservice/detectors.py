@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Détection des boutons ProtonVPN à labelliser (LocationDetailsPage, ConnectionDetailsPage,
+promos, widgets).
+"""
+
+import controlTypes
+from logHandler import log
+
+from . import keywords
+from .diagnostics import diag
+from .keywords import scan_keywords
+from .uiautils import (
+    get_all_text_descendants_as_string,
+    get_automation_id,
+    get_bounding_rect,
+    get_framework_id,
+    get_text_descendants,
+    has_parent_with_automation_id,
+    has_parent_with_name_keyword,
+    sibling_index,
+)
+
+
+# ============================================================================
+# BOUTONS LOCATIONDETAILSPAGE
+# ============================================================================
+
+def is_location_details_dynamic_button(obj):
+    """
+    Détecte si l'objet est un des 3 boutons dynamiques de LocationDetailsPage.
+    """
+    try:
+        if obj.role != controlTypes.Role.BUTTON:
+            return False
+        if get_framework_id(obj) != "XAML":
+            return False
+        if get_automation_id(obj):
+            return False
+        if not has_parent_with_automation_id(obj, "LocationDetailsPage", 4):
+            return False
+        return True
+    except:
+        return False
+
+
+def get_location_button_index(obj):
+    """Détermine l'index (0, 1, 2) du bouton dans LocationDetailsPage."""
+    rect = get_bounding_rect(obj)
+    if not rect:
+        return -1
+    
+    x = rect[0]
+    
+    # Boutons sans AutomationId avant celui-ci (un seul appel UIA par conteneur)
+    positions = sibling_index.get(obj)
+    if positions is not None:
+        return positions[1]
+    
+    try:
+        count = 0
+        current = obj.previous
+        while current:
+            if current.role == controlTypes.Role.BUTTON:
+                if not get_automation_id(current):
+                    count += 1
+            current = current.previous
+        return count
+    except:
+        pass
+    
+    if x < 800:
+        return 0
+    elif x < 1200:
+        return 1
+    else:
+        return 2
+
+
+def get_location_button_label(index):
+    """Retourne le label correspondant à l'index du bouton."""
+    labels = {
+        0: "Votre adresse IP",
+        1: "Pays",
+        2: "Fournisseur"
+    }
+    return labels.get(index, "Information VPN")
+
+
+# ============================================================================
+# BOUTONS PROMO
+# ============================================================================
+
+def is_vpn_plus_promo_button(obj):
+    """
+    Détecte si l'objet est le bouton VPN Plus promo.
+    
+    Critères STRICTS (tous requis):
+    - role == BUTTON
+    - FrameworkId == XAML
+    - Parent chain contient "gratuit" (dans le name, mot-clé FREE de chaque langue chargée)
+    - Descendants Text contiennent explicitement "VPN Plus"
+    """
+    try:
+        if obj.role != controlTypes.Role.BUTTON:
+            return False
+        
+        if get_framework_id(obj) != "XAML":
+            return False
+        
+        # DOIT avoir un parent contenant "gratuit" - STRICTEMENT REQUIS
+        if not has_parent_with_name_keyword(obj, keywords.FREE, 6):
+            return False
+        
+        # DOIT avoir des descendants contenant exactement "VPN Plus" - STRICTEMENT REQUIS
+        if keywords.VPN_PLUS not in scan_keywords(get_all_text_descendants_as_string(obj, 5)):
+            return False
+        
+        diag.debug("detectors.plus_promo", "VPN Plus promo button detected!")
+        
+        return True
+    except Exception as e:
+        log.error(f"PROTONVPN: is_vpn_plus_promo_button error: {e}")
+        return False
+
+
+def is_overlay_promo_button(obj):
+    """
+    Détecte si l'objet est une carte promo dans OverlayMessage.
+    
+    Critères:
+    - FrameworkId == XAML
+    - Role == BUTTON (ou role focusable/invocable)
+    - Parent avec AutomationId == "OverlayMessage"
+    - Au moins 2 descendants Text visibles
+    - AutomationId vide (pas un bouton standard)
+    """
+    try:
+        # Vérifier FrameworkId
+        if get_framework_id(obj) != "XAML":
+            return False
+        
+        # Vérifier rôle (bouton ou custom invocable)
+        if obj.role != controlTypes.Role.BUTTON:
+            return False
+        
+        # AutomationId doit être vide (carte custom, pas bouton standard)
+        if get_automation_id(obj):
+            return False
+        
+        # DOIT avoir un parent avec AutomationId == "OverlayMessage"
+        if not has_parent_with_automation_id(obj, "OverlayMessage", 4):
+            return False
+        
+        # Doit avoir au moins 2 descendants Text
+        desc_texts = get_text_descendants(obj, max_depth=5)
+        if len(desc_texts) < 2:
+            return False
+        
+        diag.debug("detectors.overlay_promo", "OverlayPromoButton detected! (%d text descendants)", len(desc_texts))
+        
+        return True
+    except Exception as e:
+        log.error(f"PROTONVPN: is_overlay_promo_button error: {e}")
+        return False
+
+
+# ============================================================================
+# BOUTONS CONNECTIONDETAILSPAGE (VPN connecté)
+# ============================================================================
+
+def is_connection_details_dynamic_button(obj):
+    """
+    Détecte si l'objet est un bouton dynamique de ConnectionDetailsPage.
+    
+    Ces boutons apparaissent quand le VPN est connecté et affichent:
+    - Adresse IP du VPN (ShowIpFlyoutButton)
+    - Trafic total (ShowVolumeFlyoutButton)
+    - Trafic actuel (E)
+    """
+    try:
+        if obj.role != controlTypes.Role.BUTTON:
+            return False
+        
+        if get_framework_id(obj) != "XAML":
+            return False
+        
+        # Vérifier si parent contient ConnectionDetailsPage
+        if has_parent_with_automation_id(obj, "ConnectionDetailsPage", 4):
+            return True
+        
+        return False
+    except Exception as e:
+        log.error(f"PROTONVPN: is_connection_details_dynamic_button error: {e}")
+        return False
+
+
+# ============================================================================
+# WIDGETS COLONNE DROITE
+# ============================================================================
+
+def count_same_type_siblings_before(obj):
+    """Compte les frères de même type avant cet objet."""
+    positions = sibling_index.get(obj)
+    if positions is not None:
+        return positions[0]
+    count = 0
+    try:
+        current = obj.previous
+        while current:
+            if current.role == obj.role:
+                count += 1
+            current = current.previous
+    except:
+        pass
+    return count
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Journal de diagnostic de l'add-on : niveaux testés avant tout formatage, limitation
+du débit par clé de message et tampon circulaire des événements récents.
+
+Usage :
+    diag.debug("overlay.location.name", "LocationDetailsButton.name → %r (index=%s)", result, index)
+
+Le message n'est formaté que si le niveau est actif. Chaque événement retenu est
+conservé (non formaté) dans le tampon, que Ctrl+Shift+Alt+L enregistre dans un fichier ;
+nvda.log ne reçoit qu'un nombre limité de messages par clé et par fenêtre.
+
+Le mode débogage (niveau DEBUG) est un réglage NVDA, modifiable à l'exécution.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from logHandler import log
+
+from . import config
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+# Section des réglages NVDA (nvda.ini)
+CONFIG_SECTION = "protonvpn"
+CONFIG_SPEC = {
+    "debugMode": f"boolean(default={config.DEBUG_MODE})",
+    "connectionWatchdog": f"boolean(default={config.CONNECTION_WATCHDOG_ENABLED})",
+}
+
+
+class DiagnosticLogger:
+    """Journal à niveaux avec limitation de débit par clé et tampon des derniers événements."""
+
+    def __init__(self, level=INFO, buffer_size=config.DIAGNOSTICS_BUFFER_SIZE,
+                 rate_limit=config.DIAGNOSTICS_RATE_LIMIT, rate_window_s=config.DIAGNOSTICS_RATE_WINDOW_S):
+        self.level = level
+        self.rate_limit = rate_limit
+        self.rate_window_s = rate_window_s
+        # (horodatage, niveau, clé, format, arguments) : formaté seulement à l'écriture
+        self._events = deque(maxlen=buffer_size)
+        # clé -> [début de fenêtre, messages écrits, messages supprimés]
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def debug(self, key, fmt, *args):
+        if DEBUG >= self.level:
+            self._emit(DEBUG, key, fmt, args)
+
+    def info(self, key, fmt, *args):
+        if INFO >= self.level:
+            self._emit(INFO, key, fmt, args)
+
+    def warning(self, key, fmt, *args):
+        if WARNING >= self.level:
+            self._emit(WARNING, key, fmt, args)
+
+    def _emit(self, level, key, fmt, args):
+        now = time.time()
+        self._events.append((now, level, key, fmt, args))
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.rate_window_s:
+                suppressed = window[2] if window else 0
+                self._windows[key] = window = [now, 0, 0]
+            else:
+                suppressed = 0
+            if window[1] >= self.rate_limit:
+                window[2] += 1
+                return
+            window[1] += 1
+        message = f"PROTONVPN: {_format(fmt, args)}"
+        if suppressed:
+            message += f" ({suppressed} messages '{key}' supprimés)"
+        if level >= WARNING:
+            log.warning(message)
+        else:
+            # nvda.log est au niveau INFO par défaut : les messages DEBUG de l'add-on doivent y apparaître
+            log.info(message)
+
+    def events(self):
+        """Copie des événements du tampon, du plus ancien au plus récent."""
+        return list(self._events)
+
+    def format_events(self):
+        lines = []
+        for timestamp, level, key, fmt, args in self.events():
+            stamp = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+            lines.append(f"{stamp} {LEVEL_NAMES.get(level, level):<7} {key}: {_format(fmt, args)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        self._events.clear()
+        with self._lock:
+            self._windows.clear()
+
+
+def _format(fmt, args):
+    try:
+        return fmt % args if args else fmt
+    except Exception as e:
+        return f"{fmt} {args!r} (format error: {e})"
+
+
+diag = DiagnosticLogger()
+
+
+# ============================================================================
+# MODE DEBOGAGE (REGLAGE NVDA)
+# ============================================================================
+
+def _nvda_config():
+    """Section des réglages de l'add-on dans la configuration NVDA, ou None."""
+    try:
+        import config as nvdaConfig
+        if CONFIG_SECTION not in nvdaConfig.conf.spec:
+            nvdaConfig.conf.spec[CONFIG_SECTION] = CONFIG_SPEC
+        return nvdaConfig.conf[CONFIG_SECTION]
+    except Exception as e:
+        log.error(f"PROTONVPN: configuration error: {e}")
+        return None
+
+
+def load_setting(key, default):
+    """Valeur enregistrée du réglage `key` de l'add-on, ou `default`."""
+    section = _nvda_config()
+    if section is not None:
+        try:
+            return section[key]
+        except Exception:
+            pass
+    return default
+
+
+def save_setting(key, value):
+    section = _nvda_config()
+    if section is not None:
+        section[key] = value
+
+
+def is_debug_mode():
+    return diag.level <= DEBUG
+
+
+def set_debug_mode(enabled, save=True):
+    """Active ou désactive le mode débogage (niveau DEBUG) et l'enregistre dans la configuration NVDA."""
+    diag.level = DEBUG if enabled else INFO
+    if save:
+        save_setting("debugMode", bool(enabled))
+
+
+def load_debug_mode():
+    """Applique le réglage enregistré (ou la valeur par défaut de config.DEBUG_MODE)."""
+    enabled = bool(load_setting("debugMode", config.DEBUG_MODE))
+    set_debug_mode(enabled, save=False)
+    return enabled
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Evénements UIA (StructureChanged / NameChanged / StateChanged) : routeur et handlers COM.
+"""
+
+from logHandler import log
+
+
+class UIAEventRouter:
+    """
+    Distribue les événements UIA StructureChanged, NameChanged et StateChanged aux caches de l'add-on.
+    Les callbacks sont toujours appelés sur le thread principal de NVDA.
+    """
+
+    def __init__(self):
+        self._structure_listeners = []
+        self._name_listeners = []
+        self._state_listeners = []
+
+    def add_structure_listener(self, callback):
+        """callback(runtime_id) ; runtime_id peut être None (changement non localisé)."""
+        self._structure_listeners.append(callback)
+
+    def add_name_listener(self, callback):
+        """callback(runtime_id)"""
+        self._name_listeners.append(callback)
+
+    def add_state_listener(self, callback):
+        """callback(runtime_id) ; état de l'élément modifié (ToggleState, coché, enfoncé...)."""
+        self._state_listeners.append(callback)
+
+    def notify_structure_changed(self, runtime_id=None):
+        for callback in self._structure_listeners:
+            try:
+                callback(runtime_id)
+            except Exception as e:
+                log.error(f"PROTONVPN: structure listener error: {e}")
+
+    def notify_name_changed(self, runtime_id):
+        for callback in self._name_listeners:
+            try:
+                callback(runtime_id)
+            except Exception as e:
+                log.error(f"PROTONVPN: name listener error: {e}")
+
+    def notify_state_changed(self, runtime_id):
+        for callback in self._state_listeners:
+            try:
+                callback(runtime_id)
+            except Exception as e:
+                log.error(f"PROTONVPN: state listener error: {e}")
+
+
+uia_events = UIAEventRouter()
+
+
+def _create_structure_changed_handler(callback):
+    """
+    Crée un handler COM IUIAutomationStructureChangedEventHandler.
+    UIA l'appelle depuis un thread MTA : callback(runtime_id) est renvoyé au thread principal via wx.CallAfter.
+    runtime_id est celui de l'élément retiré (ChildRemoved) ou, à défaut, celui de l'émetteur.
+    """
+    import wx
+    import UIAHandler
+    from comtypes import COMObject
+
+    class StructureChangedHandler(COMObject):
+        _com_interfaces_ = [UIAHandler.IUIAutomationStructureChangedEventHandler]
+
+        def IUIAutomationStructureChangedEventHandler_HandleStructureChangedEvent(self, sender, changeType, runtimeId):
+            try:
+                runtime_id = tuple(runtimeId) if runtimeId else tuple(sender.GetRuntimeId())
+            except:
+                runtime_id = None
+            wx.CallAfter(callback, runtime_id or None)
+
+    return StructureChangedHandler()
+
+
+def _create_property_changed_handler(callback):
+    """
+    Crée un handler COM IUIAutomationPropertyChangedEventHandler.
+    callback(propertyId, runtime_id) est renvoyé au thread principal via wx.CallAfter
+    (runtime_id : élément dont la propriété a changé, ou None).
+    """
+    import wx
+    import UIAHandler
+    from comtypes import COMObject
+
+    class PropertyChangedHandler(COMObject):
+        _com_interfaces_ = [UIAHandler.IUIAutomationPropertyChangedEventHandler]
+
+        def IUIAutomationPropertyChangedEventHandler_HandlePropertyChangedEvent(self, sender, propertyId, newValue):
+            try:
+                runtime_id = tuple(sender.GetRuntimeId()) or None
+            except:
+                runtime_id = None
+            wx.CallAfter(callback, propertyId, runtime_id)
+
+    return PropertyChangedHandler()
+
+
+class UIAEventSubscription:
+    """
+    Handlers StructureChanged / PropertyChanged sur le sous-arbre d'un élément de la fenêtre,
+    ajoutés et retirés dans le thread de fond (MTA) de scanning, comme NVDA le fait pour ses
+    propres abonnements : le thread principal n'appelle jamais Add/Remove...EventHandler.
+
+    L'élément est la fenêtre (runtime_id None) ou retrouvé sous elle par son RuntimeId, avec
+    le client UIA du thread de fond ; il n'est utilisé que dans ce thread.
+    """
+
+    def __init__(self, window_handle, runtime_id=None):
+        self.window_handle = window_handle
+        self.runtime_id = runtime_id
+        self._structure_callback = None
+        self._property_callback = None
+        self._property_ids = ()
+        self._removed = False
+        # Manipulés uniquement dans le thread de fond
+        self._element = None
+        self._handlers = []
+
+    def add_structure_handler(self, callback):
+        """callback(runtime_id) à chaque StructureChanged du sous-arbre (voir _create_structure_changed_handler)."""
+        self._structure_callback = callback
+
+    def add_property_handler(self, callback, property_ids):
+        """callback(propertyId, runtime_id) à chaque changement de l'une des propriétés dans le sous-arbre."""
+        self._property_callback = callback
+        self._property_ids = list(property_ids)
+
+    def subscribe(self, callback=None):
+        """Ajoute les handlers depuis le thread de fond ; callback(ajoutés) ensuite sur le thread principal."""
+        from .scanning import scan_worker
+        scan_worker.submit(self._add, callback, self.window_handle, gesture=False)
+
+    def unsubscribe(self):
+        """Retire les handlers depuis le thread de fond (après leur ajout s'il est encore en file)."""
+        self._removed = True
+        from .scanning import scan_worker
+        scan_worker.run(self._remove)
+
+    def _add(self, client, root, job):
+        import UIAHandler
+        if self._removed or root is None:
+            return False
+        element = root
+        if self.runtime_id is not None:
+            from array import array
+            from . import search
+            # RuntimeId : SAFEARRAY de VT_I4 ("l" pour comtypes)
+            condition = search.property_condition(client, UIAHandler.UIA_RuntimeIdPropertyId, array("l", self.runtime_id))
+            element = search.find_first(root, condition, client.CreateCacheRequest(), subtree=True)
+            if not element:
+                return False
+        if self._structure_callback is not None:
+            handler = _create_structure_changed_handler(self._structure_callback)
+            client.AddStructureChangedEventHandler(element, UIAHandler.TreeScope_Subtree, None, handler)
+            self._handlers.append((client.RemoveStructureChangedEventHandler, handler))
+        if self._property_callback is not None:
+            handler = _create_property_changed_handler(self._property_callback)
+            client.AddPropertyChangedEventHandler(element, UIAHandler.TreeScope_Subtree, None, handler,
+                                                  self._property_ids)
+            self._handlers.append((client.RemovePropertyChangedEventHandler, handler))
+        self._element = element
+        return True
+
+    def _remove(self, client, root, job):
+        for remove, handler in self._handlers:
+            try:
+                remove(self._element, handler)
+            except Exception as e:
+                log.error(f"PROTONVPN: UIA event handler removal error: {e}")
+        self._handlers = []
+        self._element = None
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Extraction des valeurs dynamiques et des textes affichés par les boutons détectés.
+"""
+
+import re
+
+from . import config, keywords
+from .diagnostics import diag
+from .keywords import scan_keywords
+from .textclassifier import classify_texts, select_value
+from .traversal import object_children, walk
+from .uiautils import (
+    get_automation_id,
+    get_control_type,
+    get_parent_with_automation_id,
+    get_text_descendants,
+)
+
+
+# ============================================================================
+# VALEURS DYNAMIQUES LOCATIONDETAILSPAGE
+# ============================================================================
+
+def get_sibling_texts(obj, direction="both", max_siblings=5):
+    """Récupère les textes des éléments Text frères/voisins."""
+    texts = []
+    
+    if direction in ("prev", "both"):
+        try:
+            current = obj.previous
+            count = 0
+            while current and count < max_siblings:
+                ct = get_control_type(current)
+                if ct == config.UIA_TEXT_CONTROL_TYPE:
+                    name = current.name
+                    if name and name.strip():
+                        texts.append(("prev", name.strip()))
+                current = current.previous
+                count += 1
+        except:
+            pass
+    
+    if direction in ("next", "both"):
+        try:
+            current = obj.next
+            count = 0
+            while current and count < max_siblings:
+                ct = get_control_type(current)
+                if ct == config.UIA_TEXT_CONTROL_TYPE:
+                    name = current.name
+                    if name and name.strip():
+                        texts.append(("next", name.strip()))
+                current = current.next
+                count += 1
+        except:
+            pass
+    
+    return texts
+
+
+# Index du bouton LocationDetailsPage -> type de valeur
+LOCATION_LABEL_TYPES = {0: "ip", 1: "pays", 2: "fournisseur"}
+
+
+def extract_value_for_label_type(texts, label_type):
+    """Extrait la valeur appropriée depuis une liste de textes selon le type de label."""
+    if not texts:
+        return None
+    return select_value(classify_texts(texts), label_type)
+
+
+def extract_dynamic_value(obj, index):
+    """Extrait la valeur dynamique d'un bouton LocationDetailsPage."""
+    label_type = LOCATION_LABEL_TYPES.get(index, "unknown")
+    
+    all_texts = []
+    source = "none"
+    
+    desc_texts = get_text_descendants(obj, max_depth=5)
+    if desc_texts:
+        source = "descendants"
+        all_texts.extend([t[0] for t in desc_texts])
+    
+    if not all_texts:
+        sibling_texts = get_sibling_texts(obj, "both", 3)
+        if sibling_texts:
+            source = "siblings"
+            all_texts.extend([t[1] for t in sibling_texts])
+    
+    if not all_texts:
+        parent = get_parent_with_automation_id(obj, "LocationDetailsPage", 4)
+        if parent:
+            def visit(child, depth, context):
+                try:
+                    if get_control_type(child) == config.UIA_TEXT_CONTROL_TYPE:
+                        name = child.name
+                        if name and name.strip():
+                            all_texts.append(name.strip())
+                except:
+                    pass
+
+            walk(parent, object_children, visit, "location_parent_children", max_depth=1, include_root=False)
+            if all_texts:
+                source = "parent_children"
+    
+    value = extract_value_for_label_type(all_texts, label_type)
+    
+    diag.debug("extractors.dynamic_value", "DynamicValue extraction - index=%s, labelType=%s, source=%s, texts=%s, value=%s",
+               index, label_type, source, all_texts[:5], value)
+    
+    return value
+
+
+# ============================================================================
+# TEXTE DES BOUTONS PROMO
+# ============================================================================
+
+def extract_overlay_promo_text(obj):
+    """
+    Extrait et formate le texte de la carte promo OverlayMessage.
+    
+    Retourne un texte structuré pour l'annonce NVDA.
+    """
+    desc_texts = get_text_descendants(obj, max_depth=5)
+    
+    if not desc_texts:
+        return "Offre VPN Plus"
+    
+    # Extraire tous les textes
+    all_texts = [t[0].strip() for t in desc_texts if t[0] and t[0].strip()]
+    
+    if not all_texts:
+        return "Offre VPN Plus"
+    
+    # Construire un texte structuré
+    # Premier texte = titre/résumé principal
+    # Autres textes = détails
+    
+    # Joindre avec des points ou espaces
+    formatted_parts = []
+    for txt in all_texts:
+        # Nettoyer et ajouter ponctuation si nécessaire
+        txt = txt.strip()
+        if txt and not txt.endswith(('.', '!', '?')):
+            txt += '.'
+        formatted_parts.append(txt)
+    
+    result = ' '.join(formatted_parts)
+    
+    # Préfixer avec "VPN Plus" si pas déjà présent
+    if keywords.VPN_PLUS not in scan_keywords(result):
+        result = "VPN Plus. " + result
+    
+    diag.debug("extractors.overlay_promo", "OverlayPromo text extracted: %s...", result[:100])
+    
+    return result
+
+
+
+def extract_vpn_plus_long_text(obj):
+    """
+    Extrait le texte marketing long du bouton VPN Plus.
+    Retourne un texte nettoyé et formaté.
+    """
+    texts = get_text_descendants(obj, max_depth=5)
+    if not texts:
+        return ""
+    
+    # Filtrer et nettoyer les textes
+    all_texts = [t[0] for t in texts if t[0]]
+    
+    # Joindre avec des espaces et nettoyer
+    full_text = " ".join(all_texts)
+    
+    # Nettoyer les espaces multiples
+    full_text = re.sub(r'\s+', ' ', full_text).strip()
+    
+    # Structurer en phrases si possible
+    # Ajouter des points après certains patterns
+    full_text = re.sub(r'(\d+ pays)', r'\1.', full_text)
+    full_text = re.sub(r'(VPN Plus)', r'\1.', full_text, count=1)
+    
+    diag.debug("extractors.plus_promo", "VPN Plus long text extracted: %s...", full_text[:100])
+    
+    return full_text
+
+
+# ============================================================================
+# VALEURS CONNECTIONDETAILSPAGE
+# ============================================================================
+
+def extract_connection_details_label_and_values(obj):
+    """
+    Extrait le label et les valeurs d'un bouton ConnectionDetailsPage.
+    
+    Retourne (label, values_list) :
+    - label = premier texte descriptif (ex: "Adresse IP du VPN", "Trafic total")
+    - values_list = liste des valeurs dynamiques (ex: ["37.19.199.137"] ou ["416 o/s", "0 o/s"])
+    """
+    desc_texts = get_text_descendants(obj, max_depth=5)
+    
+    if not desc_texts:
+        # Fallback: utiliser le nom de l'objet et l'AutomationId
+        automationId = get_automation_id(obj)
+        original_name = obj.name or ""
+        
+        label_mapping = {
+            "ShowIpFlyoutButton": "Adresse IP du VPN",
+            "ShowVolumeFlyoutButton": "Trafic total",
+            "E": "Trafic actuel (Ko/s)",
+        }
+        label = label_mapping.get(automationId, "Info VPN")
+        values = [original_name] if original_name else []
+        return label, values
+    
+    # Extraire et étiqueter tous les textes
+    tokens = classify_texts([t[0] for t in desc_texts])
+    
+    if not tokens:
+        return "Info VPN", []
+    
+    # Le premier texte est généralement le label, les suivants sont les valeurs.
+    # Sinon, le premier texte qui ressemble à un label ("Adresse", "Trafic", "IP"...) est retenu.
+    label_index = 0
+    if not tokens[0].is_label:
+        label_index = next((i for i, token in enumerate(tokens) if token.is_label), 0)
+    label = tokens[label_index].text
+    values = [token.text for i, token in enumerate(tokens) if i != label_index]
+    
+    diag.debug("extractors.connection_details", "ConnectionDetails extraction - label='%s', values=%s", label, values)
+    
+    return label, values
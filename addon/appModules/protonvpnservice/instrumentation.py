@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure des latences : histogrammes à seaux fixes et décorateur `instrumented`.
+
+Importé par le point d'entrée (décorateurs des scripts) : ne dépend que de la configuration.
+"""
+
+import functools
+import math
+import time
+from array import array
+
+from . import config
+
+
+class LatencyHistograms:
+    """
+    Histogrammes à seaux fixes des durées d'exécution, par fonction.
+    Les percentiles (p50/p95/p99) sont estimés par la borne haute du seau.
+    Aucun formatage de chaîne sur le chemin rapide.
+    """
+
+    # Bornes hautes des seaux, en secondes (le dernier seau est ouvert)
+    BOUNDS = (
+        0.00005, 0.0001, 0.0002, 0.0005,
+        0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+        0.1, 0.2, 0.5, 1.0, 2.0, 5.0, float("inf"),
+    )
+
+    def __init__(self, enabled=config.LATENCY_INSTRUMENTATION_ENABLED):
+        self.enabled = enabled
+        self._histograms = {}
+
+    def record(self, key, duration):
+        entry = self._histograms.get(key)
+        if entry is None:
+            entry = self._histograms[key] = [array('l', [0]) * len(self.BOUNDS), 0.0, 0.0]
+        counts = entry[0]
+        for index, bound in enumerate(self.BOUNDS):
+            if duration <= bound:
+                counts[index] += 1
+                break
+        entry[1] += duration
+        if duration > entry[2]:
+            entry[2] = duration
+
+    def _percentile(self, counts, total, p):
+        rank = max(1, math.ceil(total * p / 100.0))
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.BOUNDS[index]
+        return self.BOUNDS[-1]
+
+    def summary(self):
+        """Retourne [(clé, appels, moyenne, p50, p95, p99, max)] triés par p95 décroissant (secondes)."""
+        rows = []
+        for key, (counts, total_time, maximum) in self._histograms.items():
+            total = sum(counts)
+            if not total:
+                continue
+            p50, p95, p99 = (min(self._percentile(counts, total, p), maximum) for p in (50, 95, 99))
+            rows.append((key, total, total_time / total, p50, p95, p99, maximum))
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+    def format_summary(self):
+        lines = [
+            "=" * 90,
+            "LATENCES PROTONVPN (ms ; percentiles = borne haute du seau)",
+            "=" * 90,
+            f"{'Fonction':<46} {'Appels':>7} {'Moy.':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'Max':>7}",
+        ]
+        for key, count, mean, p50, p95, p99, maximum in self.summary():
+            lines.append(
+                f"{key:<46} {count:>7} {mean * 1000:>7.2f} {p50 * 1000:>7.2f} "
+                f"{p95 * 1000:>7.2f} {p99 * 1000:>7.2f} {maximum * 1000:>7.2f}"
+            )
+        lines.append("=" * 90)
+        return "\n".join(lines)
+
+    def reset(self):
+        self._histograms = {}
+
+
+latency = LatencyHistograms()
+
+
+def instrumented(key):
+    """Décorateur : enregistre la durée de chaque appel dans l'histogramme `key` si la mesure est active."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not latency.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                latency.record(key, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class FirstGestureTimer:
+    """
+    Latence du premier geste après l'arrivée dans ProtonVPN : de l'appui (getScript) à
+    l'appel du callback qui reçoit les éléments résolus. Enregistrée dans `latency` sous
+    "first_gesture.<état du préchauffage>", même si la mesure des latences est désactivée
+    (un enregistrement par retour dans l'application).
+    """
+
+    def __init__(self):
+        self._armed = False
+        self._pending = None
+
+    def arm(self):
+        """Appelé par event_appModule_gainFocus : le prochain script sera chronométré."""
+        self._armed = True
+
+    def on_gesture(self, state):
+        """Appelé à l'appui d'un script ; state : "warm", "partial" ou "cold"."""
+        if self._armed:
+            self._armed = False
+            self._pending = (time.perf_counter(), f"first_gesture.{state}")
+        else:
+            self._pending = None
+
+    def wrap(self, callback):
+        """Enveloppe le callback du premier geste (le premier appelant consomme la mesure)."""
+        pending = self._pending
+        if pending is None:
+            return callback
+        self._pending = None
+        start, key = pending
+
+        @functools.wraps(callback)
+        def wrapper(*args, **kwargs):
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                latency.record(key, time.perf_counter() - start)
+        return wrapper
+
+
+first_gesture = FirstGestureTimer()
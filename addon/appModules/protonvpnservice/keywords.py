@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+Mots-clés de l'interface ProtonVPN par langue, compilés en un seul automate de recherche.
+
+Les dictionnaires des langues de config.KEYWORD_LANGUAGES et de la langue de l'interface
+(celle de NVDA, qui suit par défaut Windows, comme ProtonVPN) sont chargés au premier
+usage ; toutes leurs expressions sont réunies en une expression régulière : un texte
+n'est parcouru qu'une fois pour l'ensemble des mots-clés.
+
+Usage :
+    if keywords.DISCONNECT in scan_keywords(name):
+        ...
+"""
+
+import re
+from functools import lru_cache
+
+from . import config
+
+
+# ============================================================================
+# CONCEPTS
+# ============================================================================
+
+# Recherchés comme sous-chaînes (en minuscules)
+DISCONNECT = "disconnect"
+CONNECT = "connect"
+FREE = "free"
+VPN_PLUS = "vpn_plus"
+DETAIL_LABEL = "detail_label"
+NETSHIELD = "netshield"
+KILL_SWITCH = "kill_switch"
+SPLIT_TUNNELING = "split_tunneling"
+PORT_FORWARDING = "port_forwarding"
+
+# Libellés exacts des boutons LocationDetailsPage (valeurs = types de valeur des extracteurs)
+LABEL_IP = "ip"
+LABEL_COUNTRY = "pays"
+LABEL_PROVIDER = "fournisseur"
+
+# Communs à toutes les langues (noms de marque et noms anglais des fonctions)
+COMMON_KEYWORDS = {
+    VPN_PLUS: ("vpn plus",),
+    NETSHIELD: ("netshield",),
+    KILL_SWITCH: ("kill switch",),
+    SPLIT_TUNNELING: ("split tunneling",),
+    PORT_FORWARDING: ("port forwarding",),
+}
+
+KEYWORDS = {
+    "fr": {
+        DISCONNECT: ("déconnecter", "déconnect"),
+        CONNECT: ("connecter", "connect"),
+        FREE: ("gratuit",),
+        DETAIL_LABEL: ("adresse", "ip", "trafic", "volume", "actuel", "total", "ko/s", "o/s"),
+        KILL_SWITCH: ("arrêt d'urgence",),
+        SPLIT_TUNNELING: ("tunnel divisé",),
+        PORT_FORWARDING: ("redirection de port",),
+    },
+    "en": {
+        DISCONNECT: ("disconnect",),
+        CONNECT: ("connect",),
+        FREE: ("free",),
+        DETAIL_LABEL: ("address", "ip", "traffic", "volume", "current", "total", "kb/s", "b/s"),
+    },
+    "de": {
+        DISCONNECT: ("trennen",),
+        CONNECT: ("verbinden",),
+        FREE: ("kostenlos", "gratis"),
+        DETAIL_LABEL: ("adresse", "ip", "datenverkehr", "volumen", "aktuell", "gesamt", "kb/s", "b/s"),
+    },
+    "es": {
+        DISCONNECT: ("desconectar",),
+        CONNECT: ("conectar",),
+        FREE: ("gratis", "gratuit"),
+        DETAIL_LABEL: ("dirección", "ip", "tráfico", "volumen", "actual", "total", "kb/s", "b/s"),
+    },
+    "it": {
+        DISCONNECT: ("disconnetti",),
+        CONNECT: ("connetti",),
+        FREE: ("gratuit", "gratis"),
+        DETAIL_LABEL: ("indirizzo", "ip", "traffico", "volume", "attuale", "totale", "kb/s", "b/s"),
+    },
+    "pt": {
+        DISCONNECT: ("desconectar",),
+        CONNECT: ("conectar",),
+        FREE: ("grátis", "gratuit"),
+        DETAIL_LABEL: ("endereço", "ip", "tráfego", "volume", "atual", "total", "kb/s", "b/s"),
+    },
+    "nl": {
+        DISCONNECT: ("verbreken",),
+        CONNECT: ("verbinden",),
+        FREE: ("gratis",),
+        DETAIL_LABEL: ("adres", "ip", "verkeer", "volume", "huidig", "totaal", "kb/s", "b/s"),
+    },
+    "pl": {
+        DISCONNECT: ("rozłącz",),
+        CONNECT: ("połącz",),
+        FREE: ("darmow", "bezpłatn"),
+        DETAIL_LABEL: ("adres", "ip", "ruch", "wolumen", "bieżąc", "łączn", "kb/s", "b/s"),
+    },
+    "ru": {
+        DISCONNECT: ("отключ",),
+        CONNECT: ("подключ",),
+        FREE: ("бесплатн",),
+        DETAIL_LABEL: ("адрес", "ip", "трафик", "объём", "текущ", "всего", "кб/с", "б/с"),
+    },
+    "uk": {
+        DISCONNECT: ("відключ", "від'єдна"),
+        CONNECT: ("підключ", "з'єдна"),
+        FREE: ("безкоштовн",),
+        DETAIL_LABEL: ("адреса", "ip", "трафік", "обсяг", "поточн", "всього", "кб/с", "б/с"),
+    },
+    "tr": {
+        DISCONNECT: ("bağlantıyı kes",),
+        CONNECT: ("bağlan",),
+        FREE: ("ücretsiz",),
+        DETAIL_LABEL: ("adres", "ip", "trafik", "hacim", "mevcut", "toplam", "kb/s", "b/s"),
+    },
+    "cs": {
+        DISCONNECT: ("odpojit",),
+        CONNECT: ("připojit",),
+        FREE: ("zdarma",),
+        DETAIL_LABEL: ("adresa", "ip", "provoz", "objem", "aktuální", "celkem", "kb/s", "b/s"),
+    },
+    "sv": {
+        DISCONNECT: ("koppla från",),
+        CONNECT: ("anslut",),
+        FREE: ("gratis",),
+        DETAIL_LABEL: ("adress", "ip", "trafik", "volym", "aktuell", "totalt", "kb/s", "b/s"),
+    },
+    "nb": {
+        DISCONNECT: ("koble fra",),
+        CONNECT: ("koble til",),
+        FREE: ("gratis",),
+        DETAIL_LABEL: ("adresse", "ip", "trafikk", "volum", "nåværende", "totalt", "kb/s", "b/s"),
+    },
+    "da": {
+        DISCONNECT: ("afbryd",),
+        CONNECT: ("forbind",),
+        FREE: ("gratis",),
+        DETAIL_LABEL: ("adresse", "ip", "trafik", "volumen", "aktuel", "i alt", "kb/s", "b/s"),
+    },
+    "fi": {
+        DISCONNECT: ("katkaise",),
+        CONNECT: ("yhdistä",),
+        FREE: ("ilmai",),
+        DETAIL_LABEL: ("osoite", "ip", "liikenne", "määrä", "nykyinen", "yhteensä", "kb/s", "b/s"),
+    },
+    "ro": {
+        DISCONNECT: ("deconect",),
+        CONNECT: ("conect",),
+        FREE: ("gratuit",),
+        DETAIL_LABEL: ("adresă", "ip", "trafic", "volum", "curent", "total", "kb/s", "b/s"),
+    },
+    "hu": {
+        DISCONNECT: ("bontás", "leválaszt"),
+        CONNECT: ("csatlakoz",),
+        FREE: ("ingyenes",),
+        DETAIL_LABEL: ("cím", "ip", "forgalom", "mennyiség", "jelenlegi", "összes", "kb/s", "b/s"),
+    },
+    "ja": {
+        DISCONNECT: ("切断", "接続解除"),
+        CONNECT: ("接続",),
+        FREE: ("無料",),
+        DETAIL_LABEL: ("アドレス", "ip", "トラフィック", "現在", "合計", "kb/s", "b/s"),
+    },
+    "ko": {
+        DISCONNECT: ("연결 해제",),
+        CONNECT: ("연결",),
+        FREE: ("무료",),
+        DETAIL_LABEL: ("주소", "ip", "트래픽", "현재", "합계", "kb/s", "b/s"),
+    },
+    "zh": {
+        DISCONNECT: ("中斷連線", "断开"),
+        CONNECT: ("連線", "连接"),
+        FREE: ("免費", "免费"),
+        DETAIL_LABEL: ("位址", "地址", "ip", "流量", "目前", "總計", "kb/s", "b/s"),
+    },
+}
+
+LOCATION_LABELS = {
+    "fr": {LABEL_IP: ("votre adresse ip", "adresse ip", "ip"), LABEL_COUNTRY: ("pays",), LABEL_PROVIDER: ("fournisseur",)},
+    "en": {LABEL_IP: ("your ip address", "ip address", "ip"), LABEL_COUNTRY: ("country",), LABEL_PROVIDER: ("provider",)},
+    "de": {LABEL_IP: ("ihre ip-adresse", "ip-adresse"), LABEL_COUNTRY: ("land",), LABEL_PROVIDER: ("anbieter",)},
+    "es": {LABEL_IP: ("tu dirección ip", "dirección ip"), LABEL_COUNTRY: ("país",), LABEL_PROVIDER: ("proveedor",)},
+    "it": {LABEL_IP: ("il tuo indirizzo ip", "indirizzo ip"), LABEL_COUNTRY: ("paese",), LABEL_PROVIDER: ("fornitore",)},
+    "pt": {LABEL_IP: ("seu endereço ip", "endereço ip"), LABEL_COUNTRY: ("país",), LABEL_PROVIDER: ("provedor", "fornecedor")},
+    "nl": {LABEL_IP: ("je ip-adres", "ip-adres"), LABEL_COUNTRY: ("land",), LABEL_PROVIDER: ("aanbieder",)},
+    "pl": {LABEL_IP: ("twój adres ip", "adres ip"), LABEL_COUNTRY: ("kraj",), LABEL_PROVIDER: ("dostawca",)},
+    "ru": {LABEL_IP: ("ваш ip-адрес", "ip-адрес"), LABEL_COUNTRY: ("страна",), LABEL_PROVIDER: ("провайдер",)},
+    "uk": {LABEL_IP: ("ваша ip-адреса", "ip-адреса"), LABEL_COUNTRY: ("країна",), LABEL_PROVIDER: ("провайдер",)},
+    "tr": {LABEL_IP: ("ip adresiniz", "ip adresi"), LABEL_COUNTRY: ("ülke",), LABEL_PROVIDER: ("sağlayıcı",)},
+    "cs": {LABEL_IP: ("vaše ip adresa", "ip adresa"), LABEL_COUNTRY: ("země",), LABEL_PROVIDER: ("poskytovatel",)},
+    "sv": {LABEL_IP: ("din ip-adress", "ip-adress"), LABEL_COUNTRY: ("land",), LABEL_PROVIDER: ("leverantör",)},
+    "nb": {LABEL_IP: ("din ip-adresse", "ip-adresse"), LABEL_COUNTRY: ("land",), LABEL_PROVIDER: ("leverandør",)},
+    "da": {LABEL_IP: ("din ip-adresse", "ip-adresse"), LABEL_COUNTRY: ("land",), LABEL_PROVIDER: ("udbyder",)},
+    "fi": {LABEL_IP: ("ip-osoitteesi", "ip-osoite"), LABEL_COUNTRY: ("maa",), LABEL_PROVIDER: ("palveluntarjoaja",)},
+    "ro": {LABEL_IP: ("adresa ta ip", "adresa ip"), LABEL_COUNTRY: ("țară",), LABEL_PROVIDER: ("furnizor",)},
+    "hu": {LABEL_IP: ("az ön ip-címe", "ip-cím"), LABEL_COUNTRY: ("ország",), LABEL_PROVIDER: ("szolgáltató",)},
+    "ja": {LABEL_IP: ("あなたのipアドレス", "ipアドレス"), LABEL_COUNTRY: ("国",), LABEL_PROVIDER: ("プロバイダー",)},
+    "ko": {LABEL_IP: ("내 ip 주소", "ip 주소"), LABEL_COUNTRY: ("국가",), LABEL_PROVIDER: ("제공업체",)},
+    "zh": {LABEL_IP: ("您的 ip 位址", "ip 位址", "ip 地址"), LABEL_COUNTRY: ("國家", "国家"), LABEL_PROVIDER: ("供應商", "提供商")},
+}
+
+# Textes exacts de l'état affiché par un widget (activé / désactivé)
+WIDGET_STATES = {
+    "fr": {True: ("activé", "activée", "actif", "active", "on"), False: ("désactivé", "désactivée", "inactif", "inactive", "off")},
+    "en": {True: ("on", "enabled", "active"), False: ("off", "disabled", "inactive")},
+    "de": {True: ("an", "ein", "aktiviert", "aktiv"), False: ("aus", "deaktiviert", "inaktiv")},
+    "es": {True: ("activado", "activo"), False: ("desactivado", "inactivo")},
+    "it": {True: ("attivato", "attivo"), False: ("disattivato", "disattivo")},
+    "pt": {True: ("ativado", "ativo"), False: ("desativado", "inativo")},
+}
+
+# Noms des pays des serveurs ProtonVPN, tels qu'affichés sous le libellé "Pays"
+COUNTRY_NAMES = {
+    "fr": (
+        "Afrique du Sud", "Albanie", "Algérie", "Allemagne", "Angola", "Arabie saoudite", "Argentine",
+        "Australie", "Autriche", "Azerbaïdjan", "Bahreïn", "Bangladesh", "Belgique", "Bhoutan",
+        "Bosnie-Herzégovine", "Brésil", "Brunei", "Bulgarie", "Cambodge", "Canada", "Chili", "Chypre",
+        "Colombie", "Corée du Sud", "Costa Rica", "Croatie", "Danemark", "Égypte", "Émirats arabes unis",
+        "Équateur", "Espagne", "Estonie", "États-Unis", "Éthiopie", "Finlande", "France", "Géorgie",
+        "Ghana", "Grèce", "Hong Kong", "Hongrie", "Inde", "Indonésie", "Irlande", "Islande", "Israël",
+        "Italie", "Japon", "Jordanie", "Kazakhstan", "Kenya", "Koweït", "Lettonie", "Lituanie",
+        "Luxembourg", "Macédoine du Nord", "Malaisie", "Malte", "Maroc", "Maurice", "Mexique", "Moldavie",
+        "Mongolie", "Monténégro", "Mozambique", "Myanmar", "Népal", "Nigeria", "Norvège",
+        "Nouvelle-Zélande", "Oman", "Ouganda", "Pakistan", "Pays-Bas", "Pérou", "Philippines", "Pologne",
+        "Porto Rico", "Portugal", "Qatar", "République tchèque", "Tchéquie", "Roumanie", "Royaume-Uni",
+        "Russie", "Rwanda", "Salvador", "Sénégal", "Serbie", "Singapour", "Slovaquie", "Slovénie",
+        "Somalie", "Soudan", "Sri Lanka", "Suède", "Suisse", "Taïwan", "Tadjikistan", "Tanzanie",
+        "Tchad", "Thaïlande", "Togo", "Tunisie", "Turquie", "Ukraine", "Ouzbékistan", "Venezuela",
+        "Viêt Nam", "Vietnam", "Yémen", "Zambie", "Zimbabwe",
+    ),
+    "en": (
+        "Albania", "Algeria", "Angola", "Argentina", "Australia", "Austria", "Azerbaijan", "Bahrain",
+        "Bangladesh", "Belgium", "Bhutan", "Bosnia and Herzegovina", "Brazil", "Brunei", "Bulgaria",
+        "Cambodia", "Canada", "Chad", "Chile", "Colombia", "Costa Rica", "Croatia", "Cyprus", "Czechia",
+        "Czech Republic", "Denmark", "Ecuador", "Egypt", "El Salvador", "Estonia", "Ethiopia", "Finland",
+        "France", "Georgia", "Germany", "Ghana", "Greece", "Hong Kong", "Hungary", "Iceland", "India",
+        "Indonesia", "Ireland", "Israel", "Italy", "Japan", "Jordan", "Kazakhstan", "Kenya", "Kuwait",
+        "Latvia", "Lithuania", "Luxembourg", "Malaysia", "Malta", "Mauritius", "Mexico", "Moldova",
+        "Mongolia", "Montenegro", "Morocco", "Mozambique", "Myanmar", "Nepal", "Netherlands",
+        "New Zealand", "Nigeria", "North Macedonia", "Norway", "Oman", "Pakistan", "Peru", "Philippines",
+        "Poland", "Portugal", "Puerto Rico", "Qatar", "Romania", "Russia", "Rwanda", "Saudi Arabia",
+        "Senegal", "Serbia", "Singapore", "Slovakia", "Slovenia", "Somalia", "South Africa",
+        "South Korea", "Spain", "Sri Lanka", "Sudan", "Sweden", "Switzerland", "Taiwan", "Tajikistan",
+        "Tanzania", "Thailand", "Togo", "Tunisia", "Turkey", "Türkiye", "Uganda", "Ukraine",
+        "United Arab Emirates", "United Kingdom", "United States", "Uzbekistan", "Venezuela", "Vietnam",
+        "Yemen", "Zambia", "Zimbabwe",
+    ),
+}
+
+# Codes de langue NVDA/Windows -> dictionnaire
+LANGUAGE_ALIASES = {"no": "nb", "nn": "nb"}
+
+
+# ============================================================================
+# AUTOMATE
+# ============================================================================
+
+class KeywordMatcher:
+    """
+    Recherche simultanée de toutes les expressions (concept -> expressions).
+
+    Les expressions sont réunies en une alternative placée dans une assertion avant :
+    chaque position du texte est testée une fois, et les expressions qui se chevauchent
+    ("déconnecter" / "connecter") sont toutes reconnues.
+    """
+
+    def __init__(self, keywords):
+        self._concepts = {}
+        self._phrases = {}
+        for concept, phrases in keywords.items():
+            for phrase in phrases:
+                self._concepts.setdefault(phrase.lower(), set()).add(concept)
+            self._phrases[concept] = tuple(dict.fromkeys(phrase.lower() for phrase in phrases))
+        # Les plus longues d'abord : à une même position, l'expression la plus complète l'emporte
+        phrases = sorted(self._concepts, key=len, reverse=True)
+        self._regex = re.compile("(?=(" + "|".join(re.escape(phrase) for phrase in phrases) + "))") if phrases else None
+
+    def scan(self, text):
+        """Concepts dont au moins une expression apparaît dans le texte."""
+        if not text or self._regex is None:
+            return frozenset()
+        found = set()
+        for match in self._regex.finditer(text.lower()):
+            found.update(self._concepts[match.group(1)])
+        return frozenset(found)
+
+    def phrases(self, concept):
+        """Expressions (en minuscules) du concept."""
+        return self._phrases.get(concept, ())
+
+
+def get_ui_languages():
+    """Langues chargées : config.KEYWORD_LANGUAGES puis la langue de l'interface, si un dictionnaire existe."""
+    languages = [language for language in config.KEYWORD_LANGUAGES if language in KEYWORDS]
+    try:
+        import languageHandler
+        language = languageHandler.getLanguage().split("_")[0].lower()
+        language = LANGUAGE_ALIASES.get(language, language)
+    except:
+        language = None
+    if language in KEYWORDS and language not in languages:
+        languages.append(language)
+    return tuple(languages)
+
+
+_matcher = None
+_location_labels = None
+_widget_states = None
+_country_names = None
+
+
+def _load():
+    global _matcher, _location_labels, _widget_states, _country_names
+    languages = get_ui_languages()
+    keywords = {concept: list(phrases) for concept, phrases in COMMON_KEYWORDS.items()}
+    labels = {}
+    states = {}
+    countries = set()
+    for language in languages:
+        for concept, phrases in KEYWORDS[language].items():
+            keywords.setdefault(concept, []).extend(phrases)
+        for field, phrases in LOCATION_LABELS.get(language, {}).items():
+            for phrase in phrases:
+                labels.setdefault(phrase.lower(), field)
+        for state, phrases in WIDGET_STATES.get(language, {}).items():
+            for phrase in phrases:
+                states.setdefault(phrase.lower(), state)
+        countries.update(name.lower() for name in COUNTRY_NAMES.get(language, ()))
+    _matcher = KeywordMatcher(keywords)
+    _location_labels = labels
+    _widget_states = states
+    _country_names = frozenset(countries)
+
+
+def get_matcher():
+    if _matcher is None:
+        _load()
+    return _matcher
+
+
+def get_phrases(concept):
+    """Expressions du concept dans les langues chargées (conditions de recherche UIA)."""
+    return get_matcher().phrases(concept)
+
+
+@lru_cache(maxsize=1024)
+def scan_keywords(text):
+    """Concepts présents dans le texte (frozenset), en un seul parcours ; mémorisé par texte."""
+    return get_matcher().scan(text)
+
+
+def get_location_label_field(text):
+    """Champ ("ip", "pays", "fournisseur") dont `text` est le libellé exact, ou None."""
+    if _location_labels is None:
+        _load()
+    return _location_labels.get(text.lower())
+
+
+def get_widget_state_from_text(text):
+    """True / False si `text` est exactement un état affiché ("Activé", "Off"...), sinon None."""
+    if _widget_states is None:
+        _load()
+    return _widget_states.get(text.strip().lower())
+
+
+def is_country_name(text):
+    """True si `text` est exactement le nom d'un pays, dans une des langues chargées."""
+    if _country_names is None:
+        _load()
+    return text.strip().lower() in _country_names
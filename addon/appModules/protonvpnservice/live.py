@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+Etat tenu à jour par les événements UIA : valeurs de ConnectionDetailsPage,
+confirmation des changements d'état du VPN et surveillance de la connexion.
+"""
+
+import time
+
+import ui
+from logHandler import log
+from NVDAObjects.UIA import UIA
+
+from . import config, search
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .events import UIAEventSubscription, uia_events
+from .extractors import extract_connection_details_label_and_values
+from .scanning import automation_id_index, scan_worker
+from .textclassifier import ADDRESS_KINDS, classify_texts
+from .traversal import cached_children, walk
+from .uiautils import get_runtime_id
+
+
+# ============================================================================
+# MODELE EN MEMOIRE DE CONNECTIONDETAILSPAGE
+# ============================================================================
+
+class ConnectionDetailsValue:
+    """Valeur extraite d'un bouton ConnectionDetailsPage, avec l'heure de sa dernière mise à jour."""
+
+    __slots__ = ("label", "values", "updated_at")
+
+    def __init__(self, label, values, updated_at):
+        self.label = label
+        self.values = values
+        self.updated_at = updated_at
+
+    def as_text(self):
+        if self.values:
+            return f"{self.label} : {', '.join(self.values)}"
+        return self.label
+
+
+class ConnectionDetailsModel:
+    """
+    Modèle en mémoire de ConnectionDetailsPage (IP du VPN, trafic total, débit actuel).
+
+    Rattaché à la page trouvée par l'index des AutomationId (à jour après une passe de fond) ;
+    les trois boutons sont recherchés une fois sous la page et gardés. Alimenté par des
+    abonnements UIA PropertyChanged (Name) et StructureChanged sur la page : chaque rafale
+    d'événements déclenche une seule ré-extraction différée des boutons gardés, sans passer
+    par la fenêtre au premier plan. Les scripts lisent les valeurs en mémoire.
+    """
+
+    FIELDS = {
+        "ShowIpFlyoutButton": "vpn_ip",
+        "ShowVolumeFlyoutButton": "total_traffic",
+        "E": "current_throughput",
+    }
+
+    def __init__(self):
+        self._entries = {}
+        self._page = None
+        self._page_id = None
+        self._buttons = {}
+        self._buttons_stale = False
+        self._subscription = None
+        self._refresh_pending = False
+        self._attach_pending = False
+        # La page peut apparaître/disparaître (connexion/déconnexion)
+        self._page_checked = False
+
+    def get(self, field):
+        """Retourne la ConnectionDetailsValue du champ ("vpn_ip", "total_traffic", "current_throughput") ou None."""
+        return self._entries.get(field)
+
+    @property
+    def attached(self):
+        return self._page is not None
+
+    def on_window_structure_changed(self, runtime_id=None):
+        self._page_checked = False
+        if runtime_id is not None and runtime_id == self._page_id:
+            # Page retirée de la fenêtre (ChildRemoved) : ses abonnements ne recevront plus rien
+            self.detach()
+
+    def attach(self):
+        """
+        Rattache le modèle à la ConnectionDetailsPage courante (si elle a changé), d'après
+        l'index des AutomationId s'il est à jour ; aucun parcours de la fenêtre ici.
+        """
+        if self._page_checked and self.attached:
+            return True
+        if not automation_id_index.is_fresh():
+            return self.attached
+        page = automation_id_index.find("ConnectionDetailsPage")
+        page_id = get_runtime_id(page) if page else None
+        if page_id is not None and page_id == self._page_id:
+            self._page_checked = True
+            return True
+        self.detach()
+        self._page_checked = True
+        if not page:
+            return False
+        self._page = page
+        self._page_id = page_id
+        self._subscribe(page)
+        self._buttons_stale = True
+        self.refresh()
+        return self.attached
+
+    def attach_async(self):
+        """
+        Rattache le modèle après une passe de fond de l'index (window_scanner) si la page n'a
+        pas été cherchée depuis le dernier StructureChanged de la fenêtre.
+        """
+        if self.attached or self._page_checked or self._attach_pending:
+            return
+        self._attach_pending = True
+
+        def on_index():
+            self._attach_pending = False
+            self.attach()
+
+        automation_id_index.refresh_async(on_index, gesture=False)
+
+    def _find_buttons(self, page):
+        """Boutons de la page par AutomationId, en un FindAll sous la page : champ -> objet NVDA."""
+        import UIAHandler
+        client = UIAHandler.handler.clientObject
+        condition = search.all_of(
+            client,
+            search.element_condition(client, control_type=config.UIA_BUTTON_CONTROL_TYPE, framework_id="XAML"),
+            search.any_of(client, [
+                search.property_condition(client, UIAHandler.UIA_AutomationIdPropertyId, automation_id)
+                for automation_id in self.FIELDS
+            ]),
+        )
+        buttons = {}
+        for element in search.find_all(page.UIAElement, condition, UIAHandler.handler.baseCacheRequest):
+            field = self.FIELDS.get(element.cachedAutomationId)
+            if field is not None and field not in buttons:
+                buttons[field] = UIA(UIAElement=element)
+        return buttons
+
+    def _subscribe(self, page):
+        """Abonne la page aux événements Name et StructureChanged (depuis le thread de fond)."""
+        try:
+            import UIAHandler
+            subscription = UIAEventSubscription(page.windowHandle, self._page_id)
+            subscription.add_property_handler(self._on_page_property_changed, [UIAHandler.UIA_NamePropertyId])
+            subscription.add_structure_handler(self._on_page_structure_changed)
+            subscription.subscribe(lambda added: diag.debug(
+                "live.connection_details", "ConnectionDetailsPage events %s", "subscribed" if added else "not subscribed"))
+            self._subscription = subscription
+        except Exception as e:
+            log.error(f"PROTONVPN: ConnectionDetailsModel subscribe error: {e}")
+
+    def detach(self):
+        """Retire les abonnements UIA et oublie la page, ses boutons et les valeurs."""
+        if self._subscription is not None:
+            try:
+                self._subscription.unsubscribe()
+            except Exception as e:
+                log.error(f"PROTONVPN: ConnectionDetailsModel detach error: {e}")
+        self._page = None
+        self._page_id = None
+        self._buttons = {}
+        self._subscription = None
+        self._entries = {}
+        self._page_checked = False
+
+    def _on_page_property_changed(self, propertyId, runtime_id=None):
+        """NameChanged dans la page : propagé aux caches de l'add-on, puis ré-extraction."""
+        if runtime_id is not None:
+            uia_events.notify_name_changed(runtime_id)
+        self._on_page_event()
+
+    def _on_page_structure_changed(self, runtime_id=None):
+        """StructureChanged dans la page : les boutons gardés sont recherchés à nouveau sous la page."""
+        self._buttons_stale = True
+        self._on_page_event()
+
+    def _on_page_event(self, *args):
+        """Regroupe les événements d'une même rafale en une seule ré-extraction."""
+        if self._refresh_pending:
+            return
+        self._refresh_pending = True
+        try:
+            import wx
+            wx.CallLater(config.CONNECTION_DETAILS_REFRESH_DELAY_MS, self._deferred_refresh)
+        except:
+            self._deferred_refresh()
+
+    def _deferred_refresh(self):
+        self._refresh_pending = False
+        self.refresh()
+
+    def refresh(self):
+        """Ré-extrait les valeurs des boutons gardés (recherchés sous la page après un StructureChanged)."""
+        if not self.attached:
+            return
+        if self._buttons_stale:
+            try:
+                self._buttons = self._find_buttons(self._page)
+                self._buttons_stale = False
+            except Exception as e:
+                # Page disparue : le prochain attach la cherchera à nouveau
+                log.error(f"PROTONVPN: ConnectionDetailsModel buttons lookup error: {e}")
+                self.detach()
+                return
+        now = time.time()
+        for field in self.FIELDS.values():
+            obj = self._buttons.get(field)
+            if obj is None:
+                self._entries.pop(field, None)
+                continue
+            try:
+                label, values = extract_connection_details_label_and_values(obj)
+                previous = self._entries.get(field)
+                if previous and previous.label == label and previous.values == values:
+                    continue
+                self._entries[field] = ConnectionDetailsValue(label, values, now)
+            except Exception as e:
+                log.error(f"PROTONVPN: ConnectionDetailsModel refresh error ({field}): {e}")
+
+
+connection_details = ConnectionDetailsModel()
+uia_events.add_structure_listener(connection_details.on_window_structure_changed)
+
+
+# ============================================================================
+# CONFIRMATION DE CONNEXION / DECONNEXION
+# ============================================================================
+
+class VpnStateTransitionWaiter:
+    """
+    Attend l'échange ConnectionCardConnectButton <-> ConnectionCardDisconnectButton
+    après un clic, à partir des événements UIA (StructureChanged / NameChanged).
+
+    Confirme dès que le bouton attendu apparaît, annonce périodiquement
+    "connexion en cours" et abandonne après VPN_CONFIRM_TIMEOUT_MS.
+    La latence clic -> confirmation est journalisée.
+    """
+
+    def __init__(self):
+        self._expected_id = None
+        self._was_disconnecting = False
+        self._started = None
+        self._check_pending = False
+        self._progress_timer = None
+        self._timeout_timer = None
+
+    @property
+    def active(self):
+        return self._expected_id is not None
+
+    def start(self, was_disconnecting):
+        """Commence l'attente ; remplace une attente en cours."""
+        import wx
+        self.cancel()
+        self._was_disconnecting = was_disconnecting
+        self._expected_id = "ConnectionCardConnectButton" if was_disconnecting else "ConnectionCardDisconnectButton"
+        self._started = time.perf_counter()
+        self._progress_timer = wx.CallLater(config.VPN_CONFIRM_PROGRESS_MS, self._on_progress)
+        self._timeout_timer = wx.CallLater(config.VPN_CONFIRM_TIMEOUT_MS, self._on_timeout)
+        # L'échange a pu avoir lieu avant l'abonnement
+        self._schedule_check()
+
+    def cancel(self):
+        for timer in (self._progress_timer, self._timeout_timer):
+            if timer is not None:
+                try:
+                    timer.Stop()
+                except:
+                    pass
+        self._progress_timer = None
+        self._timeout_timer = None
+        self._expected_id = None
+
+    def on_uia_event(self, runtime_id=None):
+        if self.active:
+            self._schedule_check()
+
+    def _schedule_check(self):
+        """Regroupe une rafale d'événements en une seule vérification."""
+        if self._check_pending:
+            return
+        self._check_pending = True
+        import wx
+        wx.CallLater(config.VPN_CONFIRM_CHECK_DELAY_MS, self._check)
+
+    def _check(self):
+        self._check_pending = False
+        if not self.active:
+            return
+        # L'index est reconstruit dans le thread de fond si nécessaire
+        automation_id_index.refresh_async(self._check_index, gesture=False)
+
+    def _check_index(self):
+        if not self.active:
+            return
+        try:
+            if automation_id_index.find(self._expected_id):
+                self._confirm()
+        except Exception as e:
+            log.error(f"PROTONVPN: VpnStateTransitionWaiter check error: {e}")
+
+    def _confirm(self):
+        latency_ms = (time.perf_counter() - self._started) * 1000
+        was_disconnecting = self._was_disconnecting
+        self.cancel()
+        # Déjà annoncé : la surveillance de la connexion ne le répète pas
+        connection_watchdog.expect(not was_disconnecting)
+        if was_disconnecting:
+            ui.message("VPN déconnecté")
+            diag.info("live.vpn_state", "VPN disconnected confirmed (%.0f ms after click)", latency_ms)
+        else:
+            ui.message("VPN connecté")
+            diag.info("live.vpn_state", "VPN connected confirmed (%.0f ms after click)", latency_ms)
+
+    def _on_progress(self):
+        if not self.active:
+            return
+        ui.message("Déconnexion en cours" if self._was_disconnecting else "Connexion en cours")
+        self._progress_timer.Restart(config.VPN_CONFIRM_PROGRESS_MS)
+        # Filet de sécurité si aucun événement n'a signalé l'échange : nouvelle passe de fond
+        # (le bouton peut changer d'AutomationId sans StructureChanged)
+        automation_id_index.refresh_async(self._check_index, gesture=False, force=True)
+
+    def _on_timeout(self):
+        if not self.active:
+            return
+        latency_ms = (time.perf_counter() - self._started) * 1000
+        self.cancel()
+        ui.message("État du VPN non confirmé")
+        diag.info("live.vpn_state", "VPN state change not confirmed after %.0f ms", latency_ms)
+
+
+vpn_state_waiter = VpnStateTransitionWaiter()
+uia_events.add_structure_listener(vpn_state_waiter.on_uia_event)
+uia_events.add_name_listener(vpn_state_waiter.on_uia_event)
+
+
+# ============================================================================
+# SURVEILLANCE DE LA CONNEXION
+# ============================================================================
+
+def scan_connection_state(client, root, job):
+    """
+    Recherche de fond : (connecté, IP du VPN ou None) d'après le bouton de ConnectionCard et
+    les textes de ShowIpFlyoutButton ; None si aucun des deux boutons n'est présent.
+    """
+    import UIAHandler
+    request = client.CreateCacheRequest()
+    request.AddProperty(UIAHandler.UIA_AutomationIdPropertyId)
+    request.AddProperty(UIAHandler.UIA_NamePropertyId)
+    button = search.find_first(root, search.any_of(client, [
+        search.property_condition(client, UIAHandler.UIA_AutomationIdPropertyId, automation_id)
+        for automation_id in ("ConnectionCardDisconnectButton", "ConnectionCardConnectButton")
+    ]), request)
+    if not button:
+        return None
+    connected = button.cachedAutomationId == "ConnectionCardDisconnectButton"
+    if not connected:
+        return False, None
+    job.check()
+    request.TreeScope = UIAHandler.TreeScope_Subtree
+    ip_button = search.find_first(root, search.element_condition(client, automation_id="ShowIpFlyoutButton"), request)
+    texts = []
+    if ip_button:
+        walk(ip_button, cached_children, lambda element, depth, context: texts.append(element.cachedName or ""),
+             "watchdog_ip", max_depth=5)
+    ip = next((token.value for token in classify_texts(texts) if token.kind in ADDRESS_KINDS), None)
+    return True, ip
+
+
+class ConnectionWatchdog:
+    """
+    Surveillance facultative de la connexion VPN, annoncée même quand ProtonVPN n'est pas au
+    premier plan : bouton ConnectionCardConnectButton / ConnectionCardDisconnectButton et IP
+    du VPN, relevés par une recherche native dans le thread de fond (deux FindFirst au plus).
+
+    La fenêtre surveillée est celle du dernier gainFocus. Le sondage double son intervalle tant
+    que l'état est stable (CONNECTION_WATCHDOG_MIN_INTERVAL_MS → MAX_INTERVAL_MS) ; un
+    changement ou un événement StructureChanged le ramène au minimum. Aucun sondage sans fenêtre.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.window_handle = None
+        self.connected = None
+        self.vpn_ip = None
+        self.interval_ms = config.CONNECTION_WATCHDOG_MIN_INTERVAL_MS
+        self._timer = None
+        self._due = None
+        self._job = None
+        self.checks = 0
+        self.changes = 0
+
+    def start(self, window_handle=None):
+        self.enabled = True
+        if window_handle:
+            self.window_handle = window_handle
+        self._tighten()
+
+    def stop(self):
+        self.enabled = False
+        self._stop_timer()
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self.connected = None
+        self.vpn_ip = None
+
+    def set_window(self, window_handle):
+        """Appelé par event_appModule_gainFocus : fenêtre ProtonVPN à surveiller."""
+        if not window_handle or window_handle == self.window_handle:
+            return
+        self.window_handle = window_handle
+        if self.enabled:
+            self._tighten()
+
+    def expect(self, connected):
+        """État déjà annoncé par ailleurs (confirmation d'un Ctrl+Shift+D) : enregistré sans annonce."""
+        if self.enabled and connected != self.connected:
+            self.connected = connected
+            self.vpn_ip = None
+            self._tighten()
+
+    def on_structure_changed(self, runtime_id=None):
+        if self.enabled:
+            self._tighten()
+
+    def _tighten(self):
+        """Ramène l'intervalle au minimum ; avance le prochain sondage s'il est plus lointain."""
+        self.interval_ms = config.CONNECTION_WATCHDOG_MIN_INTERVAL_MS
+        if self._timer is not None and self._due - time.monotonic() <= self.interval_ms / 1000.0:
+            return
+        self._schedule(self.interval_ms)
+
+    def _schedule(self, delay_ms):
+        import wx
+        self._stop_timer()
+        self._due = time.monotonic() + delay_ms / 1000.0
+        self._timer = wx.CallLater(delay_ms, self._poll)
+
+    def _stop_timer(self):
+        if self._timer is not None:
+            try:
+                self._timer.Stop()
+            except:
+                pass
+        self._timer = None
+
+    def _poll(self):
+        self._timer = None
+        if not self.enabled or self._job is not None:
+            return
+        if not self._is_window(self.window_handle):
+            diag.debug("live.watchdog", "ProtonVPN window gone, polling suspended")
+            self.window_handle = None
+            return
+        if uia_breaker.should_skip():
+            # ProtonVPN ne répond plus : sondage reporté, sans appel UIA
+            self._schedule(self.interval_ms)
+            return
+        checks = self.checks
+        job = scan_worker.submit(scan_connection_state, self._on_state, self.window_handle, gesture=False)
+        if self.checks == checks:
+            # Réponse attendue du thread de fond (sans lui, elle a déjà été livrée)
+            self._job = job
+
+    @staticmethod
+    def _is_window(window_handle):
+        if not window_handle:
+            return False
+        try:
+            import winUser
+            return bool(winUser.isWindow(window_handle))
+        except:
+            return True
+
+    def _on_state(self, state):
+        self._job = None
+        if not self.enabled:
+            return
+        self.checks += 1
+        if state is not None and self._apply(*state):
+            self.interval_ms = config.CONNECTION_WATCHDOG_MIN_INTERVAL_MS
+        else:
+            self.interval_ms = min(self.interval_ms * 2, config.CONNECTION_WATCHDOG_MAX_INTERVAL_MS)
+        self._schedule(self.interval_ms)
+
+    def _apply(self, connected, vpn_ip):
+        """Enregistre l'état relevé ; annonce un changement. Retourne True si l'état a changé."""
+        previous_connected, previous_ip = self.connected, self.vpn_ip
+        self.connected, self.vpn_ip = connected, vpn_ip
+        if previous_connected is None:
+            # Premier relevé : état de référence, rien à annoncer
+            return False
+        if connected == previous_connected and (not connected or vpn_ip is None or vpn_ip == previous_ip):
+            if connected and vpn_ip is None:
+                self.vpn_ip = previous_ip
+            return False
+        self.changes += 1
+        diag.info("live.watchdog", "VPN state changed: connected=%s ip=%s", connected, vpn_ip)
+        if vpn_state_waiter.active:
+            # Changement demandé par Ctrl+Shift+D : la confirmation l'annoncera
+            return True
+        if not connected:
+            ui.message("VPN déconnecté")
+        elif connected != previous_connected:
+            ui.message(f"VPN connecté, adresse IP du VPN : {vpn_ip}" if vpn_ip else "VPN connecté")
+        else:
+            ui.message(f"Adresse IP du VPN : {vpn_ip}")
+        return True
+
+
+connection_watchdog = ConnectionWatchdog()
+uia_events.add_structure_listener(connection_watchdog.on_structure_changed)
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Classes overlay des boutons ProtonVPN (noms et descriptions accessibles) et cache des
+valeurs extraites (noms, descriptions, enregistrements de page).
+"""
+
+import functools
+import sys
+import time
+from collections import OrderedDict
+
+from NVDAObjects.UIA import UIA
+
+from . import config, keywords
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .detectors import count_same_type_siblings_before, get_location_button_index, get_location_button_label
+from .extractors import (
+    LOCATION_LABEL_TYPES,
+    extract_connection_details_label_and_values,
+    extract_dynamic_value,
+    extract_overlay_promo_text,
+    extract_vpn_plus_long_text,
+)
+from .events import uia_events
+from .instrumentation import instrumented
+from .keywords import scan_keywords
+from .textclassifier import extract_location_page_record, select_value
+from .uiautils import (
+    add_collected_runtime_ids,
+    collect_subtree_runtime_ids,
+    get_automation_id,
+    get_bounding_rect,
+    get_runtime_id,
+    sibling_index,
+)
+
+
+# ============================================================================
+# CACHE DES VALEURS EXTRAITES
+# ============================================================================
+
+def _get_fingerprint(obj):
+    """
+    Empreinte de structure de l'élément, sans appel UIA : classe overlay choisie par la table
+    de règles, ControlType et AutomationId du cache de base de NVDA (baseCacheRequest).
+    Un RuntimeId recyclé pour un élément d'un autre type ne retrouve pas l'entrée de l'ancien ;
+    entre éléments de même empreinte, le ChildRemoved de l'ancien l'a déjà invalidée.
+    """
+    element = getattr(obj, 'UIAElement', None)
+    try:
+        return type(obj).__name__, element.cachedControlType, element.cachedAutomationId or ""
+    except:
+        return type(obj).__name__, None, None
+
+
+def estimate_size(value, _depth=0):
+    """Taille approximative en octets d'une valeur mise en cache (chaînes, conteneurs, objets à slots)."""
+    size = sys.getsizeof(value)
+    if _depth >= 4 or isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _depth + 1) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if attributes is None:
+        attributes = {name: getattr(value, name, None) for name in getattr(type(value), '__slots__', ())}
+    return size + sum(estimate_size(v, _depth + 1) for v in attributes.values())
+
+
+class OverlayTextCache:
+    """
+    Valeurs extraites pour les overlays (noms, descriptions, enregistrements de page),
+    communes à tout le processus : une nouvelle instance NVDAObject du même élément les retrouve.
+
+    Clé : (RuntimeId, empreinte de structure, attribut). Chaque entrée retient les RuntimeId
+    du sous-arbre lu pendant le calcul : un événement NameChanged ou StructureChanged sur
+    l'élément ou l'un de ces noeuds l'invalide (ChildRemoved compris, avant que UIA ne
+    recycle le RuntimeId de l'élément retiré). L'âge maximal couvre les changements non
+    signalés (frères et parents lus en repli, enfants ajoutés). Nombre d'entrées et taille
+    totale estimée bornés, éviction LRU ; vidé quand ProtonVPN perd le focus.
+    """
+
+    def __init__(self, max_size=config.OVERLAY_TEXT_CACHE_MAX_SIZE, max_age_s=config.OVERLAY_TEXT_CACHE_MAX_AGE_S,
+                 max_bytes=config.OVERLAY_TEXT_CACHE_MAX_BYTES):
+        self.max_size = max_size
+        self.max_age_s = max_age_s
+        self.max_bytes = max_bytes
+        # (runtime_id, empreinte, attribut) -> (valeur, expiration, RuntimeId dépendants, taille)
+        self._entries = OrderedDict()
+        # RuntimeId -> clés des entrées qui en dépendent
+        self._dependents = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_or_compute(self, obj, attribute, compute):
+        """Valeur mémorisée de obj pour `attribute`, calculée par compute(obj) si absente."""
+        runtime_id = get_runtime_id(obj)
+        if runtime_id is None:
+            self.misses += 1
+            return compute(obj)
+        return self._get_or_compute((runtime_id, _get_fingerprint(obj), attribute), runtime_id, obj, compute)
+
+    def get_or_compute_for_parent(self, obj, parent_runtime_id, attribute, compute):
+        """
+        Valeur commune aux enfants d'un même parent (enregistrement de page), mémorisée une
+        seule fois sous le RuntimeId du parent ; calculée par compute(obj) si absente.
+        """
+        return self._get_or_compute((parent_runtime_id, None, attribute), parent_runtime_id, obj, compute)
+
+    def _get_or_compute(self, key, runtime_id, obj, compute):
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry[1]:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                # Une valeur englobante calculée à partir de celle-ci en hérite les dépendances
+                add_collected_runtime_ids(entry[2])
+                return entry[0]
+            self.expirations += 1
+            self._remove(key)
+        self.misses += 1
+        with collect_subtree_runtime_ids() as runtime_ids:
+            value = compute(obj)
+        runtime_ids.add(runtime_id)
+        if uia_breaker.is_open:
+            # Disjoncteur déclenché pendant l'extraction : valeur incomplète, non mémorisée
+            return value
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return value
+        self._remove(key)
+        self._entries[key] = (value, now + self.max_age_s, runtime_ids, size)
+        self._bytes += size
+        for dependency in runtime_ids:
+            self._dependents.setdefault(dependency, set()).add(key)
+        while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return value
+
+    def peek(self, obj, attribute):
+        """
+        Valeur mémorisée de obj pour `attribute`, même expirée, sans calcul ni appel UIA
+        (RuntimeId déjà mémorisé sur l'objet, empreinte lue dans le cache) ; None si absente. Repli du disjoncteur ouvert.
+        """
+        runtime_id = getattr(obj, '_protonvpnRuntimeId', None)
+        if runtime_id is None:
+            return None
+        entry = self._entries.get((runtime_id, _get_fingerprint(obj), attribute))
+        return entry[0] if entry is not None else None
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[3]
+        for dependency in entry[2]:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+
+    def invalidate(self, runtime_id):
+        """Oublie les entrées qui dépendent de l'élément runtime_id (None : toutes)."""
+        if runtime_id is None:
+            self.clear()
+            return
+        keys = self._dependents.get(runtime_id)
+        if not keys:
+            return
+        for key in list(keys):
+            self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._dependents.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (
+            f"Overlay text cache: {stats['entries']} entries ({stats['bytes']} bytes), {stats['hits']} hits, "
+            f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['expirations']} expired, "
+            f"{stats['invalidations']} invalidated, {stats['evictions']} evicted\n"
+        )
+
+    def reset_stats(self):
+        self.hits = self.misses = self.expirations = self.invalidations = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+overlay_text_cache = OverlayTextCache()
+uia_events.add_name_listener(overlay_text_cache.invalidate)
+uia_events.add_structure_listener(overlay_text_cache.invalidate)
+
+
+def memoized_text(attribute):
+    """
+    Décorateur de propriété : valeur mémorisée dans overlay_text_cache sous `attribute`.
+    Disjoncteur ouvert (ProtonVPN ne répond plus) : valeur en cache, même expirée, ou
+    valeur d'origine de la propriété, sans extraction.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self):
+            if uia_breaker.should_skip():
+                value = overlay_text_cache.peek(self, attribute)
+                return value if value is not None else get_original_value(self, attribute)
+            return overlay_text_cache.get_or_compute(self, attribute, func)
+        return wrapper
+    return decorator
+
+
+def get_original_value(obj, attribute):
+    """Valeur de la propriété sans overlay : celle de la classe qui suit l'overlay dans la MRO."""
+    for cls in type(obj).__mro__:
+        if cls.__module__ == __name__:
+            return getattr(super(cls, obj), attribute)
+    return getattr(obj, attribute)
+
+
+# ============================================================================
+# CLASSES OVERLAY
+# ============================================================================
+
+class ProtonVPNConnectButton(UIA):
+    """Overlay pour le bouton principal Connecter/Déconnecter."""
+
+    @property
+    @instrumented("ProtonVPNConnectButton.name")
+    def name(self):
+        original_name = super().name or ""
+        automationId = get_automation_id(self)
+
+        found = scan_keywords(original_name)
+        if keywords.DISCONNECT in found:
+            return "Déconnecter le VPN"
+        if keywords.CONNECT in found:
+            return "Connecter le VPN"
+        if automationId == "ConnectionCardConnectButton":
+            return "Connecter le VPN"
+
+        return original_name or "Bouton connexion VPN"
+
+
+class ProtonVPNLocationDetailsButton(UIA):
+    """Overlay pour les 3 boutons dynamiques de LocationDetailsPage."""
+
+    @property
+    @instrumented("ProtonVPNLocationDetailsButton.name")
+    @memoized_text("name")
+    def name(self):
+        index = get_location_button_index(self)
+        label = get_location_button_label(index)
+        value = self._get_page_value(index)
+        
+        if value:
+            result = f"{label} : {value}"
+        else:
+            result = label
+        
+        diag.debug("overlays.location.name", "LocationDetailsButton.name → \"%s\" (index=%s)", result, index)
+        
+        return result
+
+    def _get_page_value(self, index):
+        """
+        Valeur du bouton lue dans l'enregistrement de LocationDetailsPage, extrait une seule
+        fois et mémorisé sous le RuntimeId du parent (lu par l'index des frères, déjà construit
+        pour l'index du bouton) ; à défaut, extraction propre au bouton.
+        """
+        parent_runtime_id = sibling_index.get_parent_runtime_id(self)
+        record = None
+        if parent_runtime_id is not None:
+            record = overlay_text_cache.get_or_compute_for_parent(
+                self, parent_runtime_id, "location_page", extract_location_page_record
+            )
+        tokens = record.tokens_for(get_runtime_id(self)) if record else None
+        if tokens:
+            return select_value(tokens, LOCATION_LABEL_TYPES.get(index, "unknown"))
+        return extract_dynamic_value(self, index)
+
+
+class ProtonVPNConnectionDetailsButton(UIA):
+    """
+    Overlay pour les boutons dynamiques de ConnectionDetailsPage.
+    
+    Annonce: "Label : Valeur(s)" (ex: "Adresse IP du VPN : 37.19.199.137")
+    """
+
+    @property
+    @instrumented("ProtonVPNConnectionDetailsButton.name")
+    @memoized_text("name")
+    def name(self):
+        automationId = get_automation_id(self)
+        label, values = extract_connection_details_label_and_values(self)
+        
+        if values:
+            values_str = ", ".join(values)
+            result = f"{label} : {values_str}"
+        else:
+            result = label
+        
+        diag.debug("overlays.connection_details.name", "ConnectionDetailsButton.name → \"%s\" (ID=%s)", result, automationId)
+        
+        return result
+
+
+class ProtonVPNOverlayPromoButton(UIA):
+    """
+    Overlay pour la carte promo dans OverlayMessage.
+    
+    Construit dynamiquement un label à partir des descendants Text.
+    """
+
+    @property
+    @instrumented("ProtonVPNOverlayPromoButton.name")
+    @memoized_text("name")
+    def name(self):
+        promo_text = extract_overlay_promo_text(self)
+        
+        diag.debug("overlays.overlay_promo.name", "OverlayPromoButton.name → \"%s...\"", promo_text[:60])
+        
+        return promo_text
+
+
+class ProtonVPNPlusPromoButton(UIA):
+    """
+    Overlay pour le bouton VPN Plus promo.
+    
+    - name = "Passer à VPN Plus" (court, pour le focus)
+    - description = texte marketing long (accessible via NVDA+Tab ou Ctrl+Shift+L)
+    """
+
+    @property
+    @instrumented("ProtonVPNPlusPromoButton.name")
+    def name(self):
+        return "Passer à VPN Plus"
+    
+    @property
+    @instrumented("ProtonVPNPlusPromoButton.description")
+    @memoized_text("description")
+    def description(self):
+        """Retourne le texte marketing long pour NVDA+Tab."""
+        long_text = extract_vpn_plus_long_text(self)
+        
+        diag.debug("overlays.plus_promo.description", "VPNPlusPromoButton.description → \"%s...\"", long_text[:80])
+        
+        return long_text
+
+
+class ProtonVPNWidgetButton(UIA):
+    """Overlay pour les widgets colonne droite."""
+
+    @property
+    @instrumented("ProtonVPNWidgetButton.name")
+    def name(self):
+        original_name = super().name or ""
+        
+        if original_name and len(original_name.strip()) > 2:
+            if original_name not in ("Bouton widget ProtonVPN", "Bouton ProtonVPN", "Bouton sans nom"):
+                return original_name
+        
+        # Widget déjà identifié par le registre (mots-clés de ses textes) : pas de devinette
+        from .widgets import widget_registry
+        info = widget_registry.get_by_runtime_id(get_runtime_id(self))
+        if info is not None:
+            return info.label
+
+        # ProtonVPN ne répond plus : pas de lecture des frères
+        if uia_breaker.should_skip():
+            return original_name or "Widget"
+        
+        index = count_same_type_siblings_before(self)
+        
+        if index == 0:
+            label = "NetShield"
+        elif index == 1:
+            label = "Arrêt d'urgence (Kill switch)"
+        elif index == 2:
+            label = "Split tunneling"
+        else:
+            rect = get_bounding_rect(self)
+            if rect:
+                y = rect[1]
+                if y < 200:
+                    label = "NetShield"
+                elif y < 400:
+                    label = "Arrêt d'urgence (Kill switch)"
+                else:
+                    label = "Split tunneling"
+            else:
+                label = f"Widget {index + 1}"
+        
+        diag.debug("overlays.widget.name", "WidgetButton.name → \"%s\" (index=%s)", label, index)
+        
+        return label
+
+
+class ProtonVPNSideWidgetButton(UIA):
+    """Overlay pour les widgets avec AutomationId spécifique."""
+
+    AUTOMATION_ID_MAPPING = {
+        "PortForwardingWidgetButton": "Redirection de port",
+        "SettingsButton": "Paramètres",
+        "TitleBarMenuButton": "Menu principal",
+    }
+
+    @property
+    @instrumented("ProtonVPNSideWidgetButton.name")
+    def name(self):
+        original_name = super().name or ""
+        automationId = get_automation_id(self)
+
+        if original_name and len(original_name.strip()) > 0:
+            if original_name not in ("Bouton widget ProtonVPN", "Bouton ProtonVPN"):
+                return original_name
+
+        if automationId in self.AUTOMATION_ID_MAPPING:
+            return self.AUTOMATION_ID_MAPPING[automationId]
+
+        if automationId:
+            return f"Bouton {automationId}"
+
+        return "Bouton ProtonVPN"
+
+
+class ProtonVPNGenericButton(UIA):
+    """Overlay générique pour les boutons sans nom (fallback)."""
+
+    @property
+    @instrumented("ProtonVPNGenericButton.name")
+    def name(self):
+        original_name = super().name or ""
+        automationId = get_automation_id(self)
+
+        if original_name and len(original_name.strip()) > 2:
+            return original_name
+
+        if automationId:
+            return f"Bouton ({automationId})"
+
+        return "Bouton sans nom"
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Chemins des fichiers produits par l'add-on (inspection, instantanés, rapports).
+"""
+
+import os
+from datetime import datetime
+
+import addonHandler
+
+
+def get_addon_path():
+    """Recupere le chemin du dossier de l'add-on."""
+    try:
+        addon = addonHandler.getCodeAddon()
+        if addon:
+            return addon.path
+    except Exception:
+        pass
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def get_uia_info_file_path():
+    """Retourne le chemin du fichier uiainfo.txt."""
+    return os.path.join(get_addon_path(), "uiainfo.txt")
+
+def get_uia_snapshot_file_path():
+    """Retourne le chemin d'un nouveau fichier d'instantané de l'arbre UIA (horodaté)."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(get_addon_path(), f"uiatree-{stamp}.json")
+
+def get_latency_report_file_path():
+    """Retourne le chemin d'un nouveau rapport de latences (horodaté)."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(get_addon_path(), f"latency-{stamp}.txt")
+
+
+def get_diagnostics_file_path():
+    """Retourne le chemin d'un nouveau fichier d'événements de diagnostic (horodaté)."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(get_addon_path(), f"diagnostics-{stamp}.txt")
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""
+Thread de parcours UIA (MTA) et index des AutomationId de la fenêtre ProtonVPN.
+"""
+
+import queue
+import threading
+from array import array
+
+import api
+from logHandler import log
+from NVDAObjects.UIA import UIA
+
+from . import config, search
+from .diagnostics import diag
+from .events import uia_events
+from .instrumentation import first_gesture
+
+
+# ============================================================================
+# THREAD DE PARCOURS UIA (MTA)
+# ============================================================================
+
+class ScanCancelled(Exception):
+    """Levée dans le thread de parcours quand la requête a été remplacée."""
+
+
+class ScanJob:
+    """Requête de parcours soumise au thread de fond."""
+
+    def __init__(self, worker, generation, func, callback, window_handle, required=False):
+        self.worker = worker
+        self.generation = generation
+        self.func = func
+        self.callback = callback
+        self.window_handle = window_handle
+        # Exécutée même à l'arrêt du thread (retrait des abonnements aux événements)
+        self.required = required
+        self._cancelled = False
+
+    def cancel(self):
+        """Annule cette requête seule (p.ex. le préchauffage, interrompu par un appui de touche)."""
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        if self.required:
+            return False
+        if self._cancelled or self.worker.stopping:
+            return True
+        # generation None : tâche de fond, jamais remplacée par un geste
+        return self.generation is not None and self.generation != self.worker.generation
+
+    def check(self):
+        if self.cancelled:
+            raise ScanCancelled()
+
+    def deliver(self, result):
+        """Appelé sur le thread principal."""
+        if not self.cancelled and self.callback is not None:
+            self.callback(result)
+
+
+class UIAScanWorker:
+    """
+    Thread de fond avec son propre appartement COM (MTA) et son propre client UIA.
+
+    Les parcours d'arbre y sont exécutés pour ne jamais bloquer la parole et la saisie
+    quand le fournisseur UIA de ProtonVPN est lent. Les résultats reviennent au thread
+    principal via wx.CallAfter ; un geste plus récent annule les requêtes de geste en cours.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._ready = threading.Event()
+        self.client = None
+        self.available = False
+        self.generation = 0
+        self.stopping = False
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.stopping = False
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="ProtonVPNScanWorker", daemon=True)
+        self._thread.start()
+        self._ready.wait(config.WORKER_START_TIMEOUT_S)
+
+    def _run(self):
+        try:
+            import comtypes
+            import comtypes.client
+            import UIAHandler
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        except Exception as e:
+            log.error(f"PROTONVPN: scan worker COM init error: {e}")
+            self._ready.set()
+            return
+        try:
+            try:
+                self.client = comtypes.client.CreateObject(UIAHandler.CUIAutomation8, interface=UIAHandler.IUIAutomation)
+            except Exception:
+                self.client = comtypes.client.CreateObject(UIAHandler.CUIAutomation, interface=UIAHandler.IUIAutomation)
+            self.available = True
+            self._ready.set()
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                self._execute(job, self.client)
+        except Exception as e:
+            log.error(f"PROTONVPN: scan worker error: {e}")
+        finally:
+            self.available = False
+            self.client = None
+            self._ready.set()
+            try:
+                comtypes.CoUninitialize()
+            except Exception:
+                pass
+
+    def _execute(self, job, client):
+        if job.cancelled:
+            return
+        try:
+            root = client.ElementFromHandle(job.window_handle) if job.window_handle else None
+            result = job.func(client, root, job)
+        except ScanCancelled:
+            diag.debug("scanning.cancelled", "scan %s cancelled", job.func.__name__)
+            return
+        except Exception as e:
+            log.error(f"PROTONVPN: scan {job.func.__name__} error: {e}")
+            result = None
+        import wx
+        wx.CallAfter(job.deliver, result)
+
+    def submit(self, func, callback, window_handle=None, gesture=True):
+        """
+        Exécute func(client, root_element, job) dans le thread de fond, puis callback(result)
+        sur le thread principal. gesture=True annule les requêtes de geste précédentes.
+        Sans thread disponible, le parcours est exécuté immédiatement sur le thread principal.
+        """
+        if window_handle is None:
+            fg = api.getForegroundObject()
+            window_handle = getattr(fg, 'windowHandle', None) if fg else None
+        if gesture:
+            self.generation += 1
+        job = ScanJob(self, self.generation if gesture else None, func, callback, window_handle)
+        if not window_handle:
+            job.deliver(None)
+            return job
+        self._dispatch(job)
+        return job
+
+    def run(self, func, callback=None):
+        """
+        Exécute func(client, None, job) dans le thread de fond, sans fenêtre racine ni annulation
+        (même à l'arrêt du thread), puis callback(result) sur le thread principal. Sert aux
+        ajouts et retraits de handlers d'événements UIA, faits depuis le MTA comme dans NVDA.
+        """
+        job = ScanJob(self, None, func, callback, None, required=True)
+        if self._thread is None and self.stopping:
+            # Thread arrêté (terminate) : exécution immédiate
+            self._run_inline(job)
+        else:
+            self._dispatch(job)
+        return job
+
+    def _dispatch(self, job):
+        self.start()
+        if self.available:
+            self._queue.put(job)
+        else:
+            self._run_inline(job)
+
+    def _run_inline(self, job):
+        """Sans thread disponible : exécution sur le thread courant avec le client de NVDA."""
+        import UIAHandler
+        client = UIAHandler.handler.clientObject
+        try:
+            root = client.ElementFromHandle(job.window_handle) if job.window_handle else None
+            result = job.func(client, root, job)
+        except Exception as e:
+            log.error(f"PROTONVPN: scan {job.func.__name__} error: {e}")
+            result = None
+        job.deliver(result)
+
+    def cancel(self):
+        """Annule les requêtes de geste en cours (un nouveau geste les remplace)."""
+        self.generation += 1
+
+    def stop(self):
+        self.stopping = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(config.WORKER_START_TIMEOUT_S)
+        self._thread = None
+
+
+scan_worker = UIAScanWorker()
+
+
+def _create_scan_cache_request(client):
+    """Propriétés mises en cache sur les éléments trouvés (aucun aller-retour de plus pour les lire)."""
+    import UIAHandler
+    request = client.CreateCacheRequest()
+    for propertyId in (
+        UIAHandler.UIA_AutomationIdPropertyId,
+        UIAHandler.UIA_ControlTypePropertyId,
+        UIAHandler.UIA_FrameworkIdPropertyId,
+        UIAHandler.UIA_NamePropertyId,
+        UIAHandler.UIA_RuntimeIdPropertyId,
+    ):
+        request.AddProperty(propertyId)
+    return request
+
+
+def find_automation_ids(client, root):
+    """AutomationId -> liste d'éléments (ordre de l'arbre), root compris, en un seul FindAll."""
+    elements = {}
+    found = search.find_all(root, search.has_automation_id_condition(client), _create_scan_cache_request(client), subtree=True)
+    for element in found:
+        elements.setdefault(element.cachedAutomationId, []).append(element)
+    return elements
+
+
+# ============================================================================
+# REFERENCES D'ELEMENTS (THREAD DE FOND -> THREAD PRINCIPAL)
+# ============================================================================
+
+class ElementRef:
+    """
+    Élément relevé par le thread de fond, désigné par son RuntimeId et son AutomationId.
+
+    Les éléments COM du client UIA du thread de fond (MTA) ne passent pas au thread principal
+    de NVDA (STA) : celui-ci retrouve l'élément avec son propre client (resolve_ref).
+    """
+
+    __slots__ = ("runtime_id", "automation_id")
+
+    def __init__(self, runtime_id, automation_id=""):
+        self.runtime_id = runtime_id
+        self.automation_id = automation_id
+
+    @classmethod
+    def from_element(cls, element):
+        """Référence d'un élément du thread de fond (RuntimeId et AutomationId lus dans le cache)."""
+        import UIAHandler
+        try:
+            runtime_id = tuple(element.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId)) or None
+        except:
+            runtime_id = None
+        try:
+            automation_id = element.cachedAutomationId or ""
+        except:
+            automation_id = ""
+        return cls(runtime_id, automation_id)
+
+    def __eq__(self, other):
+        return isinstance(other, ElementRef) and (self.runtime_id, self.automation_id) == (other.runtime_id, other.automation_id)
+
+    def __hash__(self):
+        return hash((self.runtime_id, self.automation_id))
+
+    def __repr__(self):
+        return f"ElementRef({self.runtime_id!r}, {self.automation_id!r})"
+
+
+def get_window_element(window_handle):
+    """Élément UIA de la fenêtre pour le client de NVDA (thread principal) ; None si indisponible."""
+    fg = api.getForegroundObject()
+    if fg and getattr(fg, 'windowHandle', None) == window_handle:
+        element = getattr(fg, 'UIAElement', None)
+        if element:
+            return element
+    import UIAHandler
+    try:
+        return UIAHandler.handler.clientObject.ElementFromHandle(window_handle)
+    except Exception as e:
+        log.error(f"PROTONVPN: ElementFromHandle error: {e}")
+        return None
+
+
+def resolve_ref(ref, root_element):
+    """
+    Objet NVDA d'une référence du thread de fond, retrouvé sous root_element par le client
+    de NVDA (un FindFirst sur le RuntimeId, à défaut sur l'AutomationId) ; None s'il a disparu.
+    """
+    import UIAHandler
+    client = UIAHandler.handler.clientObject
+    request = UIAHandler.handler.baseCacheRequest
+    element = None
+    if ref.runtime_id:
+        try:
+            # RuntimeId : SAFEARRAY de VT_I4 ("l" pour comtypes ; "i" donnerait VT_INT)
+            condition = search.property_condition(client, UIAHandler.UIA_RuntimeIdPropertyId, array("l", ref.runtime_id))
+            element = search.find_first(root_element, condition, request, subtree=True)
+        except Exception as e:
+            diag.debug("scanning.resolve", "RuntimeId lookup failed for %r: %s", ref, e)
+    if not element and ref.automation_id:
+        try:
+            condition = search.element_condition(client, automation_id=ref.automation_id)
+            element = search.find_first(root_element, condition, request, subtree=True)
+        except Exception as e:
+            log.error(f"PROTONVPN: resolve_ref error ({ref.automation_id}): {e}")
+    return UIA(UIAElement=element) if element else None
+
+
+# ============================================================================
+# INDEX DES AUTOMATIONID DE LA FENETRE PRINCIPALE
+# ============================================================================
+
+class AutomationIdIndex:
+    """
+    Index AutomationId -> éléments de la fenêtre principale ProtonVPN.
+
+    Chargé uniquement par les passes de window_scanner (thread de fond) et marqué périmé
+    par les événements StructureChanged : le thread principal ne parcourt jamais la fenêtre.
+    Un index périmé ne répond pas ; refresh_async relance la passe de fond.
+    """
+
+    def __init__(self):
+        self._elements = {}
+        self._window_handle = None
+        self.dirty = True
+        # Incrémenté à chaque invalidation : un parcours de fond commencé avant
+        # une invalidation ne doit pas marquer l'index comme à jour
+        self._invalidations = 0
+
+    def invalidate(self, runtime_id=None):
+        self.dirty = True
+        self._invalidations += 1
+
+    def is_fresh(self):
+        """Indique si l'index est utilisable sans parcours pour la fenêtre au premier plan."""
+        fg = api.getForegroundObject()
+        return bool(fg) and not self.dirty and getattr(fg, 'windowHandle', None) == self._window_handle
+
+    def refresh_async(self, callback, gesture=True, force=False):
+        """
+        Appelle callback() sur le thread principal une fois l'index à jour :
+        immédiatement s'il l'est déjà, sinon après une passe de window_scanner (thread de fond).
+        force : nouvelle passe même sans StructureChanged (un élément peut changer
+        d'AutomationId sans événement).
+        """
+        callback = first_gesture.wrap(callback)
+        from .windowscan import window_scanner
+        if force:
+            self.invalidate()
+            window_scanner.invalidate()
+        elif self.is_fresh():
+            callback()
+            return
+        window_scanner.request(lambda snapshot: callback(), gesture)
+
+    def load_token(self):
+        """Jeton à passer à load() : une invalidation survenue entre-temps laisse l'index périmé."""
+        return self._invalidations
+
+    def load(self, elements, window_handle, token):
+        """Remplace l'index par le résultat d'une passe de fond (AutomationId -> ElementRef)."""
+        self._elements = elements
+        self._window_handle = window_handle
+        self.dirty = self._invalidations != token
+        diag.debug("scanning.index", "AutomationId index loaded from window scan (%d ids)", len(elements))
+
+    def _resolve(self, automation_id):
+        """
+        Retourne les objets NVDA de l'AutomationId, créés à la demande : les références d'une
+        passe de fond sont retrouvées par le client de NVDA (un FindAll sur l'AutomationId),
+        puis mémorisées jusqu'à la prochaine passe.
+        """
+        elements = self._elements.get(automation_id, [])
+        if any(isinstance(element, ElementRef) for element in elements):
+            self._elements[automation_id] = elements = self._find_on_main_thread(automation_id)
+        return elements
+
+    def _find_on_main_thread(self, automation_id):
+        import UIAHandler
+        root = get_window_element(self._window_handle)
+        if root is None:
+            return []
+        try:
+            client = UIAHandler.handler.clientObject
+            found = search.find_all(root, search.element_condition(client, automation_id=automation_id),
+                                    UIAHandler.handler.baseCacheRequest, subtree=True)
+            return [UIA(UIAElement=element) for element in found]
+        except Exception as e:
+            log.error(f"PROTONVPN: AutomationId index resolve error: {e}")
+            return []
+
+    def find_all(self, automation_id):
+        """
+        Retourne la liste des éléments portant cet AutomationId (ordre de l'arbre) ; liste vide
+        si l'index n'est pas à jour pour la fenêtre au premier plan (voir refresh_async).
+        """
+        if not self.is_fresh():
+            diag.debug("scanning.index", "AutomationId index stale, '%s' not looked up", automation_id)
+            return []
+        return list(self._resolve(automation_id))
+
+    def find(self, automation_id):
+        """Retourne le premier élément portant cet AutomationId, ou None."""
+        elements = self.find_all(automation_id)
+        return elements[0] if elements else None
+
+    def clear(self):
+        self._elements = {}
+        self._window_handle = None
+        self.dirty = True
+
+
+automation_id_index = AutomationIdIndex()
+uia_events.add_structure_listener(automation_id_index.invalidate)
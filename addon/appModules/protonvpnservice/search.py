@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Recherche native UIA : conditions de propriétés et FindFirst / FindAll.
+
+Le filtrage (AutomationId, ControlType, FrameworkId, sous-chaînes du nom) a lieu dans le
+fournisseur UIA, en un seul aller-retour ; seuls les éléments trouvés reviennent, avec les
+propriétés de la requête de cache. Aucun NVDAObject n'est créé pour les noeuds parcourus.
+Les recherches sont chronométrées par le disjoncteur (breaker.py).
+"""
+
+from logHandler import log
+
+from .breaker import uia_breaker
+
+
+# PropertyConditionFlags (CreatePropertyConditionEx, Windows 10 1809 et suivants pour MatchSubstring)
+PROPERTY_CONDITION_IGNORE_CASE = 1
+PROPERTY_CONDITION_MATCH_SUBSTRING = 2
+
+# Vrai tant que le client accepte les conditions par sous-chaîne
+_substring_supported = True
+
+
+def property_condition(client, property_id, value):
+    """Condition "propriété == valeur"."""
+    return client.CreatePropertyCondition(property_id, value)
+
+
+def all_of(client, *conditions):
+    """Conjonction des conditions (None ignorées) ; condition vraie si aucune."""
+    conditions = [condition for condition in conditions if condition is not None]
+    if not conditions:
+        return client.CreateTrueCondition()
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = client.CreateAndCondition(result, condition)
+    return result
+
+
+def any_of(client, conditions):
+    """Disjonction des conditions ; None si la liste est vide."""
+    result = None
+    for condition in conditions:
+        result = condition if result is None else client.CreateOrCondition(result, condition)
+    return result
+
+
+def element_condition(client, automation_id=None, control_type=None, framework_id=None):
+    """Condition sur AutomationId / ControlType / FrameworkId (critères None ignorés ; "" exige un AutomationId vide)."""
+    import UIAHandler
+    return all_of(
+        client,
+        property_condition(client, UIAHandler.UIA_AutomationIdPropertyId, automation_id) if automation_id is not None else None,
+        property_condition(client, UIAHandler.UIA_ControlTypePropertyId, control_type) if control_type is not None else None,
+        property_condition(client, UIAHandler.UIA_FrameworkIdPropertyId, framework_id) if framework_id is not None else None,
+    )
+
+
+def has_automation_id_condition(client):
+    """Condition "AutomationId non vide"."""
+    import UIAHandler
+    return client.CreateNotCondition(property_condition(client, UIAHandler.UIA_AutomationIdPropertyId, ""))
+
+
+def name_contains_condition(client, phrases):
+    """
+    Condition "le nom contient l'une des expressions" (casse ignorée).
+    Retourne None si le client ne prend pas en charge les sous-chaînes : filtrer alors côté Python.
+    """
+    global _substring_supported
+    if not _substring_supported or not phrases:
+        return None
+    import UIAHandler
+    flags = PROPERTY_CONDITION_IGNORE_CASE | PROPERTY_CONDITION_MATCH_SUBSTRING
+    try:
+        return any_of(client, [
+            client.CreatePropertyConditionEx(UIAHandler.UIA_NamePropertyId, phrase, flags)
+            for phrase in phrases
+        ])
+    except Exception as e:
+        _substring_supported = False
+        log.info(f"PROTONVPN: substring conditions unavailable, filtering names in Python ({e})")
+        return None
+
+
+def _scope(subtree):
+    import UIAHandler
+    return UIAHandler.TreeScope_Subtree if subtree else UIAHandler.TreeScope_Descendants
+
+
+def find_first(root, condition, request, subtree=False):
+    """Premier élément (ordre de l'arbre) sous root vérifiant condition, propriétés de request en cache ; None sinon."""
+    with uia_breaker.timed("FindFirst", bulk=True):
+        return root.FindFirstBuildCache(_scope(subtree), condition, request) or None
+
+
+def find_all(root, condition, request, subtree=False):
+    """Éléments sous root (root compris si subtree) vérifiant condition, dans l'ordre de l'arbre."""
+    with uia_breaker.timed("FindAll", bulk=True):
+        elements = root.FindAllBuildCache(_scope(subtree), condition, request)
+    if not elements:
+        return []
+    return [elements.GetElement(i) for i in range(elements.Length)]
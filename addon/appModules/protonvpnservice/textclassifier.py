@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Classification des textes affichés : chaque chaîne est étiquetée en une passe
+(adresse IPv4/IPv6, volume de données, débit, libellé, pays, texte) par une seule
+expression régulière précompilée, l'automate des mots-clés (keywords) et des
+recherches dans des dictionnaires.
+
+Les trois boutons de LocationDetailsPage sont lus ensemble, en une seule recherche parmi
+les enfants de leur parent commun : l'enregistrement obtenu (LocationPageRecord) leur est partagé.
+"""
+
+import ipaddress
+import re
+from functools import lru_cache
+
+from . import config
+from .keywords import DETAIL_LABEL, get_location_label_field, is_country_name, scan_keywords
+from .uiautils import get_sibling_snapshots, get_text_descendants_from_snapshot
+
+
+# ============================================================================
+# ETIQUETTES
+# ============================================================================
+
+IPV4 = "ipv4"
+IPV6 = "ipv6"
+THROUGHPUT = "throughput"
+VOLUME = "volume"
+LABEL = "label"
+COUNTRY = "country"
+PROVIDER = "provider"
+TEXT = "text"
+
+ADDRESS_KINDS = frozenset((IPV4, IPV6))
+MEASURE_KINDS = frozenset((THROUGHPUT, VOLUME))
+
+# Une seule expression pour toutes les valeurs : la première trouvée donne l'étiquette.
+# Unités sensibles à la casse : o/B (octet) ne se confond pas avec b (bit), ni Mo avec mo.
+TOKEN_REGEX = re.compile(r"""
+    (?P<ipv4>\b\d{1,3}(?:\.\d{1,3}){3}\b)
+  | (?P<ipv6>(?<![\w:])(?:[0-9A-Fa-f]{0,4}:){2,7}[0-9A-Fa-f]{0,4}(?![\w:]))
+  | (?P<throughput>\b\d+(?:[.,]\d+)?\s?(?-i:(?:[kKMGT]i?)?(?:o|B|b|bit|bits))/s\b)
+  | (?P<volume>\b\d+(?:[.,]\d+)?\s?(?-i:(?:[kKMGT]i?)?(?:o|B|octets?|bytes?))\b)
+""", re.VERBOSE | re.IGNORECASE)
+
+# Champ -> étiquette des textes qui suivent son libellé
+KIND_BY_FIELD = {"pays": COUNTRY, "fournisseur": PROVIDER}
+
+
+class TextToken:
+    """
+    Chaîne étiquetée.
+
+    - kind : IPV4, IPV6, THROUGHPUT, VOLUME, LABEL, COUNTRY ou TEXT
+    - value : adresse trouvée dans la chaîne (IPV4/IPV6), sinon la chaîne elle-même
+    - has_label_keyword : la chaîne contient un mot-clé de libellé (adresse, trafic...)
+    - field : champ de LocationDetailsPage dont la chaîne est le libellé (LABEL), sinon None
+    """
+
+    __slots__ = ("text", "kind", "value", "has_label_keyword", "has_digit", "field")
+
+    def __init__(self, text, kind, value, has_label_keyword, has_digit, field=None):
+        self.text = text
+        self.kind = kind
+        self.value = value
+        self.has_label_keyword = has_label_keyword
+        self.has_digit = has_digit
+        self.field = field
+
+    @property
+    def is_label(self):
+        """Libellé connu, ou texte sans valeur contenant un mot-clé de libellé."""
+        return self.kind == LABEL or (self.kind == TEXT and self.has_label_keyword)
+
+    def __repr__(self):
+        return f"TextToken({self.kind}, {self.text!r})"
+
+
+def _is_measure(text, match):
+    """Débit ou volume affiché seul : aucune lettre autour de la mesure ("Vitesses jusqu'à 10 Gbit/s" exclu)."""
+    return not any(c.isalpha() for c in text[:match.start()]) and not any(c.isalpha() for c in text[match.end():])
+
+
+def _is_ipv6(candidate):
+    if not candidate.strip(":"):
+        return False
+    try:
+        ipaddress.IPv6Address(candidate)
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=512)
+def classify_text(text):
+    """Etiquette une chaîne (déjà débarrassée de ses espaces) en une passe."""
+    kind = None
+    value = text
+    field = None
+    for match in TOKEN_REGEX.finditer(text):
+        group = match.lastgroup
+        if group == "ipv6" and not _is_ipv6(match.group()):
+            continue
+        if group in MEASURE_KINDS and not _is_measure(text, match):
+            continue
+        kind = group
+        if group in ADDRESS_KINDS:
+            value = match.group()
+        break
+    if kind is None:
+        field = get_location_label_field(text)
+        if field:
+            kind = LABEL
+        elif is_country_name(text):
+            kind = COUNTRY
+        else:
+            kind = TEXT
+    has_label_keyword = DETAIL_LABEL in scan_keywords(text)
+    has_digit = kind not in (TEXT, LABEL, COUNTRY) or any(c.isdigit() for c in text)
+    return TextToken(text, kind, value, has_label_keyword, has_digit, field)
+
+
+def classify_texts(texts):
+    """Etiquette une liste de chaînes ; les chaînes vides sont ignorées."""
+    tokens = []
+    for text in texts:
+        text = text.strip() if isinstance(text, str) else text
+        if text:
+            tokens.append(classify_text(text))
+    return tokens
+
+
+def select_value(tokens, label_type):
+    """Choisit parmi des chaînes étiquetées la valeur du champ "ip", "pays" ou "fournisseur"."""
+    values = [token for token in tokens if token.kind != LABEL]
+    if not values:
+        return None
+    if label_type == "ip":
+        for token in values:
+            if token.kind in ADDRESS_KINDS:
+                return token.value
+        for token in values:
+            if token.has_digit and "." in token.text:
+                return token.text
+    elif label_type == "pays":
+        for token in values:
+            if token.kind == COUNTRY:
+                return token.text
+        for token in values:
+            if len(token.text) <= 30 and not token.has_digit:
+                return token.text
+    elif label_type == "fournisseur":
+        for token in values:
+            if len(token.text) <= 50:
+                return token.text
+    return values[0].text
+
+
+# ============================================================================
+# ENREGISTREMENT DE LOCATIONDETAILSPAGE
+# ============================================================================
+
+class LocationPageRecord:
+    """
+    Textes de LocationDetailsPage étiquetés en une passe, groupés par bouton (RuntimeId).
+
+    `fields` associe "ip", "pays" et "fournisseur" à la valeur du bouton qui porte le
+    libellé correspondant ; `entries` reprend tous les textes de la page avec leur
+    étiquette, les textes qui suivent "Pays" et "Fournisseur" devenant COUNTRY et PROVIDER
+    (position sous le libellé, pour les pays absents de keywords.COUNTRY_NAMES).
+    """
+
+    __slots__ = ("buttons", "fields", "entries")
+
+    def __init__(self):
+        self.buttons = {}
+        self.fields = {}
+        self.entries = []
+
+    def add_button(self, runtime_id, tokens):
+        self.buttons[runtime_id] = tokens
+        field = None
+        for token in tokens:
+            kind = token.kind
+            if kind == LABEL:
+                field = token.field
+            elif kind == TEXT and field in KIND_BY_FIELD:
+                kind = KIND_BY_FIELD[field]
+            self.entries.append((kind, token.text))
+        if field is not None and field not in self.fields:
+            self.fields[field] = select_value(tokens, field)
+
+    def tokens_for(self, runtime_id):
+        """Chaînes étiquetées du bouton, ou None s'il n'appartient pas à la page."""
+        return self.buttons.get(runtime_id)
+
+    def value_for(self, runtime_id, label_type):
+        tokens = self.buttons.get(runtime_id)
+        if not tokens:
+            return None
+        return select_value(tokens, label_type)
+
+
+def extract_location_page_record(obj):
+    """
+    Construit le LocationPageRecord des boutons LocationDetailsPage à partir des instantanés
+    des seuls boutons sans AutomationId parmi les frères de obj (l'un de ces boutons).
+    Retourne None si les instantanés sont indisponibles.
+    """
+    snapshots = get_sibling_snapshots(obj, automation_id="", control_type=config.UIA_BUTTON_CONTROL_TYPE,
+                                      max_depth=config.LOCATION_PAGE_SNAPSHOT_DEPTH)
+    if snapshots is None:
+        return None
+    record = LocationPageRecord()
+    for node in snapshots:
+        if node.runtimeId is not None:
+            texts = get_text_descendants_from_snapshot(node, max_depth=config.LOCATION_PAGE_SNAPSHOT_DEPTH)
+            record.add_button(node.runtimeId, classify_texts([text for text, _rect in texts]))
+    return record
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Série temporelle du débit actuel : échantillonnage, fenêtres glissantes et statistiques.
+"""
+
+import math
+import re
+import time
+from array import array
+from collections import deque
+
+import api
+from logHandler import log
+
+from . import config
+from .live import connection_details
+
+
+THROUGHPUT_REGEX = re.compile(r'(\d+(?:[.,]\d+)?)\s*([kKmMgGtT]?)[oObB]/s')
+
+THROUGHPUT_UNIT_FACTORS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_throughput(text):
+    """Convertit "416 o/s", "1,5 Ko/s", "3.2 MB/s"... en octets par seconde (float), ou None."""
+    if not text:
+        return None
+    match = THROUGHPUT_REGEX.search(text)
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", "."))
+    return number * THROUGHPUT_UNIT_FACTORS[match.group(2).lower()]
+
+
+def parse_throughput_values(values):
+    """Somme des débits d'une liste de valeurs (réception + émission), ou None si aucune n'est lisible."""
+    total = None
+    for value in values or ():
+        parsed = parse_throughput(value)
+        if parsed is not None:
+            total = parsed if total is None else total + parsed
+    return total
+
+
+def format_throughput(bytes_per_second):
+    """Formate un débit en o/s, Ko/s, Mo/s ou Go/s."""
+    if bytes_per_second is None:
+        return "inconnu"
+    value = float(bytes_per_second)
+    for unit in ("o/s", "Ko/s", "Mo/s"):
+        if value < 1024:
+            break
+        value /= 1024
+    else:
+        unit = "Go/s"
+    if unit == "o/s" or value >= 100:
+        return f"{value:.0f} {unit}"
+    return f"{value:.1f} {unit}".replace(".", ",")
+
+
+class _RollingWindow:
+    """
+    Statistiques glissantes sur les échantillons des `span` dernières secondes.
+
+    Somme et compte incrémentaux (moyenne en O(1)), file monotone pour le maximum
+    (O(1) amorti), histogramme à puissances de 2 pour les percentiles (taille fixe).
+    """
+
+    # 8 seaux par puissance de 2 (erreur relative <= 12,5 %), jusqu'à 2**44 o/s
+    SUB_BUCKETS = 8
+    OCTAVES = 44
+    BUCKETS = 1 + OCTAVES * SUB_BUCKETS
+
+    def __init__(self, span):
+        self.span = span
+        self.start = 0
+        self.total = 0.0
+        self.count = 0
+        self._max_indices = deque()
+        self._buckets = array('l', [0]) * self.BUCKETS
+
+    @classmethod
+    def bucket_of(cls, value):
+        if value < 1:
+            return 0
+        mantissa, exponent = math.frexp(value)
+        sub = int((mantissa - 0.5) * 2 * cls.SUB_BUCKETS)
+        return min(1 + (exponent - 1) * cls.SUB_BUCKETS + sub, cls.BUCKETS - 1)
+
+    @classmethod
+    def bucket_upper_bound(cls, bucket):
+        if bucket == 0:
+            return 0.0
+        octave, sub = divmod(bucket - 1, cls.SUB_BUCKETS)
+        return float(2 ** octave) * (1 + (sub + 1) / cls.SUB_BUCKETS)
+
+    def add(self, index, value, values):
+        self.total += value
+        self.count += 1
+        self._buckets[self.bucket_of(value)] += 1
+        max_indices = self._max_indices
+        while max_indices and values[max_indices[-1] % len(values)] <= value:
+            max_indices.pop()
+        max_indices.append(index)
+
+    def evict(self, value):
+        """Retire l'échantillon le plus ancien de la fenêtre (d'indice self.start)."""
+        self.total -= value
+        self.count -= 1
+        self._buckets[self.bucket_of(value)] -= 1
+        if self._max_indices and self._max_indices[0] == self.start:
+            self._max_indices.popleft()
+        self.start += 1
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def peak(self, values):
+        if not self._max_indices:
+            return None
+        return values[self._max_indices[0] % len(values)]
+
+    def percentile(self, p):
+        """Percentile approché (borne haute du seau), p entre 0 et 100."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for bucket, bucket_count in enumerate(self._buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bucket_upper_bound(bucket)
+        return None
+
+
+class ThroughputSeries:
+    """
+    Série temporelle du débit en octets/s dans un tampon circulaire array('d') de taille fixe,
+    horodatages dans un tableau parallèle. La mémoire reste constante quelle que soit
+    la durée de la session VPN.
+    """
+
+    def __init__(self, windows=config.THROUGHPUT_WINDOWS_S, interval_ms=config.THROUGHPUT_SAMPLE_INTERVAL_MS):
+        # Assez de place pour la plus longue fenêtre (marge pour la gigue du minuteur)
+        capacity = int(max(windows) * 1000 / interval_ms * 1.25) + 1
+        self.capacity = capacity
+        self.values = array('d', [0.0]) * capacity
+        self.timestamps = array('d', [0.0]) * capacity
+        self.count = 0
+        self.windows = {span: _RollingWindow(span) for span in windows}
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def add(self, value, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        index = self.count
+        slot = index % self.capacity
+        self.values[slot] = value
+        self.timestamps[slot] = timestamp
+        self.count += 1
+        for window in self.windows.values():
+            window.add(index, value, self.values)
+            self._expire(window, timestamp)
+
+    def _expire(self, window, now):
+        oldest_allowed = now - window.span
+        while window.start < self.count:
+            slot = window.start % self.capacity
+            # Un échantillon ne doit jamais rester dans une fenêtre après avoir été écrasé
+            if self.timestamps[slot] >= oldest_allowed and self.count - window.start <= self.capacity:
+                break
+            window.evict(self.values[slot])
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self.count - 1) % self.capacity]
+
+    def stats(self, span, now=None):
+        """Retourne (moyenne, pic, p95) sur la fenêtre `span` (secondes)."""
+        window = self.windows[span]
+        self._expire(window, time.monotonic() if now is None else now)
+        return window.mean(), window.peak(self.values), window.percentile(95)
+
+    def clear(self):
+        self.count = 0
+        self.windows = {span: _RollingWindow(span) for span in self.windows}
+
+
+class ThroughputSampler:
+    """
+    Échantillonne périodiquement le débit actuel depuis le modèle ConnectionDetailsPage
+    (aucun parcours d'arbre) et l'ajoute à la série temporelle, tant que ProtonVPN a le
+    focus (démarré par event_appModule_gainFocus, arrêté par event_appModule_loseFocus).
+    """
+
+    def __init__(self, model, series):
+        self.model = model
+        self.series = series
+        self._timer = None
+        self.app_module = None
+
+    @property
+    def running(self):
+        return self._timer is not None
+
+    def start(self, app_module):
+        self.app_module = app_module
+        if self._timer is not None:
+            return
+        try:
+            import wx
+            self._timer = wx.CallLater(config.THROUGHPUT_SAMPLE_INTERVAL_MS, self._tick)
+        except Exception as e:
+            log.error(f"PROTONVPN: ThroughputSampler start error: {e}")
+
+    def stop(self):
+        if self._timer is not None:
+            try:
+                self._timer.Stop()
+            except:
+                pass
+        self._timer = None
+        self.app_module = None
+
+    def _tick(self):
+        try:
+            self.sample()
+        except Exception as e:
+            log.error(f"PROTONVPN: ThroughputSampler error: {e}")
+        if self._timer is not None:
+            self._timer.Restart(config.THROUGHPUT_SAMPLE_INTERVAL_MS)
+
+    def sample(self):
+        """
+        Ajoute un échantillon si le modèle connaît le débit actuel. Le modèle ne change qu'avec
+        la page : une valeur inchangée reste le débit courant et compte à chaque intervalle.
+        """
+        if not self.model.attached:
+            # Ne (ré)attacher que lorsque ProtonVPN est au premier plan : la passe de fond relève cette fenêtre
+            fg = api.getForegroundObject()
+            if fg and getattr(fg, 'appModule', None) is self.app_module:
+                self.model.attach_async()
+            return
+        entry = self.model.get("current_throughput")
+        if not entry:
+            return
+        value = parse_throughput_values(entry.values)
+        if value is not None:
+            self.series.add(value)
+
+
+throughput_series = ThroughputSeries()
+throughput_sampler = ThroughputSampler(connection_details, throughput_series)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Parcours d'arbre borné : primitive commune à tous les parcours de l'add-on.
+
+walk() visite un arbre en profondeur ou en largeur et s'arrête à la profondeur maximale,
+au nombre maximal de noeuds ou à l'échéance ; le résultat indique si le parcours a été
+tronqué (les noeuds déjà visités restent acquis). Les noeuds peuvent être des NVDAObject
+(un appel COM par .children), des éléments UIA en cache ou des SubtreeSnapshotNode.
+
+Les limites par défaut (TRAVERSAL_MAX_NODES, TRAVERSAL_MAX_TIME_MS) bornent la latence
+des parcours du thread principal ; la passe de fond sur la fenêtre a les siennes.
+"""
+
+import time
+from collections import deque
+
+from . import config
+from .breaker import uia_breaker
+from .diagnostics import diag
+
+DEPTH_FIRST = "depth"
+BREADTH_FIRST = "breadth"
+
+# Retourné par visit() : ne pas descendre dans les enfants du noeud
+SKIP_CHILDREN = object()
+
+
+class TraversalResult:
+    """Bilan d'un parcours : noeuds visités, troncature ("nodes" / "deadline") et durée."""
+
+    __slots__ = ("nodes", "truncated", "reason", "elapsed")
+
+    def __init__(self, nodes, reason, elapsed):
+        self.nodes = nodes
+        self.truncated = reason is not None
+        self.reason = reason
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"TraversalResult(nodes={self.nodes}, truncated={self.reason or False}, {self.elapsed * 1000:.1f} ms)"
+
+
+class TraversalStats:
+    """Compteurs par parcours nommé : appels, noeuds, troncatures."""
+
+    def __init__(self):
+        self._stats = {}
+
+    def record(self, name, result):
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = [0, 0, 0]
+        entry[0] += 1
+        entry[1] += result.nodes
+        if result.truncated:
+            entry[2] += 1
+
+    def get(self, name):
+        """(appels, noeuds, troncatures) du parcours `name`."""
+        return tuple(self._stats.get(name, (0, 0, 0)))
+
+    def format_stats(self):
+        lines = [f"{'Parcours':<30} {'Appels':>8} {'Noeuds':>10} {'Tronqués':>9}"]
+        for name, (calls, nodes, truncated) in sorted(self._stats.items()):
+            lines.append(f"{name:<30} {calls:>8} {nodes:>10} {truncated:>9}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        self._stats.clear()
+
+
+traversal_stats = TraversalStats()
+
+
+# ============================================================================
+# ENFANTS SELON LE TYPE DE NOEUD
+# ============================================================================
+
+def cached_children(element):
+    """Enfants en cache d'un élément UIA (requête de cache TreeScope_Children / Subtree)."""
+    children = element.GetCachedChildren()
+    if not children:
+        return ()
+    return [children.GetElement(i) for i in range(children.Length)]
+
+
+def object_children(obj):
+    """Enfants d'un NVDAObject (appels COM, chronométrés ; aucun si le disjoncteur est ouvert)."""
+    if uia_breaker.should_skip():
+        return ()
+    with uia_breaker.timed("children", bulk=True):
+        return obj.children
+
+
+def snapshot_children(node):
+    """Enfants d'un SubtreeSnapshotNode (en mémoire)."""
+    return node.children
+
+
+# ============================================================================
+# PARCOURS
+# ============================================================================
+
+def walk(root, get_children, visit, name="walk", max_depth=None, order=DEPTH_FIRST,
+         max_nodes=None, max_time_ms=None, include_root=True, context=None):
+    """
+    Parcourt l'arbre de root et retourne un TraversalResult.
+
+    - visit(node, depth, context) : retourne le contexte transmis aux enfants du noeud
+      (p.ex. le noeud construit, ou la chaîne des ancêtres), ou SKIP_CHILDREN ;
+    - get_children(node) : séquence des enfants ; une exception vaut "aucun enfant" ;
+    - max_depth : profondeur maximale visitée (root à 0), None sans limite ;
+    - max_nodes / max_time_ms : budget du parcours ; None pour la valeur de config, 0 sans limite ;
+    - include_root : sinon root n'est pas visité et ses enfants sont à la profondeur 1.
+
+    L'ordre de visite est celui de l'arbre (préfixe en profondeur, par niveau en largeur).
+    """
+    if max_nodes is None:
+        max_nodes = config.TRAVERSAL_MAX_NODES
+    if max_time_ms is None:
+        max_time_ms = config.TRAVERSAL_MAX_TIME_MS
+    started = time.perf_counter()
+    deadline = started + max_time_ms / 1000.0 if max_time_ms else None
+    breadth_first = order == BREADTH_FIRST
+    pending = deque() if breadth_first else []
+    take = pending.popleft if breadth_first else pending.pop
+
+    def push_children(node, depth, child_context):
+        try:
+            children = get_children(node)
+        except:
+            return
+        if not children:
+            return
+        if breadth_first:
+            pending.extend((child, depth, child_context) for child in children)
+        else:
+            pending.extend((child, depth, child_context) for child in reversed(children))
+
+    if include_root:
+        pending.append((root, 0, context))
+    elif max_depth is None or max_depth >= 1:
+        push_children(root, 1, context)
+    nodes = 0
+    reason = None
+    while pending:
+        if max_nodes and nodes >= max_nodes:
+            reason = "nodes"
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            reason = "deadline"
+            break
+        node, depth, node_context = take()
+        nodes += 1
+        child_context = visit(node, depth, node_context)
+        if child_context is SKIP_CHILDREN or (max_depth is not None and depth >= max_depth):
+            continue
+        push_children(node, depth + 1, child_context)
+    result = TraversalResult(nodes, reason, time.perf_counter() - started)
+    traversal_stats.record(name, result)
+    if reason is not None:
+        diag.debug("traversal.truncated", "%s truncated (%s) after %d nodes, %.1f ms",
+                   name, reason, nodes, result.elapsed * 1000)
+    return result
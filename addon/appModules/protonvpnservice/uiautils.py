@@ -0,0 +1,642 @@
+# -*- coding: utf-8 -*-
+"""
+Accès aux propriétés UIA, chaîne d'ancêtres mémorisée, index des frères et instantanés
+de sous-arbre.
+"""
+
+from contextlib import contextmanager
+
+from . import config
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .events import uia_events
+from .keywords import scan_keywords
+from .search import element_condition
+from .traversal import cached_children, object_children, snapshot_children, walk
+
+
+# ============================================================================
+# ACCES AUX PROPRIETES UIA
+# ============================================================================
+# Lectures chronométrées par le disjoncteur (breaker.py) ; disjoncteur ouvert, valeur vide
+# sans appel au fournisseur.
+
+def get_automation_id(obj):
+    """Retourne l'AutomationId de l'objet."""
+    if uia_breaker.should_skip():
+        return ""
+    try:
+        with uia_breaker.timed("UIAAutomationId"):
+            return getattr(obj, 'UIAAutomationId', None) or ""
+    except:
+        return ""
+
+def get_framework_id(obj):
+    """Retourne le FrameworkId de l'objet."""
+    if uia_breaker.should_skip():
+        return ""
+    try:
+        if hasattr(obj, 'UIAElement') and obj.UIAElement:
+            with uia_breaker.timed("currentFrameworkId"):
+                return obj.UIAElement.currentFrameworkId or ""
+    except:
+        pass
+    return ""
+
+def get_bounding_rect(obj):
+    """Retourne le boundingRect (x1, y1, x2, y2) de l'objet."""
+    if uia_breaker.should_skip():
+        return None
+    try:
+        if hasattr(obj, 'UIAElement') and obj.UIAElement:
+            with uia_breaker.timed("currentBoundingRectangle"):
+                rect = obj.UIAElement.currentBoundingRectangle
+            return (rect.left, rect.top, rect.right, rect.bottom)
+    except:
+        pass
+    try:
+        with uia_breaker.timed("location"):
+            loc = obj.location
+        if loc:
+            return (loc.left, loc.top, loc.left + loc.width, loc.top + loc.height)
+    except:
+        pass
+    return None
+
+def get_control_type(obj):
+    """Retourne le ControlType UIA de l'objet."""
+    if uia_breaker.should_skip():
+        return None
+    try:
+        if hasattr(obj, 'UIAElement') and obj.UIAElement:
+            with uia_breaker.timed("currentControlType"):
+                return obj.UIAElement.currentControlType
+    except:
+        pass
+    return None
+
+def get_runtime_id(obj):
+    """Retourne le RuntimeId UIA de l'objet (tuple), ou None. Mémorisé sur l'objet (stable pour un élément)."""
+    runtime_id = getattr(obj, '_protonvpnRuntimeId', None)
+    if runtime_id is not None:
+        return runtime_id
+    if uia_breaker.should_skip():
+        return None
+    try:
+        if hasattr(obj, 'UIAElement') and obj.UIAElement:
+            with uia_breaker.timed("GetRuntimeId"):
+                runtime_id = obj.UIAElement.GetRuntimeId()
+            if runtime_id:
+                runtime_id = tuple(runtime_id)
+                try:
+                    obj._protonvpnRuntimeId = runtime_id
+                except:
+                    pass
+                return runtime_id
+    except:
+        pass
+    return None
+
+def get_ancestor_runtime_ids(obj, max_levels, known=frozenset()):
+    """
+    RuntimeId des parents de l'objet (parent direct en premier), jusqu'à la racine, max_levels
+    niveaux, ou un RuntimeId de known (inclus). Walker brut : un appel UIA par niveau, aucun NVDAObject.
+    """
+    element = getattr(obj, 'UIAElement', None)
+    if not element:
+        return ()
+    import UIAHandler
+    client = UIAHandler.handler.clientObject
+    request = client.CreateCacheRequest()
+    request.AddProperty(UIAHandler.UIA_RuntimeIdPropertyId)
+    runtime_ids = []
+    for level in range(max_levels):
+        if uia_breaker.should_skip():
+            break
+        try:
+            with uia_breaker.timed("parent"):
+                element = client.RawViewWalker.GetParentElementBuildCache(element, request)
+            if not element:
+                break
+            runtime_id = tuple(element.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId))
+        except:
+            break
+        runtime_ids.append(runtime_id)
+        if runtime_id in known:
+            break
+    return tuple(runtime_ids)
+
+class Ancestry:
+    """
+    Chaîne de parents d'un élément, parcourue une seule fois.
+
+    Mémorise pour chaque niveau le parent, son AutomationId et son name en minuscules,
+    afin de répondre à tous les prédicats sur les ancêtres sans nouvel appel COM.
+    """
+
+    def __init__(self, obj, max_levels=config.ANCESTRY_MAX_DEPTH):
+        self.max_levels = max_levels
+        self.parents = []
+        self.automation_ids = []
+        self.names = []
+        # AutomationId -> premier niveau (1 = parent direct) où il apparaît
+        self._levels_by_id = {}
+        # max_levels -> noms concaténés des niveaux 1..max_levels
+        self._joined_names = {}
+        # True si la racine a été atteinte avant max_levels
+        self.complete = False
+        
+        current = obj
+        for level in range(1, max_levels + 1):
+            if uia_breaker.should_skip():
+                # Chaîne partielle : reconstruite au prochain appel plus profond
+                self.max_levels = level - 1
+                break
+            try:
+                with uia_breaker.timed("parent"):
+                    parent = current.parent
+                if not parent:
+                    self.complete = True
+                    break
+                automation_id = get_automation_id(parent)
+                name = (parent.name or "").lower()
+            except:
+                self.complete = True
+                break
+            self.parents.append(parent)
+            self.automation_ids.append(automation_id)
+            self.names.append(name)
+            self._levels_by_id.setdefault(automation_id, level)
+            current = parent
+
+    def covers(self, max_levels):
+        """Indique si la chaîne mémorisée suffit pour max_levels niveaux."""
+        return self.complete or max_levels <= self.max_levels
+
+    def has_automation_id(self, target_id, max_levels=4):
+        level = self._levels_by_id.get(target_id)
+        return level is not None and level <= max_levels
+
+    def get_with_automation_id(self, target_id, max_levels=4):
+        level = self._levels_by_id.get(target_id)
+        if level is None or level > max_levels:
+            return None
+        return self.parents[level - 1]
+
+    def _get_joined_names(self, max_levels):
+        joined = self._joined_names.get(max_levels)
+        if joined is None:
+            # Séparateur absent des noms : un fragment ne peut pas chevaucher deux parents
+            joined = "\n".join(self.names[:max_levels])
+            self._joined_names[max_levels] = joined
+        return joined
+
+    def has_name_containing(self, text_fragment, max_levels=4):
+        return text_fragment.lower() in self._get_joined_names(max_levels)
+
+    def has_name_keyword(self, concept, max_levels=4):
+        """Un des parents a un nom contenant un mot-clé du concept (voir keywords)."""
+        return concept in scan_keywords(self._get_joined_names(max_levels))
+
+
+def get_ancestry(obj, max_levels=config.ANCESTRY_MAX_DEPTH):
+    """
+    Retourne l'Ancestry de l'objet, construite au premier appel puis mémorisée sur l'objet.
+    Reconstruite plus profondément si max_levels dépasse la profondeur mémorisée.
+    """
+    ancestry = getattr(obj, '_protonvpnAncestry', None)
+    if ancestry is not None and ancestry.covers(max_levels):
+        return ancestry
+    ancestry = Ancestry(obj, max(max_levels, config.ANCESTRY_MAX_DEPTH))
+    try:
+        obj._protonvpnAncestry = ancestry
+    except:
+        pass
+    return ancestry
+
+
+def has_parent_with_automation_id(obj, target_id, max_levels=4):
+    """Vérifie si un des parents a l'AutomationId spécifié."""
+    return get_ancestry(obj, max_levels).has_automation_id(target_id, max_levels)
+
+def get_parent_with_automation_id(obj, target_id, max_levels=4):
+    """Retourne le parent avec l'AutomationId spécifié, ou None."""
+    return get_ancestry(obj, max_levels).get_with_automation_id(target_id, max_levels)
+
+
+def has_parent_with_name_containing(obj, text_fragment, max_levels=4):
+    """Vérifie si un des parents a un name contenant le texte spécifié."""
+    return get_ancestry(obj, max_levels).has_name_containing(text_fragment, max_levels)
+
+def has_parent_with_name_keyword(obj, concept, max_levels=4):
+    """Vérifie si un des parents a un name contenant un mot-clé du concept, dans une des langues chargées."""
+    return get_ancestry(obj, max_levels).has_name_keyword(concept, max_levels)
+
+
+# ============================================================================
+# INDEX DES FRERES
+# ============================================================================
+
+class SiblingIndex:
+    """
+    Position de chaque enfant parmi ses frères, par RuntimeId.
+
+    Les enfants d'un conteneur sont lus en un seul appel UIA (parent et enfants en cache)
+    au lieu d'un parcours obj.previous par bouton. Vidé à chaque StructureChanged.
+    Valeur : (frères de même ControlType avant, frères de même ControlType sans AutomationId avant).
+    Le RuntimeId du parent, lu dans le même appel, est retenu pour chaque enfant.
+    """
+
+    def __init__(self, max_entries=config.SIBLING_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._positions = {}
+        self._parents = {}
+        self._cache_request = None
+        self.builds = 0
+
+    def get(self, obj):
+        """Retourne la position de l'objet parmi ses frères, ou None si l'index est indisponible."""
+        runtime_id = get_runtime_id(obj)
+        if runtime_id is None:
+            return None
+        positions = self._positions.get(runtime_id)
+        if positions is None:
+            self._build(obj)
+            positions = self._positions.get(runtime_id)
+        return positions
+
+    def get_parent_runtime_id(self, obj):
+        """Retourne le RuntimeId du parent de l'objet, ou None si l'index est indisponible."""
+        runtime_id = get_runtime_id(obj)
+        if runtime_id is None:
+            return None
+        if runtime_id not in self._parents:
+            self._build(obj)
+        return self._parents.get(runtime_id)
+
+    def _get_cache_request(self):
+        if self._cache_request is None:
+            import UIAHandler
+            client = UIAHandler.handler.clientObject
+            request = client.CreateCacheRequest()
+            for propertyId in (
+                UIAHandler.UIA_ControlTypePropertyId,
+                UIAHandler.UIA_AutomationIdPropertyId,
+                UIAHandler.UIA_RuntimeIdPropertyId,
+            ):
+                request.AddProperty(propertyId)
+            request.TreeScope = UIAHandler.TreeScope_Element | UIAHandler.TreeScope_Children
+            request.TreeFilter = client.RawViewCondition
+            request.AutomationElementMode = UIAHandler.AutomationElementMode_None
+            self._cache_request = request
+        return self._cache_request
+
+    def _build(self, obj):
+        element = getattr(obj, 'UIAElement', None)
+        if not element:
+            return
+        try:
+            import UIAHandler
+            walker = UIAHandler.handler.clientObject.RawViewWalker
+            parent = walker.GetParentElementBuildCache(element, self._get_cache_request())
+            children = parent.GetCachedChildren() if parent else None
+            parent_runtime_id = tuple(parent.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId)) if children else None
+        except Exception as e:
+            diag.debug("uiautils.siblings", "sibling index unavailable: %s", e)
+            return
+        if not children:
+            return
+        if len(self._positions) + children.Length > self.max_entries:
+            self._positions.clear()
+            self._parents.clear()
+        counts = {}
+        for i in range(children.Length):
+            child = children.GetElement(i)
+            try:
+                runtime_id = tuple(child.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId))
+                controlType = child.cachedControlType
+                automationId = child.cachedAutomationId or ""
+            except:
+                continue
+            same_type = counts.get(controlType, 0)
+            same_type_without_id = counts.get((controlType, ""), 0)
+            self._positions[runtime_id] = (same_type, same_type_without_id)
+            self._parents[runtime_id] = parent_runtime_id
+            counts[controlType] = same_type + 1
+            if not automationId:
+                counts[(controlType, "")] = same_type_without_id + 1
+        self.builds += 1
+
+    def clear(self, runtime_id=None):
+        self._positions.clear()
+        self._parents.clear()
+
+    def __len__(self):
+        return len(self._positions)
+
+
+sibling_index = SiblingIndex()
+uia_events.add_structure_listener(sibling_index.clear)
+
+
+# ============================================================================
+# INSTANTANE DE SOUS-ARBRE
+# ============================================================================
+
+class SubtreeSnapshotNode:
+    """
+    Noeud en mémoire d'un instantané de sous-arbre UIA.
+    Les propriétés sont lues depuis le cache UIA, sans appel inter-processus.
+    truncated (racine) : le budget du parcours a été atteint, des noeuds manquent.
+    """
+
+    __slots__ = ("name", "controlType", "automationId", "frameworkId", "rect", "runtimeId", "children", "truncated")
+
+    def __init__(self, name, controlType, automationId, frameworkId, rect, runtimeId=None):
+        self.name = name
+        self.controlType = controlType
+        self.automationId = automationId
+        self.frameworkId = frameworkId
+        self.rect = rect
+        self.runtimeId = runtimeId
+        self.children = []
+        self.truncated = False
+
+
+# Requêtes de cache partagées (créées au premier usage) : sous-arbre entier, élément et enfants
+_subtree_cache_request = None
+_level_cache_request = None
+
+# Ensembles recevant les RuntimeId des noeuds lus par les instantanés (voir collect_subtree_runtime_ids)
+_runtime_id_collectors = []
+
+
+@contextmanager
+def collect_subtree_runtime_ids():
+    """
+    Pendant le bloc, les RuntimeId de tous les noeuds lus par les instantanés
+    sont ajoutés à l'ensemble retourné (éléments dont dépend un texte calculé).
+    """
+    runtime_ids = set()
+    _runtime_id_collectors.append(runtime_ids)
+    try:
+        yield runtime_ids
+    finally:
+        # Blocs imbriqués : le dernier ensemble est celui-ci (remove() comparerait par égalité)
+        _runtime_id_collectors.pop()
+
+
+def add_collected_runtime_ids(runtime_ids):
+    """Ajoute des RuntimeId aux ensembles de collect_subtree_runtime_ids en cours (valeur mémorisée réutilisée)."""
+    for collector in _runtime_id_collectors:
+        collector.update(runtime_ids)
+
+
+def _create_snapshot_cache_request(tree_scope):
+    """
+    Requête de cache des instantanés : Name, ControlType, AutomationId, FrameworkId,
+    BoundingRectangle et RuntimeId sur la portée tree_scope.
+    """
+    import UIAHandler
+    client = UIAHandler.handler.clientObject
+    request = client.CreateCacheRequest()
+    for propertyId in (
+        UIAHandler.UIA_NamePropertyId,
+        UIAHandler.UIA_ControlTypePropertyId,
+        UIAHandler.UIA_AutomationIdPropertyId,
+        UIAHandler.UIA_FrameworkIdPropertyId,
+        UIAHandler.UIA_BoundingRectanglePropertyId,
+        UIAHandler.UIA_RuntimeIdPropertyId,
+    ):
+        request.AddProperty(propertyId)
+    request.TreeScope = tree_scope
+    request.TreeFilter = client.RawViewCondition
+    return request
+
+
+def _get_subtree_cache_request():
+    """
+    Requête de cache du sous-arbre entier (créée une seule fois). Réservée aux éléments de
+    taille connue : config.SUBTREE_SNAPSHOT_CONTROL_TYPES.
+    """
+    global _subtree_cache_request
+    if _subtree_cache_request is None:
+        import UIAHandler
+        request = _create_snapshot_cache_request(UIAHandler.TreeScope_Subtree)
+        # Pas de référence vers l'élément réel : uniquement les valeurs en cache
+        request.AutomationElementMode = UIAHandler.AutomationElementMode_None
+        _subtree_cache_request = request
+    return _subtree_cache_request
+
+
+def _get_level_cache_request():
+    """
+    Requête de cache de l'élément et de ses enfants (créée une seule fois), pour les
+    instantanés niveau par niveau ; les enfants gardent leur référence pour être développés.
+    """
+    global _level_cache_request
+    if _level_cache_request is None:
+        import UIAHandler
+        _level_cache_request = _create_snapshot_cache_request(UIAHandler.TreeScope_Element | UIAHandler.TreeScope_Children)
+    return _level_cache_request
+
+
+def _snapshot_node(element):
+    """SubtreeSnapshotNode d'un élément UIA mis en cache (sans ses enfants)."""
+    try:
+        rect = element.cachedBoundingRectangle
+        rect = (rect.left, rect.top, rect.right, rect.bottom)
+    except:
+        rect = None
+    try:
+        import UIAHandler
+        runtimeId = element.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId)
+        runtimeId = tuple(runtimeId) if runtimeId else None
+    except:
+        runtimeId = None
+    node = SubtreeSnapshotNode(
+        element.cachedName or "",
+        element.cachedControlType,
+        element.cachedAutomationId or "",
+        element.cachedFrameworkId or "",
+        rect,
+        runtimeId,
+    )
+    if runtimeId is not None:
+        for collector in _runtime_id_collectors:
+            collector.add(runtimeId)
+    return node
+
+
+def _snapshot_from_cached_element(element, max_depth, max_nodes=None, max_time_ms=None):
+    """Convertit un élément UIA mis en cache et son sous-arbre en SubtreeSnapshotNode (sans COM distant)."""
+    root = []
+
+    def visit(element, depth, parent):
+        node = _snapshot_node(element)
+        if parent is None:
+            root.append(node)
+        else:
+            parent.children.append(node)
+        return node
+
+    result = walk(element, cached_children, visit, "subtree_snapshot", max_depth,
+                  max_nodes=max_nodes, max_time_ms=max_time_ms)
+    root[0].truncated = result.truncated
+    return root[0]
+
+
+def _snapshot_by_levels(element, max_depth, max_nodes=None, max_time_ms=None):
+    """
+    Instantané d'un élément de taille inconnue, niveau par niveau : un appel UIA par noeud
+    développé (l'élément et ses enfants en cache), dans le budget max_nodes / max_time_ms.
+    """
+    request = _get_level_cache_request()
+    with uia_breaker.timed("subtree_snapshot_level"):
+        cached = element.BuildUpdatedCache(request)
+    root = []
+
+    def get_children(item):
+        cached, expanded = item
+        if not expanded:
+            if uia_breaker.should_skip():
+                return ()
+            with uia_breaker.timed("subtree_snapshot_level"):
+                cached = cached.BuildUpdatedCache(request)
+        return [(child, False) for child in cached_children(cached)]
+
+    def visit(item, depth, parent):
+        node = _snapshot_node(item[0])
+        if parent is None:
+            root.append(node)
+        else:
+            parent.children.append(node)
+        return node
+
+    result = walk((cached, True), get_children, visit, "subtree_snapshot_levels", max_depth,
+                  max_nodes=max_nodes, max_time_ms=max_time_ms)
+    root[0].truncated = result.truncated
+    return root[0]
+
+
+def get_subtree_snapshot(obj, max_depth=5, max_nodes=None, max_time_ms=None):
+    """
+    Récupère le sous-arbre de l'objet. Retourne un SubtreeSnapshotNode racine, ou None si le
+    mode instantané est indisponible. max_nodes / max_time_ms : budget du parcours (voir traversal.walk).
+
+    Un contrôle de config.SUBTREE_SNAPSHOT_CONTROL_TYPES (bouton...), de taille connue, est lu
+    en un seul aller-retour (BuildUpdatedCache, TreeScope_Subtree) ; tout autre élément, de
+    taille inconnue, niveau par niveau : la portée Subtree renverrait l'arbre entier, hors budget.
+    """
+    if not config.USE_SUBTREE_SNAPSHOT:
+        return None
+    try:
+        element = getattr(obj, 'UIAElement', None)
+        if not element:
+            return None
+        try:
+            bounded = element.cachedControlType in config.SUBTREE_SNAPSHOT_CONTROL_TYPES
+        except:
+            bounded = False
+        if not bounded:
+            return _snapshot_by_levels(element, max_depth, max_nodes, max_time_ms)
+        with uia_breaker.timed("subtree_snapshot", bulk=True):
+            cached = element.BuildUpdatedCache(_get_subtree_cache_request())
+        return _snapshot_from_cached_element(cached, max_depth, max_nodes, max_time_ms)
+    except Exception as e:
+        diag.debug("uiautils.snapshot", "subtree snapshot unavailable, falling back to children walk: %s", e)
+        return None
+
+
+def get_sibling_snapshots(obj, automation_id=None, control_type=None, max_depth=5):
+    """
+    Instantanés des frères de l'objet (lui compris) qui ont l'AutomationId / le ControlType
+    demandés ("" : AutomationId vide). La recherche se limite aux enfants du parent et seul
+    le sous-arbre des éléments trouvés est mis en cache : jamais celui du parent, de taille
+    inconnue. Deux allers-retours UIA ; None si indisponible.
+    """
+    if not config.USE_SUBTREE_SNAPSHOT:
+        return None
+    try:
+        element = getattr(obj, 'UIAElement', None)
+        if not element:
+            return None
+        import UIAHandler
+        client = UIAHandler.handler.clientObject
+        with uia_breaker.timed("parent"):
+            parent = client.RawViewWalker.GetParentElement(element)
+        if not parent:
+            return None
+        condition = element_condition(client, automation_id=automation_id, control_type=control_type)
+        with uia_breaker.timed("sibling_snapshots", bulk=True):
+            found = parent.FindAllBuildCache(UIAHandler.TreeScope_Children, condition, _get_subtree_cache_request())
+        if not found:
+            return []
+        return [_snapshot_from_cached_element(found.GetElement(i), max_depth) for i in range(found.Length)]
+    except Exception as e:
+        diag.debug("uiautils.snapshot", "sibling snapshots unavailable: %s", e)
+        return None
+
+
+def get_text_descendants(obj, max_depth=5):
+    """
+    Récupère tous les éléments Text (config.UIA_TEXT_CONTROL_TYPE) descendants de l'objet.
+    Retourne une liste de tuples (name, bounding_rect).
+
+    Utilise un instantané du sous-arbre (un seul appel UIA pour un bouton, voir
+    get_subtree_snapshot) et, à défaut,
+    le parcours historique via node.children ; aucun texte si le disjoncteur est ouvert.
+    """
+    if uia_breaker.should_skip():
+        return []
+    snapshot = get_subtree_snapshot(obj, max_depth)
+    if snapshot is not None:
+        return get_text_descendants_from_snapshot(snapshot, max_depth)
+    return get_text_descendants_by_children(obj, max_depth)
+
+
+def get_text_descendants_from_snapshot(snapshot, max_depth=5):
+    """Extrait les éléments Text d'un instantané de sous-arbre (même ordre que le parcours children)."""
+    texts = []
+    
+    def visit(node, depth, context):
+        if node.controlType == config.UIA_TEXT_CONTROL_TYPE:
+            name = node.name
+            if name and name.strip():
+                texts.append((name.strip(), node.rect))
+    
+    walk(snapshot, snapshot_children, visit, "text_descendants", max_depth, include_root=False)
+    return texts
+
+
+def get_text_descendants_by_children(obj, max_depth=5):
+    """
+    Parcours de repli via node.children (plusieurs appels COM par noeud), borné par le
+    budget des parcours (TRAVERSAL_MAX_NODES / TRAVERSAL_MAX_TIME_MS).
+    Retourne une liste de tuples (name, bounding_rect).
+    """
+    texts = []
+    
+    def visit(node, depth, context):
+        try:
+            ct = get_control_type(node)
+            if ct == config.UIA_TEXT_CONTROL_TYPE:
+                name = node.name
+                if name and name.strip():
+                    rect = get_bounding_rect(node)
+                    texts.append((name.strip(), rect))
+        except:
+            pass
+    
+    walk(obj, object_children, visit, "text_descendants_children", max_depth, include_root=False)
+    return texts
+
+
+def get_all_text_descendants_as_string(obj, max_depth=5):
+    """
+    Récupère et concatène tous les textes descendants en une seule chaîne.
+    """
+    texts = get_text_descendants(obj, max_depth)
+    if not texts:
+        return ""
+    return " ".join([t[0] for t in texts])
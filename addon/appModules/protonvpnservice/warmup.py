@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Préchauffage des caches au retour dans ProtonVPN (event_appModule_gainFocus).
+
+Après un court délai, une passe window_scanner de fond (non liée à un geste) relève la
+fenêtre ; les éléments utiles aux scripts sont ensuite résolus sur le thread principal,
+un par tick (bouton de connexion, widgets, ConnectionDetailsPage, boutons LocationDetailsPage
+et ConnectionDetailsPage avec leurs valeurs extraites). Un appui de touche annule le
+préchauffage : le geste garde la priorité.
+"""
+
+import time
+
+import wx
+from logHandler import log
+
+from . import config
+from .breaker import uia_breaker
+from .diagnostics import diag
+
+
+class CacheWarmup:
+    """Préchauffage annulable : délai, passe de fond, puis une étape par tick du thread principal."""
+
+    COLD = "cold"
+    PARTIAL = "partial"
+    WARM = "warm"
+
+    def __init__(self):
+        self._timer = None
+        self._job = None
+        self._steps = []
+        self._started = None
+        self.running = False
+        self.completed = False
+        self.runs = 0
+        self.cancellations = 0
+
+    @property
+    def state(self):
+        """État du préchauffage depuis le dernier gainFocus (clé de la mesure du premier geste)."""
+        if self.completed:
+            return self.WARM
+        return self.PARTIAL if self.running else self.COLD
+
+    def schedule(self):
+        """Programme le préchauffage (appelé par event_appModule_gainFocus)."""
+        self.cancel()
+        self.completed = False
+        self.running = True
+        self._timer = wx.CallLater(config.WARMUP_DELAY_MS, self._start)
+
+    def _start(self):
+        self._timer = None
+        if not self.running:
+            return
+        if uia_breaker.should_skip():
+            # ProtonVPN ne répond plus : pas de préchauffage
+            self.running = False
+            return
+        from .windowscan import window_scanner
+        self.runs += 1
+        self._started = time.perf_counter()
+        self._job = window_scanner.request(self._on_snapshot, gesture=False, max_age=config.WARMUP_SNAPSHOT_REUSE_S)
+
+    def _on_snapshot(self, snapshot):
+        self._job = None
+        if not self.running:
+            return
+        if snapshot is None:
+            self.running = False
+            return
+        self._steps = self._get_steps(snapshot)
+        self._next_step()
+
+    def _get_steps(self, snapshot):
+        """Étapes du thread principal, dans l'ordre d'utilité pour le premier geste."""
+        from .live import connection_details
+        from .widgets import widget_registry
+        steps = []
+        connect = snapshot.get("connect_button")
+        if connect:
+            steps.append(lambda: snapshot.get_object(connect[0]))
+        if not widget_registry.is_fresh():
+            steps.append(lambda: widget_registry.resolve(snapshot))
+        steps.append(connection_details.attach)
+        for key in ("location_buttons", "connection_details_buttons"):
+            for ref in snapshot.get(key, ()):
+                # Lire le nom remplit les caches de classification et des valeurs extraites
+                steps.append(lambda ref=ref: getattr(snapshot.get_object(ref), 'name', None))
+        steps.reverse()
+        return steps
+
+    def _next_step(self):
+        self._timer = None
+        if not self.running:
+            return
+        if not self._steps:
+            self.running = False
+            self.completed = True
+            diag.debug("warmup", "warm-up done in %.1f ms", (time.perf_counter() - self._started) * 1000)
+            return
+        if uia_breaker.should_skip():
+            self.running = False
+            self._steps = []
+            diag.debug("warmup", "warm-up interrupted: UIA circuit breaker open")
+            return
+        step = self._steps.pop()
+        try:
+            step()
+        except Exception as e:
+            log.error(f"PROTONVPN: warm-up step error: {e}")
+        # Rendre la main entre deux étapes : les gestes passent avant le préchauffage
+        self._timer = wx.CallLater(config.WARMUP_STEP_INTERVAL_MS, self._next_step)
+
+    def reset(self):
+        """Perte du focus ou arrêt : annule le préchauffage et oublie qu'il a abouti."""
+        self.cancel()
+        self.completed = False
+
+    def cancel(self):
+        """Annule le préchauffage en cours (appui de touche)."""
+        if not self.running:
+            return
+        self.running = False
+        self.cancellations += 1
+        if self._timer is not None:
+            try:
+                self._timer.Stop()
+            except:
+                pass
+            self._timer = None
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self._steps = []
+        diag.debug("warmup", "warm-up cancelled")
+
+
+cache_warmup = CacheWarmup()
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+Registre des widgets de la colonne droite : NetShield, Arrêt d'urgence (Kill switch),
+Split tunneling et Redirection de port.
+
+Les widgets sont identifiés une fois par fenêtre (collecteur "widgets" de la passe sur la
+fenêtre), indexés par RuntimeId, et leur état (activé / désactivé) est lu par TogglePattern
+ou, à défaut, par leurs textes descendants.
+Les événements UIA (StateChanged, NameChanged, StructureChanged) marquent l'état à relire
+ou le registre à reconstruire : basculer ou annoncer un widget ne parcourt pas l'arbre.
+"""
+
+import time
+
+from logHandler import log
+
+from . import config, keywords
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .events import uia_events
+from .instrumentation import first_gesture
+from .keywords import get_widget_state_from_text, scan_keywords
+from .traversal import cached_children, walk
+from .uiautils import get_ancestor_runtime_ids
+
+
+NETSHIELD = "netshield"
+KILL_SWITCH = "kill_switch"
+SPLIT_TUNNELING = "split_tunneling"
+PORT_FORWARDING = "port_forwarding"
+
+# Clé -> libellé annoncé
+WIDGET_LABELS = {
+    NETSHIELD: "NetShield",
+    KILL_SWITCH: "Arrêt d'urgence (Kill switch)",
+    SPLIT_TUNNELING: "Split tunneling",
+    PORT_FORWARDING: "Redirection de port",
+}
+
+# Concept des mots-clés -> clé
+WIDGET_BY_KEYWORD = {
+    keywords.NETSHIELD: NETSHIELD,
+    keywords.KILL_SWITCH: KILL_SWITCH,
+    keywords.SPLIT_TUNNELING: SPLIT_TUNNELING,
+    keywords.PORT_FORWARDING: PORT_FORWARDING,
+}
+
+# Ordre des WidgetButton dans la colonne (repli si aucun mot-clé n'est trouvé)
+WIDGET_ORDER = (NETSHIELD, KILL_SWITCH, SPLIT_TUNNELING)
+
+# UIA ToggleState : 0 = désactivé, 1 = activé, 2 = indéterminé
+TOGGLE_STATES = {0: False, 1: True}
+
+
+class WidgetInfo:
+    """
+    Widget résolu : objet NVDA, RuntimeId, état (True / False / None si inconnu) et
+    RuntimeId des noeuds de son sous-arbre (événements qui le concernent).
+    """
+
+    __slots__ = ("key", "obj", "runtime_id", "state", "state_source", "subtree_ids", "dirty")
+
+    def __init__(self, key, obj, runtime_id):
+        self.key = key
+        self.obj = obj
+        self.runtime_id = runtime_id
+        self.state = None
+        self.state_source = None
+        self.subtree_ids = frozenset()
+        self.dirty = True
+
+    @property
+    def label(self):
+        return WIDGET_LABELS.get(self.key, self.key)
+
+    def describe_state(self):
+        if self.state is None:
+            return self.label
+        return f"{self.label} {'activé' if self.state else 'désactivé'}"
+
+
+class WidgetRegistry:
+    """
+    Widgets de la fenêtre ProtonVPN, par clé et par RuntimeId.
+
+    resolve() s'appuie sur la passe unique sur la fenêtre (windowscan) ; refresh() relit
+    un widget signalé modifié en un seul appel UIA. Seul un StructureChanged sur le conteneur
+    des widgets ou l'un de ses parents périme le registre.
+    """
+
+    def __init__(self):
+        self._by_key = {}
+        self._by_runtime_id = {}
+        # RuntimeId d'un noeud de sous-arbre -> widget
+        self._by_subtree_id = {}
+        # RuntimeId des conteneurs des widgets et de leurs parents
+        self._container_ids = frozenset()
+        self._window_handle = None
+        self.stale = True
+        self._cache_request = None
+        # Clé -> instant limite de l'annonce du prochain changement d'état
+        self._pending_announcements = {}
+        self.resolutions = 0
+
+    # ------------------------------------------------------------------
+    # Résolution
+    # ------------------------------------------------------------------
+
+    def _get_cache_request(self):
+        """Nom, type, RuntimeId et ToggleState du widget et de son sous-arbre."""
+        if self._cache_request is None:
+            import UIAHandler
+            client = UIAHandler.handler.clientObject
+            request = client.CreateCacheRequest()
+            for propertyId in (
+                UIAHandler.UIA_NamePropertyId,
+                UIAHandler.UIA_ControlTypePropertyId,
+                UIAHandler.UIA_RuntimeIdPropertyId,
+                UIAHandler.UIA_ToggleToggleStatePropertyId,
+            ):
+                request.AddProperty(propertyId)
+            request.TreeScope = UIAHandler.TreeScope_Subtree
+            request.TreeFilter = client.RawViewCondition
+            request.AutomationElementMode = UIAHandler.AutomationElementMode_None
+            self._cache_request = request
+        return self._cache_request
+
+    def _read(self, obj):
+        """
+        Lit le widget en un appel UIA.
+        Retourne (RuntimeId, textes, état TogglePattern ou None, RuntimeId du sous-arbre), ou None.
+        """
+        element = getattr(obj, 'UIAElement', None)
+        if not element:
+            return None
+        import UIAHandler
+        with uia_breaker.timed("widget_read", bulk=True):
+            cached = element.BuildUpdatedCache(self._get_cache_request())
+        texts = []
+        subtree_ids = set()
+        runtime_id = None
+        toggle = None
+
+        def visit(current, depth, context):
+            nonlocal runtime_id, toggle
+            try:
+                node_id = tuple(current.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId))
+                subtree_ids.add(node_id)
+            except:
+                node_id = None
+            if depth == 0:
+                runtime_id = node_id
+                try:
+                    toggle = TOGGLE_STATES.get(current.GetCachedPropertyValue(UIAHandler.UIA_ToggleToggleStatePropertyId))
+                except:
+                    pass
+            name = current.cachedName
+            if name and name.strip():
+                texts.append(name.strip())
+
+        walk(cached, cached_children, visit, "widget_read", config.WIDGET_SNAPSHOT_DEPTH)
+        return runtime_id, texts, toggle, frozenset(subtree_ids)
+
+    @staticmethod
+    def _state_from_texts(texts):
+        for text in texts:
+            state = get_widget_state_from_text(text)
+            if state is not None:
+                return state
+        return None
+
+    def _apply(self, info, reading):
+        _runtime_id, texts, toggle, subtree_ids = reading
+        if toggle is not None:
+            info.state, info.state_source = toggle, "toggle"
+        else:
+            info.state, info.state_source = self._state_from_texts(texts), "text"
+        for node_id in info.subtree_ids:
+            self._by_subtree_id.pop(node_id, None)
+        info.subtree_ids = subtree_ids
+        for node_id in subtree_ids:
+            self._by_subtree_id[node_id] = info
+        info.dirty = False
+
+    def resolve(self, snapshot):
+        """Identifie les widgets à partir de la passe sur la fenêtre (WindowSnapshot, collecteur "widgets")."""
+        self.clear()
+        order = 0
+        for ref, automation_id, reading in snapshot.get("widgets", ()):
+            if reading[0] is None:
+                continue
+            if automation_id == "PortForwardingWidgetButton":
+                key = PORT_FORWARDING
+            else:
+                found = [WIDGET_BY_KEYWORD[concept] for concept in scan_keywords(" ".join(reading[1]))
+                         if concept in WIDGET_BY_KEYWORD]
+                if len(found) == 1:
+                    key = found[0]
+                elif order < len(WIDGET_ORDER):
+                    key = WIDGET_ORDER[order]
+                else:
+                    key = f"widget_{order + 1}"
+                order += 1
+            if key in self._by_key:
+                continue
+            try:
+                obj = snapshot.get_object(ref)
+            except Exception as e:
+                log.error(f"PROTONVPN: widget resolve error: {e}")
+                continue
+            if obj is None:
+                continue
+            info = WidgetInfo(key, obj, reading[0])
+            self._apply(info, reading)
+            self._by_key[key] = info
+            self._by_runtime_id[info.runtime_id] = info
+        self._container_ids = self._get_container_ids()
+        self._window_handle = snapshot.window_handle
+        self.stale = False
+        self.resolutions += 1
+        diag.debug("widgets", "widget registry resolved from snapshot #%d: %s", snapshot.generation,
+                   ", ".join(f"{info.key}={info.state}" for info in self._by_key.values()))
+
+    def _get_container_ids(self):
+        """RuntimeId des parents des widgets (chaîne complète pour le premier, puis jusqu'à un parent connu)."""
+        container_ids = set()
+        for info in self._by_key.values():
+            container_ids.update(get_ancestor_runtime_ids(info.obj, config.WIDGET_CONTAINER_MAX_LEVELS, container_ids))
+        return frozenset(container_ids)
+
+    def is_fresh(self):
+        """Indique si les widgets résolus valent pour la fenêtre au premier plan (sans appel UIA)."""
+        if self.stale:
+            return False
+        try:
+            import api
+            fg = api.getForegroundObject()
+            return bool(fg) and getattr(fg, 'windowHandle', None) == self._window_handle
+        except:
+            return False
+
+    def request(self, callback):
+        """Appelle callback() une fois les widgets résolus : immédiatement si le registre est à jour."""
+        callback = first_gesture.wrap(callback)
+        if self.is_fresh():
+            callback()
+            return
+        from .windowscan import window_scanner
+
+        def on_snapshot(snapshot):
+            if snapshot is not None:
+                try:
+                    self.resolve(snapshot)
+                except Exception as e:
+                    log.error(f"PROTONVPN: widget_registry error: {e}")
+            callback()
+
+        window_scanner.request(on_snapshot)
+
+    # ------------------------------------------------------------------
+    # Consultation
+    # ------------------------------------------------------------------
+
+    def get(self, key):
+        """WidgetInfo de la clé (état relu s'il a été signalé modifié), ou None."""
+        info = self._by_key.get(key)
+        if info is not None and info.dirty:
+            self.refresh(info)
+        return info
+
+    def get_by_runtime_id(self, runtime_id):
+        """WidgetInfo du widget de ce RuntimeId, sans résolution ni appel UIA ; None si inconnu."""
+        if runtime_id is None:
+            return None
+        return self._by_runtime_id.get(runtime_id)
+
+    def all(self):
+        """Widgets résolus, dans l'ordre de la colonne."""
+        return [self.get(info.key) for info in list(self._by_key.values())]
+
+    def refresh(self, info):
+        """Relit l'état d'un widget (un appel UIA)."""
+        try:
+            reading = self._read(info.obj)
+        except Exception as e:
+            diag.debug("widgets", "widget %s unreadable, registry marked stale: %s", info.key, e)
+            self.stale = True
+            return
+        if reading is None or reading[0] != info.runtime_id:
+            self.stale = True
+            return
+        previous = info.state
+        self._apply(info, reading)
+        if info.state != previous:
+            diag.debug("widgets", "%s state %s -> %s (%s)", info.key, previous, info.state, info.state_source)
+            self._announce_if_pending(info)
+
+    def announce_next_change(self, key):
+        """Annonce le prochain changement d'état du widget (après un basculement)."""
+        self._pending_announcements[key] = time.monotonic() + config.WIDGET_ANNOUNCE_TIMEOUT_S
+
+    def _announce_if_pending(self, info):
+        deadline = self._pending_announcements.pop(info.key, None)
+        if deadline is not None and time.monotonic() < deadline:
+            import ui
+            ui.message(info.describe_state())
+
+    # ------------------------------------------------------------------
+    # Evénements
+    # ------------------------------------------------------------------
+
+    def _widget_for(self, runtime_id):
+        if runtime_id is None:
+            return None
+        return self._by_runtime_id.get(runtime_id) or self._by_subtree_id.get(runtime_id)
+
+    def on_state_changed(self, runtime_id):
+        """ToggleState ou texte d'état modifié : relu tout de suite si une annonce est attendue, sinon à la demande."""
+        info = self._widget_for(runtime_id)
+        if info is None:
+            return
+        info.dirty = True
+        if info.key in self._pending_announcements:
+            self.refresh(info)
+
+    def on_structure_changed(self, runtime_id=None):
+        """
+        Widget ou son contenu : état à relire. Conteneur des widgets ou l'un de ses parents :
+        registre périmé. Ailleurs (ou sans RuntimeId) : entrées conservées, un widget remplacé
+        étant détecté par refresh() (RuntimeId différent).
+        """
+        if self._widget_for(runtime_id) is not None:
+            # Contenu d'un widget remplacé (texte d'état) : seul son état est à relire
+            self.on_state_changed(runtime_id)
+        elif runtime_id is not None and (runtime_id in self._container_ids or not self._container_ids):
+            # Sans chaîne de parents connue (disjoncteur ouvert à la résolution) : par prudence
+            self.stale = True
+
+    def clear(self):
+        self._by_key = {}
+        self._by_runtime_id = {}
+        self._by_subtree_id = {}
+        self._container_ids = frozenset()
+        self.stale = True
+
+
+widget_registry = WidgetRegistry()
+uia_events.add_structure_listener(widget_registry.on_structure_changed)
+uia_events.add_name_listener(widget_registry.on_state_changed)
+uia_events.add_state_listener(widget_registry.on_state_changed)
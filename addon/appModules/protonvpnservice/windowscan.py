@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+Passe unique sur la fenêtre ProtonVPN : collecteurs et instantané partagé par les scripts.
+
+Chaque collecteur (AutomationId, bouton de connexion, widgets, boutons LocationDetailsPage
+et ConnectionDetailsPage, cartes promo) déclare la condition UIA des éléments qu'il attend.
+Les conditions sont réunies par OR et évaluées par le fournisseur en un seul FindAll ; seul
+le sous-arbre des conteneurs trouvés (pages, widgets, conteneurs des cartes promo) est
+ensuite ramené, un BuildUpdatedCache chacun. Le reste de la fenêtre ne quitte pas le
+processus ProtonVPN. Le résultat, un WindowSnapshot numéroté, est partagé par les scripts :
+un second geste peu après le premier le réutilise sans nouvelle passe.
+
+Les résultats ne contiennent pas d'éléments COM du thread de fond mais des ElementRef
+(RuntimeId, AutomationId), retrouvées sur le thread principal par WindowSnapshot.get_object.
+"""
+
+import abc
+import time
+
+import api
+from logHandler import log
+
+from . import config, keywords, search
+from .breaker import uia_breaker
+from .diagnostics import diag
+from .events import uia_events
+from .instrumentation import first_gesture
+from .keywords import scan_keywords
+from .scanning import ElementRef, automation_id_index, get_window_element, resolve_ref, scan_worker
+from .traversal import SKIP_CHILDREN, cached_children, walk
+from .widgets import TOGGLE_STATES
+
+
+# ============================================================================
+# COLLECTEURS
+# ============================================================================
+
+class WindowCollector(abc.ABC):
+    """
+    Collecteur de la passe sur la fenêtre.
+
+    - condition(client) : condition UIA des éléments attendus, ou None. Les éléments à
+      AutomationId sont tous trouvés pour AutomationIdCollector : la condition ne porte que
+      sur les autres critères (un OR plus court, évalué sur chaque noeud de la fenêtre) ;
+    - subtree : False, visit() reçoit les éléments trouvés (sans ancêtres) ; True, les
+      éléments trouvés sont des conteneurs (is_container) dont chaque noeud du sous-arbre
+      est remis à visit() ;
+    - visit(frame, ancestors) : frame est le ScanFrame du noeud, ancestors le tuple des
+      ScanFrame de ses parents dans le sous-arbre parcouru (direct en premier). Les éléments
+      trouvés pour les autres collecteurs lui sont aussi remis : visit() vérifie ses critères ;
+    - result() est appelé une fois la passe terminée et rangé dans l'instantané sous `name`.
+    """
+
+    name = None
+    # Propriétés UIA supplémentaires à mettre en cache (noms d'attributs de UIAHandler)
+    properties = ()
+    subtree = False
+
+    def condition(self, client):
+        """Condition UIA des éléments à remettre au collecteur ; None s'il ne lui faut que des éléments à AutomationId."""
+        return None
+
+    def is_container(self, frame):
+        """Collecteur à sous-arbre : l'élément trouvé est l'un de ses conteneurs."""
+        return False
+
+    @abc.abstractmethod
+    def visit(self, frame, ancestors):
+        """Reçoit un noeud de la passe."""
+
+    @abc.abstractmethod
+    def result(self):
+        """Résultat rangé dans l'instantané."""
+
+
+class ScanFrame:
+    """Noeud de la passe : élément et propriétés en cache, lues une seule fois pour tous les collecteurs."""
+
+    __slots__ = ("element", "automation_id", "name", "control_type", "framework_id", "runtime_id")
+
+    def __init__(self, element):
+        import UIAHandler
+        self.element = element
+        self.automation_id = element.cachedAutomationId or ""
+        self.name = (element.cachedName or "").strip()
+        self.control_type = element.cachedControlType
+        self.framework_id = element.cachedFrameworkId
+        try:
+            self.runtime_id = tuple(element.GetCachedPropertyValue(UIAHandler.UIA_RuntimeIdPropertyId)) or None
+        except:
+            self.runtime_id = None
+
+    @property
+    def is_xaml_button(self):
+        return self.control_type == config.UIA_BUTTON_CONTROL_TYPE and self.framework_id == "XAML"
+
+    def ref(self):
+        """Référence transmise au thread principal (l'élément COM reste dans le thread de fond)."""
+        return ElementRef(self.runtime_id, self.automation_id)
+
+
+def _has_ancestor_id(ancestors, automation_id, max_levels):
+    return any(frame.automation_id == automation_id for frame in ancestors[:max_levels])
+
+
+class _SubtreeTexts:
+    """Textes et RuntimeId du sous-arbre d'éléments suivis, alimentés par leurs descendants."""
+
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+        # id(élément suivi) -> enregistrement
+        self._records = {}
+
+    def track(self, element, record):
+        self._records[id(element)] = record
+
+    def owner(self, ancestors):
+        """Enregistrement de l'élément suivi le plus proche parmi les ancêtres, ou None."""
+        if not self._records:
+            return None
+        for frame in ancestors[:self.max_depth]:
+            record = self._records.get(id(frame.element))
+            if record is not None:
+                return record
+        return None
+
+
+class AutomationIdCollector(WindowCollector):
+    """AutomationId -> ElementRef (ordre de l'arbre) : alimente automation_id_index."""
+
+    name = "automation_ids"
+
+    def __init__(self):
+        self._elements = {}
+
+    def condition(self, client):
+        return search.has_automation_id_condition(client)
+
+    def visit(self, frame, ancestors):
+        if frame.automation_id:
+            self._elements.setdefault(frame.automation_id, []).append(frame.ref())
+
+    def result(self):
+        return self._elements
+
+
+class ConnectButtonCollector(WindowCollector):
+    """
+    (ElementRef, is_disconnecting) du bouton de connexion : par AutomationId, sinon par nom.
+    Le fournisseur filtre les noms sur les expressions de (dé)connexion quand il le permet ;
+    sinon tous les boutons sont remis et leurs noms filtrés par scan_keywords.
+    """
+
+    name = "connect_button"
+    AUTOMATION_IDS = ("ConnectionCardDisconnectButton", "ConnectionCardConnectButton")
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_name = None
+
+    def condition(self, client):
+        phrases = keywords.get_phrases(keywords.DISCONNECT) + keywords.get_phrases(keywords.CONNECT)
+        return search.all_of(client, search.element_condition(client, control_type=config.UIA_BUTTON_CONTROL_TYPE),
+                             search.name_contains_condition(client, phrases))
+
+    def visit(self, frame, ancestors):
+        if frame.control_type != config.UIA_BUTTON_CONTROL_TYPE:
+            return
+        if frame.automation_id in self.AUTOMATION_IDS:
+            self._by_id.setdefault(frame.automation_id, frame.ref())
+        if self._by_name is None and frame.name:
+            concepts = scan_keywords(frame.name)
+            if keywords.DISCONNECT in concepts:
+                self._by_name = (frame.ref(), True)
+            elif keywords.CONNECT in concepts:
+                self._by_name = (frame.ref(), False)
+
+    def result(self):
+        if "ConnectionCardDisconnectButton" in self._by_id:
+            return self._by_id["ConnectionCardDisconnectButton"], True
+        if "ConnectionCardConnectButton" in self._by_id:
+            return self._by_id["ConnectionCardConnectButton"], False
+        return self._by_name
+
+
+class WidgetCollector(WindowCollector):
+    """
+    Widgets de la colonne droite, dans l'ordre de l'arbre :
+    (ElementRef, AutomationId, (RuntimeId, textes, ToggleState, RuntimeId du sous-arbre)),
+    la lecture attendue par widget_registry.
+    """
+
+    name = "widgets"
+    properties = ("UIA_ToggleToggleStatePropertyId",)
+    subtree = True
+    AUTOMATION_IDS = ("WidgetButton", "PortForwardingWidgetButton")
+
+    def __init__(self):
+        self._widgets = []
+        self._subtrees = _SubtreeTexts(config.WIDGET_SNAPSHOT_DEPTH)
+
+    def is_container(self, frame):
+        return frame.automation_id in self.AUTOMATION_IDS
+
+    def visit(self, frame, ancestors):
+        if frame.automation_id in self.AUTOMATION_IDS:
+            import UIAHandler
+            try:
+                toggle = TOGGLE_STATES.get(frame.element.GetCachedPropertyValue(UIAHandler.UIA_ToggleToggleStatePropertyId))
+            except:
+                toggle = None
+            runtime_id = frame.runtime_id
+            record = [runtime_id, [frame.name] if frame.name else [], toggle, {runtime_id} if runtime_id else set()]
+            self._widgets.append((frame.ref(), frame.automation_id, record))
+            self._subtrees.track(frame.element, record)
+            return
+        record = self._subtrees.owner(ancestors)
+        if record is not None:
+            if frame.name:
+                record[1].append(frame.name)
+            if frame.runtime_id:
+                record[3].add(frame.runtime_id)
+
+    def result(self):
+        return [(ref, automation_id, (record[0], record[1], record[2], frozenset(record[3])))
+                for ref, automation_id, record in self._widgets]
+
+
+class LocationButtonCollector(WindowCollector):
+    """ElementRef des boutons dynamiques de LocationDetailsPage (mêmes critères que is_location_details_dynamic_button)."""
+
+    name = "location_buttons"
+    subtree = True
+
+    def __init__(self):
+        self._buttons = []
+
+    def is_container(self, frame):
+        return frame.automation_id == "LocationDetailsPage"
+
+    def visit(self, frame, ancestors):
+        if (frame.is_xaml_button and not frame.automation_id
+                and _has_ancestor_id(ancestors, "LocationDetailsPage", 4)):
+            self._buttons.append(frame.ref())
+
+    def result(self):
+        return self._buttons
+
+
+class ConnectionDetailsCollector(WindowCollector):
+    """ElementRef des boutons de ConnectionDetailsPage (mêmes critères que is_connection_details_dynamic_button)."""
+
+    name = "connection_details_buttons"
+    subtree = True
+
+    def __init__(self):
+        self._buttons = []
+
+    def is_container(self, frame):
+        return frame.automation_id == "ConnectionDetailsPage"
+
+    def visit(self, frame, ancestors):
+        if frame.is_xaml_button and _has_ancestor_id(ancestors, "ConnectionDetailsPage", 4):
+            self._buttons.append(frame.ref())
+
+    def result(self):
+        return self._buttons
+
+
+class PromoCardCollector(WindowCollector):
+    """
+    Cartes promo : (ElementRef, type, textes) avec type "overlay" (carte de OverlayMessage,
+    au moins 2 textes) ou "vpn_plus" (sous un parent "gratuit", textes contenant "VPN Plus").
+    Les parents "gratuit" sont trouvés par sous-chaîne du nom : sans cette recherche
+    (Windows antérieur à 1809), seules les cartes de OverlayMessage sont relevées.
+    """
+
+    name = "promo_cards"
+    subtree = True
+    OVERLAY = "overlay"
+    VPN_PLUS = "vpn_plus"
+
+    def __init__(self):
+        self._cards = []
+        self._subtrees = _SubtreeTexts(5)
+
+    def condition(self, client):
+        # OverlayMessage : trouvé par son AutomationId
+        return search.name_contains_condition(client, keywords.get_phrases(keywords.FREE))
+
+    def is_container(self, frame):
+        return frame.automation_id == "OverlayMessage" or (bool(frame.name) and keywords.FREE in scan_keywords(frame.name))
+
+    def visit(self, frame, ancestors):
+        if frame.is_xaml_button:
+            kind = None
+            if not frame.automation_id and _has_ancestor_id(ancestors, "OverlayMessage", 4):
+                kind = self.OVERLAY
+            elif any(keywords.FREE in scan_keywords(parent.name) for parent in ancestors[:6] if parent.name):
+                kind = self.VPN_PLUS
+            if kind is not None:
+                texts = []
+                self._cards.append((frame.ref(), kind, texts))
+                self._subtrees.track(frame.element, texts)
+                return
+        if frame.control_type == config.UIA_TEXT_CONTROL_TYPE and frame.name:
+            texts = self._subtrees.owner(ancestors)
+            if texts is not None:
+                texts.append(frame.name)
+
+    def result(self):
+        cards = []
+        for ref, kind, texts in self._cards:
+            if kind == self.OVERLAY and len(texts) < 2:
+                continue
+            if kind == self.VPN_PLUS and keywords.VPN_PLUS not in scan_keywords(" ".join(texts)):
+                continue
+            cards.append((ref, kind, texts))
+        return cards
+
+
+# Collecteurs instanciés à chaque passe, dans cet ordre
+COLLECTORS = [
+    AutomationIdCollector,
+    ConnectButtonCollector,
+    WidgetCollector,
+    LocationButtonCollector,
+    ConnectionDetailsCollector,
+    PromoCardCollector,
+]
+
+
+# ============================================================================
+# PASSE UNIQUE
+# ============================================================================
+
+def _create_window_cache_request(client, collectors, subtree):
+    """Propriétés de tous les collecteurs ; avec le sous-arbre de l'élément si subtree."""
+    import UIAHandler
+    request = client.CreateCacheRequest()
+    properties = [
+        UIAHandler.UIA_AutomationIdPropertyId,
+        UIAHandler.UIA_ControlTypePropertyId,
+        UIAHandler.UIA_FrameworkIdPropertyId,
+        UIAHandler.UIA_NamePropertyId,
+        UIAHandler.UIA_RuntimeIdPropertyId,
+    ]
+    for collector in collectors:
+        for name in collector.properties:
+            propertyId = getattr(UIAHandler, name)
+            if propertyId not in properties:
+                properties.append(propertyId)
+    for propertyId in properties:
+        request.AddProperty(propertyId)
+    if subtree:
+        request.TreeScope = UIAHandler.TreeScope_Subtree
+        request.TreeFilter = client.RawViewCondition
+    return request
+
+
+def scan_window(client, root, job):
+    """
+    Passe de fond :
+    1. un FindAll sur l'OR des conditions des collecteurs (filtré par le fournisseur) ; les
+       éléments trouvés sont remis aux collecteurs sans sous-arbre ;
+    2. les conteneurs trouvés sont parcourus, leur sous-arbre ramené à la descente (un
+       BuildUpdatedCache chacun), dans le budget WINDOW_SCAN_MAX_NODES / WINDOW_SCAN_MAX_TIME_MS ;
+       un conteneur situé dans le sous-arbre d'un autre n'est visité qu'une fois.
+    Retourne {nom du collecteur: résultat, "matches": éléments trouvés, "nodes": noeuds
+    visités (éléments trouvés compris), "truncated": budget atteint}.
+    """
+    collectors = [collector_class() for collector_class in COLLECTORS]
+    flat = [collector for collector in collectors if not collector.subtree]
+    with_subtree = [collector for collector in collectors if collector.subtree]
+    condition = search.any_of(client, [condition for condition in (collector.condition(client) for collector in collectors)
+                                       if condition is not None])
+    found = []
+    if condition is not None:
+        found = search.find_all(root, condition, _create_window_cache_request(client, collectors, False), subtree=True)
+    job.check()
+
+    containers = []
+    for element in found:
+        frame = ScanFrame(element)
+        for collector in flat:
+            collector.visit(frame, ())
+        if any(collector.is_container(frame) for collector in with_subtree):
+            containers.append(element)
+    container_ids = {id(element) for element in containers}
+    subtree_request = _create_window_cache_request(client, with_subtree, True)
+
+    def get_children(element):
+        if element is containers:
+            return containers
+        if id(element) in container_ids:
+            with uia_breaker.timed("window_scan", bulk=True):
+                element = element.BuildUpdatedCache(subtree_request)
+        return cached_children(element)
+
+    nodes = 0
+    seen = set()
+
+    # Contexte transmis aux enfants : ScanFrame des ancêtres, parent direct en premier
+    def visit(element, depth, ancestors):
+        nonlocal nodes
+        nodes += 1
+        if not nodes % 256:
+            job.check()
+        frame = ScanFrame(element)
+        if frame.runtime_id is not None:
+            # Conteneur déjà parcouru dans le sous-arbre d'un conteneur précédent
+            if frame.runtime_id in seen:
+                return SKIP_CHILDREN
+            seen.add(frame.runtime_id)
+        for collector in with_subtree:
+            collector.visit(frame, ancestors)
+        return (frame,) + ancestors
+
+    traversal = walk(containers, get_children, visit, "window_scan", max_nodes=config.WINDOW_SCAN_MAX_NODES,
+                     max_time_ms=config.WINDOW_SCAN_MAX_TIME_MS, include_root=False, context=())
+    results = {collector.name: collector.result() for collector in collectors}
+    results["matches"] = len(found)
+    results["nodes"] = len(found) + traversal.nodes
+    results["truncated"] = traversal.truncated
+    return results
+
+
+class WindowSnapshot:
+    """État de la fenêtre relevé par une passe : résultats des collecteurs, numéro de génération."""
+
+    def __init__(self, generation, window_handle, results, max_age=None):
+        self.generation = generation
+        self.window_handle = window_handle
+        self.created_at = time.monotonic()
+        self.max_age = config.WINDOW_SNAPSHOT_REUSE_S if max_age is None else max_age
+        self._results = results
+        self._objects = {}
+        self._root = None
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+    def get(self, name, default=None):
+        return self._results.get(name, default)
+
+    def get_object(self, ref):
+        """
+        Objet NVDA d'une ElementRef de l'instantané, retrouvé une seule fois par le client UIA
+        de NVDA (thread principal) ; None si l'élément a disparu depuis la passe.
+        """
+        obj = self._objects.get(ref)
+        if obj is None:
+            if self._root is None:
+                self._root = get_window_element(self.window_handle)
+            obj = resolve_ref(ref, self._root) if self._root is not None else None
+            if obj is not None:
+                self._objects[ref] = obj
+        return obj
+
+
+class WindowScanner:
+    """
+    Passe unique partagée : request(callback) livre l'instantané courant s'il vaut encore
+    pour la fenêtre au premier plan (pas de StructureChanged depuis, âge inférieur à
+    WINDOW_SNAPSHOT_REUSE_S), sinon lance une passe dans le thread de fond.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self.generation = 0
+        self.stale = True
+        self._invalidations = 0
+        self.scans = 0
+        self.reuses = 0
+
+    def invalidate(self, runtime_id=None):
+        self.stale = True
+        self._invalidations += 1
+
+    def is_fresh(self):
+        snapshot = self.snapshot
+        if snapshot is None or self.stale or snapshot.age >= snapshot.max_age:
+            return False
+        fg = api.getForegroundObject()
+        return bool(fg) and getattr(fg, 'windowHandle', None) == snapshot.window_handle
+
+    def request(self, callback, gesture=True, max_age=None):
+        """
+        Appelle callback(snapshot) sur le thread principal ; snapshot vaut None si la passe a échoué.
+        max_age : durée de réutilisation de l'instantané produit (WINDOW_SNAPSHOT_REUSE_S par défaut).
+        Retourne le ScanJob soumis, ou None si l'instantané courant a été réutilisé.
+        """
+        callback = first_gesture.wrap(callback)
+        if self.is_fresh():
+            self.reuses += 1
+            diag.debug("windowscan", "snapshot #%d reused (%.0f ms old)", self.snapshot.generation, self.snapshot.age * 1000)
+            callback(self.snapshot)
+            return None
+        fg = api.getForegroundObject()
+        window_handle = getattr(fg, 'windowHandle', None) if fg else None
+        invalidations = self._invalidations
+        index_token = automation_id_index.load_token()
+        started = time.perf_counter()
+
+        def on_scanned(results):
+            if results is None:
+                callback(None)
+                return
+            self.generation += 1
+            self.scans += 1
+            self.snapshot = WindowSnapshot(self.generation, window_handle, results, max_age)
+            # Passe tronquée (budget atteint) : résultats partiels livrés, mais pas réutilisés
+            self.stale = self._invalidations != invalidations or bool(results.get("truncated"))
+            try:
+                automation_id_index.load(results.get("automation_ids", {}), window_handle, index_token)
+                if results.get("truncated"):
+                    automation_id_index.invalidate()
+            except Exception as e:
+                log.error(f"PROTONVPN: automation_id_index load error: {e}")
+            diag.debug("windowscan", "snapshot #%d: %d matches, %d nodes%s in %.1f ms", self.generation,
+                       results.get("matches", 0), results.get("nodes", 0), " (truncated)" if results.get("truncated") else "",
+                       (time.perf_counter() - started) * 1000)
+            callback(self.snapshot)
+
+        return scan_worker.submit(scan_window, on_scanned, window_handle, gesture)
+
+    def clear(self):
+        self.snapshot = None
+        self.stale = True
+
+
+window_scanner = WindowScanner()
+uia_events.add_structure_listener(window_scanner.invalidate)
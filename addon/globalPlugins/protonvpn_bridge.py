@@ -6,7 +6,8 @@ Enregistre explicitement le mapping entre les executables ProtonVPN et l'AppModu
 IMPORTANT: Le processus principal de l'interface graphique ProtonVPN est:
     ProtonVPN.Client.exe
 
-Ce plugin mappe ce nom vers notre AppModule.
+Ce plugin mappe ce nom vers notre AppModule. Le service ProtonVPNService.exe,
+sans interface, est associé au module vide protonvpn_backend.
 """
 
 import globalPluginHandler
@@ -34,9 +35,9 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
             log.error(f"PROTONVPN BRIDGE: Failed to register protonvpn.client: {e}")
         
         try:
-            # ProtonVPNService.exe (service backend)
-            appModuleHandler.registerExecutableWithAppModule("protonvpnservice", "protonvpnservice")
-            log.info("PROTONVPN BRIDGE: Registered 'protonvpnservice' -> 'protonvpnservice'")
+            # ProtonVPNService.exe (service backend, sans interface) -> module vide
+            appModuleHandler.registerExecutableWithAppModule("protonvpnservice", "protonvpn_backend")
+            log.info("PROTONVPN BRIDGE: Registered 'protonvpnservice' -> 'protonvpn_backend'")
         except Exception as e:
             log.error(f"PROTONVPN BRIDGE: Failed to register protonvpnservice: {e}")
         
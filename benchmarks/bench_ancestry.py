@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : prédicats sur les ancêtres avec et sans Ancestry partagée.
+
+"Avant" réinstalle les parcours obj.parent historiques (un parcours par appel) ;
+"après" utilise get_ancestry, construite une fois par élément. On compte les
+lectures de `parent` sur un arbre synthétique profond.
+
+Usage:
+    python benchmarks/bench_ancestry.py
+"""
+
+import time
+
+import fake_nvda
+from fake_nvda import ROUND_TRIPS, button, node, text, wrap
+
+fake_nvda.install()
+
+from protonvpnservice import detectors, extractors, uiautils  # noqa: E402
+
+
+# ============================================================================
+# PARCOURS HISTORIQUES (un parcours obj.parent par appel)
+# ============================================================================
+
+def legacy_has_parent_with_automation_id(obj, target_id, max_levels=4):
+    current = obj
+    for _ in range(max_levels):
+        parent = current.parent
+        if not parent:
+            break
+        if uiautils.get_automation_id(parent) == target_id:
+            return True
+        current = parent
+    return False
+
+
+def legacy_get_parent_with_automation_id(obj, target_id, max_levels=4):
+    current = obj
+    for _ in range(max_levels):
+        parent = current.parent
+        if not parent:
+            break
+        if uiautils.get_automation_id(parent) == target_id:
+            return parent
+        current = parent
+    return None
+
+
+def legacy_has_parent_with_name_containing(obj, text_fragment, max_levels=4):
+    current = obj
+    for _ in range(max_levels):
+        parent = current.parent
+        if not parent:
+            break
+        if text_fragment.lower() in (parent.name or "").lower():
+            return True
+        current = parent
+    return False
+
+
+LEGACY = {
+    "has_parent_with_automation_id": legacy_has_parent_with_automation_id,
+    "get_parent_with_automation_id": legacy_get_parent_with_automation_id,
+    "has_parent_with_name_containing": legacy_has_parent_with_name_containing,
+}
+
+
+# ============================================================================
+# ARBRE SYNTHETIQUE
+# ============================================================================
+
+def build_deep_tree(depth=30):
+    """Chaîne de `depth` conteneurs, LocationDetailsPage près du bas, puis un bouton."""
+    target = button(children=[node(children=[text("Pays"), text("France")])])
+    current = node(automationId="LocationDetailsPage", children=[node(children=[target])])
+    for level in range(depth):
+        current = node(name=f"Conteneur {level}", children=[current])
+    return target
+
+
+def run_detectors(obj):
+    """Séquence d'appels de chooseNVDAObjectOverlayClasses + LocationDetailsButton.name."""
+    detectors.is_vpn_plus_promo_button(obj)
+    detectors.is_overlay_promo_button(obj)
+    detectors.is_connection_details_dynamic_button(obj)
+    detectors.is_location_details_dynamic_button(obj)
+    detectors.has_parent_with_automation_id(obj, "LocationDetailsPage", 4)
+    extractors.get_parent_with_automation_id(obj, "LocationDetailsPage", 4)
+
+
+def measure(label, targetNode, iterations=200):
+    ROUND_TRIPS.reset()
+    run_detectors(wrap(targetNode))
+    parents = ROUND_TRIPS.byKind.get("parent", 0)
+    total = ROUND_TRIPS.total
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run_detectors(wrap(targetNode))
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<8} parent fetches={parents:<4} round-trips={total:<4} {elapsed:8.1f} us/element")
+
+
+def main():
+    targetNode = build_deep_tree()
+    # Les sous-modules importent ces fonctions par nom : on les remplace dans chacun
+    modules = (uiautils, detectors, extractors)
+    current = [{name: module.__dict__[name] for name in LEGACY if name in module.__dict__} for module in modules]
+    for module, names in zip(modules, current):
+        module.__dict__.update({name: LEGACY[name] for name in names})
+    measure("before", targetNode)
+    for module, names in zip(modules, current):
+        module.__dict__.update(names)
+    measure("after", targetNode)
+
+
+if __name__ == "__main__":
+    main()
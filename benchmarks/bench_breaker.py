@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : ProtonVPN bloqué (reconnexion, mise à jour) et disjoncteur des appels UIA.
+
+Seuils de config.py divisés par SCALE (la latence simulée aussi) pour garder le benchmark court.
+
+1. prises de focus pendant le blocage (chaque appel COM prend FROZEN_CALL_S) : durée bloquée
+   du thread principal et appels COM, disjoncteur désactivé contre activé ; noms annoncés ;
+2. passe de fond bloquée (FindAll) : le thread de surveillance ouvre le disjoncteur avant le retour
+   de l'appel ;
+3. fin du blocage : après le refroidissement, les noms sont de nouveau extraits ;
+4. appels imbriqués : l'appel englobant reste suivi après l'appel interne, un seul
+   déclenchement pour un blocage ;
+5. messages du journal (durées).
+
+Usage:
+    python benchmarks/bench_breaker.py
+"""
+
+import threading
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import AppModule, classification, config, overlays  # noqa: E402
+from protonvpnservice.breaker import uia_breaker  # noqa: E402
+
+SCALE = 10
+FROZEN_CALL_S = 0.3 / SCALE
+BACKGROUND_HANG_S = 4.0 / SCALE
+FOCUSES = 12
+READS_PER_FOCUS = 3
+FROZEN_ELEMENT_MEMBERS = ("currentName", "currentControlType", "currentAutomationId", "currentFrameworkId",
+                          "currentBoundingRectangle", "GetRuntimeId", "BuildUpdatedCache")
+FROZEN_OBJECT_MEMBERS = ("name", "role", "UIAAutomationId", "location", "children", "parent")
+
+
+class Frozen:
+    """Chaque appel COM factice prend `delay` secondes (fournisseur UIA qui ne répond plus)."""
+
+    def __init__(self, delay, element_members=FROZEN_ELEMENT_MEMBERS, object_members=FROZEN_OBJECT_MEMBERS):
+        self.delay = delay
+        self.members = [(fake_nvda.FakeUIAElement, name) for name in element_members]
+        self.members += [(fake_nvda.FakeUIA, name) for name in object_members]
+        self._saved = []
+
+    def __enter__(self):
+        delay = self.delay
+        for cls, name in self.members:
+            original = cls.__dict__[name]
+            self._saved.append((cls, name, original))
+            if isinstance(original, property):
+                def getter(obj, fget=original.fget):
+                    time.sleep(delay)
+                    return fget(obj)
+                setattr(cls, name, property(getter))
+            else:
+                def method(obj, *args, func=original):
+                    time.sleep(delay)
+                    return func(obj, *args)
+                setattr(cls, name, method)
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, original in reversed(self._saved):
+            setattr(cls, name, original)
+        self._saved = []
+
+
+def scale_config():
+    for name in ("UIA_HANG_THRESHOLD_MS", "UIA_SLOW_CALL_MS", "UIA_HANG_CHECK_INTERVAL_MS"):
+        setattr(config, name, getattr(config, name) / SCALE)
+    config.UIA_BREAKER_COOLDOWN_S /= SCALE
+
+
+def focus(app, fakeNode):
+    """Prise de focus : choix de l'overlay puis READS_PER_FOCUS lectures du nom (même objet)."""
+    obj = wrap(fakeNode)
+    clsList = []
+    app.chooseNVDAObjectOverlayClasses(obj, clsList)
+    if clsList:
+        overlay = wrap(fakeNode, clsList[0])
+        overlay.__dict__.update(obj.__dict__)
+        obj = overlay
+    return [obj.name for _ in range(READS_PER_FOCUS)][-1]
+
+
+def overlay_buttons(root):
+    return [n for n in uia_snapshot.find_nodes(root, uia_snapshot.is_button)
+            if classification.classify_overlay(wrap(n)) is not None]
+
+
+def frozen_focuses(app, buttons, enabled):
+    hang, slow_calls = config.UIA_HANG_THRESHOLD_MS, config.UIA_SLOW_CALLS_TO_TRIP
+    if not enabled:
+        config.UIA_HANG_THRESHOLD_MS, config.UIA_SLOW_CALLS_TO_TRIP = float("inf"), 10 ** 9
+    uia_breaker.reset()
+    classification.classification_cache.clear()
+    overlays.overlay_text_cache.clear()
+    ROUND_TRIPS.reset()
+    names = []
+    with Frozen(FROZEN_CALL_S):
+        start = time.perf_counter()
+        for index in range(FOCUSES):
+            names.append(focus(app, buttons[index % len(buttons)]))
+        elapsed = time.perf_counter() - start
+    config.UIA_HANG_THRESHOLD_MS, config.UIA_SLOW_CALLS_TO_TRIP = hang, slow_calls
+    label = "breaker on " if enabled else "breaker off"
+    print(f"  {label}: {FOCUSES} focuses blocked {elapsed * 1000:7.0f} ms ({elapsed / FOCUSES * 1000:6.1f} ms/focus), "
+          f"{ROUND_TRIPS.total} COM calls, trips={uia_breaker.trips}, skipped={uia_breaker.skipped}")
+    return elapsed, names
+
+
+def background_hang():
+    """Passe de fond bloquée sur FindAll : ouverture détectée avant le retour."""
+    from protonvpnservice import windowscan
+    uia_breaker.reset()
+    client = fake_nvda.sys.modules["UIAHandler"].handler.clientObject
+    element = client.ElementFromHandle(0)
+    with Frozen(BACKGROUND_HANG_S, element_members=("FindAllBuildCache",), object_members=()):
+        worker = threading.Thread(target=windowscan.scan_window, args=(client, element, _InlineJob()))
+        start = time.perf_counter()
+        worker.start()
+        while not uia_breaker.is_open and worker.is_alive():
+            time.sleep(0.001)
+        opened_ms = (time.perf_counter() - start) * 1000
+        still_running = worker.is_alive()
+        worker.join()
+    assert uia_breaker.is_open and still_running, (opened_ms, still_running)
+    print(f"  background scan hung {BACKGROUND_HANG_S * 1000:.0f} ms: breaker open after {opened_ms:.0f} ms, "
+          f"call still in progress (threshold {config.UIA_HANG_THRESHOLD_MS:.0f} ms)")
+
+
+def nested_calls():
+    """Un appel interne bloqué dans un appel englobant : un déclenchement, l'englobant toujours suivi."""
+    uia_breaker.reset()
+    trips = uia_breaker.trips
+    thread_id = threading.get_ident()
+    with uia_breaker.timed("outer"):
+        with uia_breaker.timed("inner"):
+            time.sleep(config.UIA_HANG_THRESHOLD_MS * 1.5 / 1000)
+        outer_tracked = [call.key for call in uia_breaker._in_flight.get(thread_id, ())] == ["outer"]
+    assert outer_tracked and uia_breaker.trips == trips + 1 and thread_id not in uia_breaker._in_flight
+    print(f"  nested calls: outer still tracked after inner returned, 1 trip ({uia_breaker.last_trip[0]})")
+
+
+def recovery(app, fakeNode):
+    time.sleep(config.UIA_BREAKER_COOLDOWN_S)
+    name = focus(app, fakeNode)
+    assert not uia_breaker.is_open
+    return name
+
+
+class _InlineJob:
+    cancelled = False
+
+    def check(self):
+        pass
+
+
+def main():
+    scale_config()
+    app = AppModule()
+    root = uia_snapshot.build_dashboard(True)
+    FOREGROUND["obj"] = wrap(root)
+    buttons = overlay_buttons(root)
+    expected = [focus(app, n) for n in buttons]
+    print(f"=== dashboard connected: {len(buttons)} overlay buttons, {FROZEN_CALL_S * 1000:.0f} ms per frozen COM call ===")
+
+    off_s, _ = frozen_focuses(app, buttons, enabled=False)
+    on_s, names = frozen_focuses(app, buttons, enabled=True)
+    print(f"  main thread blocked {off_s / on_s:.1f}x less; names while open: {sorted(set(names))}")
+    assert on_s < off_s / 2, (on_s, off_s)
+
+    # Bouton à valeur extraite ("Libellé : valeur")
+    index = next(i for i, name in enumerate(expected) if " : " in name)
+    name = recovery(app, buttons[index])
+    print(f"  after cool-down ({config.UIA_BREAKER_COOLDOWN_S * 1000:.0f} ms): {name!r}")
+    assert name == expected[index], (name, expected[index])
+
+    background_hang()
+    time.sleep(config.UIA_BREAKER_COOLDOWN_S)
+    assert not uia_breaker.is_open
+    nested_calls()
+    uia_breaker.reset()
+
+    log = fake_nvda.sys.modules["logHandler"].log
+    for level, message in log.records:
+        if "UIA c" in message:
+            print(f"  log {level}: {message}")
+    print("  " + uia_breaker.format_stats().strip())
+    uia_breaker.stop()
+
+
+if __name__ == "__main__":
+    main()
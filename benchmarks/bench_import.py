@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : coût d'import du module d'application.
+
+Chaque mesure s'exécute dans un interpréteur neuf, sans bytecode en cache (compilation
+comprise, comme au premier chargement par NVDA). Les modules de la bibliothèque standard
+déjà chargés par NVDA sont importés avant la mesure.
+
+- entry    : point d'entrée seul (ProtonVPN.Client.exe au chargement du module)
+- complete : point d'entrée + tous les sous-modules (coût de l'ancien fichier unique)
+- backend  : module vide de ProtonVPNService.exe
+
+Usage:
+    python benchmarks/bench_import.py [répétitions]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SUBMODULES = (
+    "config", "diagnostics", "instrumentation", "paths", "breaker", "traversal", "uiautils", "events", "detectors", "keywords", "textclassifier", "extractors",
+    "overlays", "classification", "widgets", "search", "scanning", "windowscan", "warmup", "live", "throughput", "debugtools",
+)
+
+SCENARIOS = {
+    "entry": "import protonvpnservice",
+    "complete": "import protonvpnservice\n" + "\n".join(f"import protonvpnservice.{name}" for name in SUBMODULES),
+    "backend": "import protonvpn_backend",
+}
+
+MEASURE = '''
+import sys, time
+sys.path.insert(0, {dir!r})
+import fake_nvda
+fake_nvda.install()
+# Bibliothèque standard déjà chargée dans NVDA : hors mesure
+import array, collections, datetime, functools, json, math, queue, re, threading
+start = time.perf_counter()
+{statement}
+print((time.perf_counter() - start) * 1000)
+print(sum(1 for name in sys.modules if name.startswith("protonvpn")))
+'''
+
+
+def measure(statement):
+    with tempfile.TemporaryDirectory() as cacheDir:
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", PYTHONPYCACHEPREFIX=cacheDir)
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE.format(dir=BENCHMARKS_DIR, statement=statement)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout.split()
+    return float(output[0]), int(output[1])
+
+
+def main(argv):
+    repeats = int(argv[0]) if argv else 20
+    print(f"{'scenario':<10} {'median ms':>10} {'min ms':>8} {'modules':>8}")
+    for label, statement in SCENARIOS.items():
+        results = [measure(statement) for _ in range(repeats)]
+        times = [elapsed for elapsed, _ in results]
+        print(f"{label:<10} {statistics.median(times):>10.2f} {min(times):>8.2f} {results[0][1]:>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
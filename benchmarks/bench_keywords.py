@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : recherche des mots-clés de l'interface (keywords).
+
+Compare, pour les textes d'un tableau de bord, le test de chaque mot-clé un par un
+(`in`, comme auparavant) et l'automate compilé, avec 2 langues chargées puis toutes ;
+vérifie ensuite la détection des boutons sous une interface allemande.
+
+Usage:
+    python benchmarks/bench_keywords.py
+"""
+
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, LANGUAGE, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from fake_nvda import button, node, text  # noqa: E402
+from protonvpnservice import classification, keywords, overlays, windowscan  # noqa: E402
+
+
+def naive_scan(phrases_by_concept, value):
+    lowered = value.lower()
+    return frozenset(concept for concept, phrases in phrases_by_concept.items()
+                     if any(phrase in lowered for phrase in phrases))
+
+
+def merged_keywords(languages):
+    merged = {concept: list(phrases) for concept, phrases in keywords.COMMON_KEYWORDS.items()}
+    for language in languages:
+        for concept, phrases in keywords.KEYWORDS[language].items():
+            merged.setdefault(concept, []).extend(phrases)
+    return merged
+
+
+def dashboard_texts():
+    texts = []
+    for connected in (False, True):
+        for n in uia_snapshot.build_dashboard(connected).iter_subtree():
+            if n.name:
+                texts.append(n.name)
+    return texts
+
+
+def bench(label, languages, texts, repeat=500):
+    merged = merged_keywords(languages)
+    matcher = keywords.KeywordMatcher(merged)
+    for value in texts:
+        assert naive_scan(merged, value) == matcher.scan(value), value
+    phrases = sum(len(p) for p in merged.values())
+    for name, func in (("one by one", lambda v: naive_scan(merged, v)), ("automaton", matcher.scan)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for value in texts:
+                func(value)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<14} {phrases:>4} phrases  {name:<11} {elapsed / (repeat * len(texts)) * 1e6:6.2f} us/text")
+
+
+def check_german_ui():
+    """Interface allemande : promo "Kostenlos", bouton "Verbinden" sans AutomationId attendu."""
+    LANGUAGE["code"] = "de_DE"
+    keywords._matcher = None
+    keywords._location_labels = None
+    keywords.scan_keywords.cache_clear()
+    promo = button(children=[node(children=[text("VPN Plus"), text("Mehr als 110 Länder")])])
+    connect = button("Verbinden", "QuickConnectButton")
+    root = node(name="Proton VPN", children=[
+        node(name="Kostenloser Plan", children=[node(children=[promo])]),
+        node(children=[connect]),
+    ])
+    FOREGROUND["obj"] = wrap(root)
+    assert classification.classify_overlay(wrap(promo)) is overlays.ProtonVPNPlusPromoButton
+    client = fake_nvda.sys.modules["UIAHandler"].handler.clientObject
+
+    class _Job:
+        cancelled = False
+
+        def check(self):
+            pass
+
+    results = windowscan.scan_window(client, client.ElementFromHandle(0), _Job())
+    ref, is_disconnecting = results["connect_button"]
+    button_obj = windowscan.WindowSnapshot(0, FOREGROUND["obj"].windowHandle, results).get_object(ref)
+    assert button_obj.name == "Verbinden" and not is_disconnecting
+    print(f"de_DE: languages={keywords.get_ui_languages()} promo and connect button detected")
+
+
+def main():
+    texts = dashboard_texts()
+    bench("fr + en", ("fr", "en"), texts)
+    bench("all languages", tuple(keywords.KEYWORDS), texts)
+    check_german_ui()
+
+
+if __name__ == "__main__":
+    main()
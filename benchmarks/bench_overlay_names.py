@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : noms des overlays avec et sans cache (overlay_text_cache).
+
+NVDA lit `name` plusieurs fois par prise de focus (parole, braille, revue). On simule
+READS_PER_FOCUS lectures sur des objets neufs, pour chaque bouton à nom calculé du
+tableau de bord, puis on vérifie qu'un NameChanged sur un texte descendant invalide
+l'entrée du bouton, qu'un RuntimeId recyclé ne retrouve pas le nom de l'ancien bouton
+(ChildRemoved, ou empreinte de structure sans événement), que le budget en octets est respecté (éviction LRU) et que la perte
+du focus vide le cache.
+
+Usage:
+    python benchmarks/bench_overlay_names.py
+"""
+
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import classification, overlays  # noqa: E402
+from protonvpnservice.events import uia_events  # noqa: E402
+
+READS_PER_FOCUS = 6
+CACHED_OVERLAYS = (
+    overlays.ProtonVPNLocationDetailsButton,
+    overlays.ProtonVPNConnectionDetailsButton,
+    overlays.ProtonVPNOverlayPromoButton,
+)
+
+
+def overlay_buttons(root):
+    result = []
+    for candidate in uia_snapshot.find_nodes(root, uia_snapshot.is_button):
+        cls = classification.classify_overlay(wrap(candidate))
+        if cls in CACHED_OVERLAYS:
+            result.append((candidate, cls))
+    return result
+
+
+def measure(label, buttons, max_age_s, focuses=50):
+    overlays.overlay_text_cache.clear()
+    overlays.overlay_text_cache.reset_stats()
+    overlays.overlay_text_cache.max_age_s = max_age_s
+    ROUND_TRIPS.reset()
+    start = time.perf_counter()
+    for _ in range(focuses):
+        for fakeNode, cls in buttons:
+            for _ in range(READS_PER_FOCUS):
+                wrap(fakeNode, cls).name
+    elapsed = time.perf_counter() - start
+    reads = focuses * len(buttons) * READS_PER_FOCUS
+    stats = overlays.overlay_text_cache.stats()
+    print(f"{label:<28} round-trips/read={ROUND_TRIPS.total / reads:6.2f} "
+          f"{elapsed / reads * 1e6:8.1f} us/read  hit rate={stats['hit_rate']:.0%}")
+
+
+def check_invalidation(root):
+    """Un NameChanged sur le texte valeur doit changer le nom annoncé à la lecture suivante."""
+    overlays.overlay_text_cache.max_age_s = 60
+    fakeNode, cls = next((n, c) for n, c in overlay_buttons(root) if c is overlays.ProtonVPNConnectionDetailsButton)
+    before = wrap(fakeNode, cls).name
+    valueNode = [n for n in fakeNode.iter_subtree() if uia_snapshot.is_text(n)][-1]
+    valueNode.name = "99 Mo"
+    stale = wrap(fakeNode, cls).name
+    uia_events.notify_name_changed(valueNode.runtimeId)
+    after = wrap(fakeNode, cls).name
+    assert stale == before and after != before, (before, stale, after)
+    print(f"invalidation: {before!r} -> {after!r}")
+
+
+def check_recycled_runtime_id(root):
+    """
+    UIA réattribue le RuntimeId d'un bouton retiré à un autre bouton : ChildRemoved invalide
+    l'entrée de l'ancien ; sans événement, l'empreinte (AutomationId différent) la manque.
+    """
+    overlays.overlay_text_cache.max_age_s = 60
+    buttons = [(n, c) for n, c in overlay_buttons(root) if c is overlays.ProtonVPNConnectionDetailsButton]
+    for (oldNode, cls), (newNode, _), event in ((buttons[0], buttons[-1], False), (buttons[1], buttons[-1], True)):
+        before = wrap(oldNode, cls).name
+        oldNode.parent.children.remove(oldNode)
+        if event:
+            # Même AutomationId : seule l'invalidation par ChildRemoved distingue les deux boutons
+            newNode.automationId = oldNode.automationId
+            uia_events.notify_structure_changed(oldNode.runtimeId)
+        newNode.runtimeId = oldNode.runtimeId
+        recycled = wrap(newNode, cls).name
+        assert recycled != before and "0 o/s" in recycled, (before, recycled)
+        print(f"recycled RuntimeId ({'ChildRemoved' if event else 'no event'}): {before!r} -> {recycled!r}")
+
+
+def check_budget_and_flush(root):
+    cache = overlays.overlay_text_cache
+    cache.clear()
+    cache.reset_stats()
+    cache.max_age_s = 60
+    buttons = overlay_buttons(root)
+    for fakeNode, cls in buttons:
+        wrap(fakeNode, cls).name
+    full = cache.stats()["bytes"]
+    cache.clear()
+    cache.max_bytes = full // 2
+    for fakeNode, cls in buttons:
+        wrap(fakeNode, cls).name
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes and stats["evictions"] > 0, stats
+    print(f"byte budget {cache.max_bytes}: {stats['entries']}/{len(buttons)} entries kept, "
+          f"{stats['bytes']} bytes, {stats['evictions']} evicted")
+    cache.max_bytes = overlays.config.OVERLAY_TEXT_CACHE_MAX_BYTES
+    from protonvpnservice import AppModule
+    AppModule().event_appModule_loseFocus()
+    assert len(cache) == 0
+    print("loseFocus: cache flushed")
+
+
+def main():
+    for connected in (False, True):
+        root = uia_snapshot.build_dashboard(connected)
+        FOREGROUND["obj"] = wrap(root)
+        buttons = overlay_buttons(root)
+        state = "connected" if connected else "disconnected"
+        measure(f"{state} uncached", buttons, 0)
+        measure(f"{state} cached", buttons, 2.0)
+    check_invalidation(uia_snapshot.build_dashboard(True))
+    check_recycled_runtime_id(uia_snapshot.build_dashboard(True))
+    check_budget_and_flush(uia_snapshot.build_dashboard(True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : table de règles compilée (classification.classify_overlay) contre la chaîne
+if/elif historique, sur les arbres enregistrés et des arbres synthétiques.
+
+Chaque bouton est classé sur un objet neuf (comme à chaque prise de focus dans NVDA),
+sans le cache par RuntimeId. Les deux versions doivent donner la même classe partout.
+
+Usage:
+    python benchmarks/bench_overlay_rules.py [tailles...]
+"""
+
+import sys
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import controlTypes  # noqa: E402
+import uia_snapshot  # noqa: E402
+from protonvpnservice import classification, overlays  # noqa: E402
+from protonvpnservice.detectors import (  # noqa: E402
+    is_connection_details_dynamic_button,
+    is_location_details_dynamic_button,
+    is_overlay_promo_button,
+    is_vpn_plus_promo_button,
+)
+from protonvpnservice.uiautils import get_automation_id, get_framework_id  # noqa: E402
+
+SYNTHETIC_SIZES = (1000, 10000)
+
+
+# ============================================================================
+# CHAINE HISTORIQUE (avant la table de règles)
+# ============================================================================
+
+def legacy_classify_overlay(obj):
+    if obj.role != controlTypes.Role.BUTTON:
+        return None
+    if get_framework_id(obj) != "XAML":
+        return None
+    automationId = get_automation_id(obj)
+    if automationId == "ConnectionCardConnectButton":
+        return overlays.ProtonVPNConnectButton
+    if is_vpn_plus_promo_button(obj):
+        return overlays.ProtonVPNPlusPromoButton
+    if is_overlay_promo_button(obj):
+        return overlays.ProtonVPNOverlayPromoButton
+    if is_connection_details_dynamic_button(obj):
+        return overlays.ProtonVPNConnectionDetailsButton
+    if is_location_details_dynamic_button(obj):
+        return overlays.ProtonVPNLocationDetailsButton
+    if automationId == "WidgetButton":
+        return overlays.ProtonVPNWidgetButton
+    if automationId in ("PortForwardingWidgetButton", "SettingsButton", "TitleBarMenuButton"):
+        return overlays.ProtonVPNSideWidgetButton
+    name = obj.name or ""
+    if not name or len(name.strip()) <= 2:
+        return overlays.ProtonVPNGenericButton
+    return None
+
+
+def measure(func, nodes, repeat):
+    ROUND_TRIPS.reset()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(wrap(n)) for n in nodes]
+    elapsed = time.perf_counter() - start
+    calls = len(nodes) * repeat
+    return results, elapsed / calls * 1e6, ROUND_TRIPS.total / calls
+
+
+def run_tree(name, root, repeat=5):
+    FOREGROUND["obj"] = wrap(root)
+    # Tous les contrôles : les non-boutons sont écartés dès le rôle
+    nodes = list(root.iter_subtree())
+    legacy, legacy_us, legacy_trips = measure(legacy_classify_overlay, nodes, repeat)
+    compiled, compiled_us, compiled_trips = measure(classification.classify_overlay, nodes, repeat)
+    mismatches = [(n.automationId, a, b) for n, a, b in zip(nodes, legacy, compiled) if a is not b]
+    assert not mismatches, mismatches[:5]
+    matched = sum(1 for cls in compiled if cls is not None)
+    print(f"{name:<32} nodes={len(nodes):>6} overlays={matched:>4}  "
+          f"chain {legacy_us:7.1f} us {legacy_trips:5.2f} trips  "
+          f"rules {compiled_us:7.1f} us {compiled_trips:5.2f} trips")
+
+
+def main(argv):
+    sizes = tuple(int(arg) for arg in argv) or SYNTHETIC_SIZES
+    for name, root in uia_snapshot.recorded_snapshots():
+        run_tree(f"recorded {name}", root)
+    for connected in (False, True):
+        state = "connected" if connected else "disconnected"
+        run_tree(f"dashboard {state}", uia_snapshot.build_dashboard(connected))
+        for size in sizes:
+            run_tree(f"synthetic {size} {state}", uia_snapshot.build_synthetic_tree(size, connected), repeat=1)
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    main(sys.argv[1:])
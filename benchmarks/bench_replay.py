@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de rejeu : détecteurs et extracteurs du module sur des arbres UIA enregistrés
+(benchmarks/snapshots/*.json) et sur des arbres synthétiques de 100 à 50 000 noeuds.
+
+Pour chaque fonction : nombre d'appels, durée moyenne et allers-retours COM par appel.
+
+Usage:
+    python benchmarks/bench_replay.py [tailles...]
+"""
+
+import sys
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+from protonvpnservice import classification, detectors, extractors, scanning, uiautils, windowscan  # noqa: E402
+import uia_snapshot  # noqa: E402
+
+SYNTHETIC_SIZES = (100, 1000, 10000, 50000)
+
+
+class _InlineJob:
+    """Job factice pour exécuter les parcours du thread de fond sur le thread courant."""
+
+    cancelled = False
+
+    def check(self):
+        pass
+
+
+def timed(results, label, func, targets):
+    """Exécute func sur chaque cible ; accumule (appels, secondes, allers-retours)."""
+    if not targets:
+        return
+    ROUND_TRIPS.reset()
+    start = time.perf_counter()
+    for target in targets:
+        func(target)
+    elapsed = time.perf_counter() - start
+    calls, total, trips = results.get(label, (0, 0.0, 0))
+    results[label] = (calls + len(targets), total + elapsed, trips + ROUND_TRIPS.total)
+
+
+def run_tree(name, root):
+    FOREGROUND["obj"] = wrap(root)
+    classification.classification_cache.clear()
+    scanning.automation_id_index.clear()
+    client = fake_nvda.sys.modules["UIAHandler"].handler.clientObject
+    rootElement = client.ElementFromHandle(0)
+    results = {}
+
+    buttons = uia_snapshot.find_nodes(root, uia_snapshot.is_button)
+    location = [n for n in buttons if detectors.is_location_details_dynamic_button(wrap(n))]
+    connection = [n for n in buttons if detectors.is_connection_details_dynamic_button(wrap(n))]
+    promos = [n for n in buttons if detectors.is_overlay_promo_button(wrap(n))
+              or detectors.is_vpn_plus_promo_button(wrap(n))]
+
+    # Parcours de fenêtre complète
+    timed(results, "scan_window", lambda r: windowscan.scan_window(client, r, _InlineJob()), [rootElement])
+
+    # Détecteurs (sur tous les boutons, objets neufs comme dans NVDA)
+    timed(results, "classify_overlay", lambda n: classification.classify_overlay(wrap(n)), buttons)
+    for detector in ("is_vpn_plus_promo_button", "is_overlay_promo_button",
+                     "is_connection_details_dynamic_button", "is_location_details_dynamic_button"):
+        func = getattr(detectors, detector)
+        timed(results, detector, lambda n, func=func: func(wrap(n)), buttons)
+
+    # Extracteurs (sur leurs cibles)
+    timed(results, "get_location_button_index", lambda n: detectors.get_location_button_index(wrap(n)), location)
+    timed(results, "extract_dynamic_value",
+          lambda n: extractors.extract_dynamic_value(wrap(n), detectors.get_location_button_index(wrap(n))),
+          location)
+    timed(results, "extract_connection_details", lambda n: extractors.extract_connection_details_label_and_values(wrap(n)), connection)
+    timed(results, "extract_overlay_promo_text", lambda n: extractors.extract_overlay_promo_text(wrap(n)), promos)
+    texts = [[t[0] for t in uiautils.get_text_descendants(wrap(n))] for n in location]
+    for labelType in ("ip", "pays", "fournisseur"):
+        timed(results, f"extract_value_for_label_type[{labelType}]",
+              lambda t, labelType=labelType: extractors.extract_value_for_label_type(t, labelType), texts)
+
+    print(f"\n=== {name} ({uia_snapshot.count_nodes(root)} nodes, {len(buttons)} buttons) ===")
+    print(f"{'function':<40} {'calls':>7} {'mean us':>10} {'trips/call':>11}")
+    for label, (calls, total, trips) in results.items():
+        print(f"{label:<40} {calls:>7} {total / calls * 1e6:>10.1f} {trips / calls:>11.1f}")
+
+
+def main(argv):
+    sizes = tuple(int(arg) for arg in argv) or SYNTHETIC_SIZES
+    for name, root in uia_snapshot.recorded_snapshots():
+        run_tree(f"recorded {name}", root)
+    for size in sizes:
+        for connected in (False, True):
+            state = "connected" if connected else "disconnected"
+            run_tree(f"synthetic {size} {state}", uia_snapshot.build_synthetic_tree(size, connected))
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : index des AutomationId chargé par la passe de fond (FindAll natif).
+
+Compare au parcours historique (children des NVDAObject sur le thread principal) sur des
+arbres synthétiques : mêmes résultats, allers-retours COM et NVDAObject créés. Les parcours
+du thread de fond sont comparés à la passe unique dans bench_window_scan.py.
+
+Le fournisseur factice évalue les conditions en Python : seuls les allers-retours et les
+objets créés sont représentatifs, pas les durées.
+
+Usage:
+    python benchmarks/bench_search.py [tailles...]
+"""
+
+import sys
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import scanning  # noqa: E402
+from protonvpnservice.uiautils import get_automation_id  # noqa: E402
+
+SIZES = (1000, 10000, 50000)
+
+
+def legacy_build_index(root, max_depth=15):
+    elements = {}
+
+    def recurse(obj, depth):
+        if depth > max_depth:
+            return
+        automation_id = get_automation_id(obj)
+        if automation_id:
+            elements.setdefault(automation_id, []).append(obj)
+        for child in obj.children:
+            recurse(child, depth + 1)
+
+    recurse(root, 0)
+    return elements
+
+
+class CountingWrap:
+    """Compte les NVDAObject créés (FakeUIA.__init__)."""
+
+    count = 0
+
+    def __enter__(self):
+        self._init = fake_nvda.FakeUIA.__init__
+        CountingWrap.count = 0
+
+        def init(obj, *args, **kwargs):
+            CountingWrap.count += 1
+            self._init(obj, *args, **kwargs)
+
+        fake_nvda.FakeUIA.__init__ = init
+        return self
+
+    def __exit__(self, *exc):
+        fake_nvda.FakeUIA.__init__ = self._init
+
+
+def measure(label, func):
+    ROUND_TRIPS.reset()
+    with CountingWrap():
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    print(f"  {label:<34} round-trips={ROUND_TRIPS.total:>7} objects={CountingWrap.count:>6} {elapsed * 1000:8.1f} ms")
+    return result
+
+
+def run(size, connected):
+    root = uia_snapshot.build_synthetic_tree(size, connected)
+    FOREGROUND["obj"] = wrap(root)
+    print(f"=== synthetic {uia_snapshot.count_nodes(root)} nodes {'connected' if connected else 'disconnected'} ===")
+    before = measure("index build NVDAObject children", lambda: legacy_build_index(FOREGROUND["obj"]))
+    scanning.automation_id_index.clear()
+    measure("index load (window scan)", lambda: scanning.automation_id_index.refresh_async(lambda: None, force=True))
+    expected = {key: [obj._node.runtimeId for obj in objs] for key, objs in before.items()}
+    native = {key: [ref.runtime_id for ref in scanning.automation_id_index._elements[key]] for key in expected}
+    assert expected == native
+    measure("index find_all('WidgetButton')", lambda: scanning.automation_id_index.find_all("WidgetButton"))
+
+
+def main(argv):
+    for size in tuple(int(arg) for arg in argv) or SIZES:
+        for connected in (False, True):
+            run(size, connected)
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10000)
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : position des boutons parmi leurs frères, parcours obj.previous contre
+index des frères (un seul appel UIA par conteneur).
+
+Lit à la suite les N boutons d'un conteneur (boutons LocationDetailsPage sans
+AutomationId, puis WidgetButton), sur des objets neufs comme dans NVDA.
+
+Usage:
+    python benchmarks/bench_siblings.py [tailles...]
+"""
+
+import sys
+import time
+
+import fake_nvda
+from fake_nvda import ROUND_TRIPS, button, node, wrap
+
+fake_nvda.install()
+
+from protonvpnservice import detectors, uiautils  # noqa: E402
+
+SIZES = (3, 10, 50)
+
+
+def build_container(count, automationId=""):
+    return node(children=[button(automationId=automationId, rect=(400 * i, 1000, 400 * i + 300, 1100))
+                          for i in range(count)])
+
+
+def measure(label, container, func, useIndex):
+    uiautils.sibling_index.clear()
+    get = uiautils.sibling_index.get
+    if not useIndex:
+        uiautils.sibling_index.get = lambda obj: None
+    try:
+        ROUND_TRIPS.reset()
+        start = time.perf_counter()
+        result = [func(wrap(child)) for child in container.children]
+        elapsed = time.perf_counter() - start
+    finally:
+        uiautils.sibling_index.get = get
+    mode = "index" if useIndex else "previous"
+    print(f"{label:<28} {mode:<9} round-trips={ROUND_TRIPS.total:<6} {elapsed * 1e6:10.1f} us")
+    return result
+
+
+def main(argv):
+    sizes = tuple(int(arg) for arg in argv) or SIZES
+    for size in sizes:
+        for label, container, func in (
+            (f"location buttons x{size}", build_container(size), detectors.get_location_button_index),
+            (f"widget buttons x{size}", build_container(size, "WidgetButton"), detectors.count_same_type_siblings_before),
+        ):
+            before = measure(label, container, func, False)
+            after = measure(label, container, func, True)
+            assert before == after == list(range(size)), (before, after)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
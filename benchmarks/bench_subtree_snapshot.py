@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : get_text_descendants avec et sans instantané de sous-arbre.
+
+Compte les allers-retours COM simulés (fake_nvda.ROUND_TRIPS) pour le parcours
+historique via node.children et pour l'instantané BuildUpdatedCache.
+
+Mesure aussi le pire cas des contrôles lus en un seul appel (SUBTREE_SNAPSHOT_CONTROL_TYPES)
+sur les tableaux de bord enregistrés, et le coût borné de l'instantané niveau par niveau
+d'un élément de taille inconnue (la fenêtre).
+
+Usage:
+    python benchmarks/bench_subtree_snapshot.py
+"""
+
+import time
+
+import fake_nvda
+from fake_nvda import ROUND_TRIPS, button, node, text, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import config, uiautils  # noqa: E402
+
+
+def build_location_button():
+    """Bouton LocationDetailsPage typique : grilles imbriquées + libellé et valeur."""
+    return button(children=[
+        node(children=[
+            node(children=[
+                text("Votre adresse IP"),
+                node(children=[text("203.0.113.42")]),
+            ]),
+            node(children=[node(), node()]),
+        ]),
+    ])
+
+
+def build_promo_card():
+    """Carte promo OverlayMessage avec plusieurs paragraphes."""
+    return button(children=[
+        node(children=[
+            text("VPN Plus"),
+            node(children=[text(f"Avantage {i}") for i in range(8)]),
+            node(children=[node(children=[text("Accédez à plus de 110 pays")])]),
+        ]),
+    ])
+
+
+def measure(label, obj, useSnapshot, iterations=200):
+    config.USE_SUBTREE_SNAPSHOT = useSnapshot
+    ROUND_TRIPS.reset()
+    result = uiautils.get_text_descendants(obj)
+    roundTrips = ROUND_TRIPS.total
+    start = time.perf_counter()
+    for _ in range(iterations):
+        uiautils.get_text_descendants(obj)
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    mode = "snapshot" if useSnapshot else "children"
+    print(f"{label:<20} {mode:<9} round-trips={roundTrips:<4} texts={len(result):<3} {elapsed:8.1f} us/call")
+    return result
+
+
+def subtree_size(tree):
+    return sum(1 for _ in tree.iter_subtree())
+
+
+def check_bounded_worst_case():
+    """Plus grand sous-arbre d'un contrôle lu en un seul appel, sur les tableaux de bord et la carte promo."""
+    worst = 0
+    for root in (uia_snapshot.build_dashboard(False), uia_snapshot.build_dashboard(True), build_promo_card()):
+        for tree in root.iter_subtree():
+            if tree.controlType in config.SUBTREE_SNAPSHOT_CONTROL_TYPES:
+                worst = max(worst, subtree_size(tree))
+    print(f"bounded controls     worst-case subtree={worst} nodes")
+    assert worst <= 20, worst
+
+
+def check_unknown_size(max_nodes=40):
+    """La fenêtre n'est jamais lue en portée Subtree : un appel par noeud développé, dans le budget."""
+    root = uia_snapshot.build_dashboard(True)
+    ROUND_TRIPS.reset()
+    snapshot = uiautils.get_subtree_snapshot(wrap(root), max_depth=40, max_nodes=max_nodes)
+    read = sum(1 for _ in _iter_snapshot(snapshot))
+    print(f"window ({subtree_size(root)} nodes) levels    round-trips={ROUND_TRIPS.total:<4} nodes read={read} "
+          f"truncated={snapshot.truncated}")
+    assert snapshot.truncated and read <= max_nodes, read
+    assert ROUND_TRIPS.byKind.get("BuildUpdatedCache", 0) <= max_nodes, ROUND_TRIPS.byKind
+
+
+def _iter_snapshot(snapshot):
+    yield snapshot
+    for child in snapshot.children:
+        yield from _iter_snapshot(child)
+
+
+def main():
+    for label, tree in (("location button", build_location_button()), ("promo card", build_promo_card())):
+        obj = wrap(tree)
+        before = measure(label, obj, False)
+        after = measure(label, obj, True)
+        assert [t[0] for t in before] == [t[0] for t in after], "snapshot and children walk disagree"
+    config.USE_SUBTREE_SNAPSHOT = True
+    check_bounded_worst_case()
+    check_unknown_size()
+
+
+if __name__ == "__main__":
+    main()
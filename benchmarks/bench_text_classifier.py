@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : classification des textes en une passe (textclassifier).
+
+1. extract_value_for_label_type : version historique (listes, minuscules répétées,
+   IPv4 seulement) contre le classifieur, sur les textes des tableaux de bord.
+2. Noms des trois boutons LocationDetailsPage à chaque prise de focus (cache des noms
+   vidé) : extraction par bouton contre un enregistrement de page mémorisé sous le
+   RuntimeId du parent.
+3. Etiquettes de quelques chaînes représentatives (IPv6 comprise).
+
+Usage:
+    python benchmarks/bench_text_classifier.py
+"""
+
+import re
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import classification, extractors, overlays, textclassifier, uiautils  # noqa: E402
+
+IP_REGEX = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}\b')
+
+
+def legacy_extract_value_for_label_type(texts, label_type):
+    if not texts:
+        return None
+    filtered = []
+    labels_to_skip = ["votre adresse ip", "adresse ip", "ip", "pays", "fournisseur", "provider", "country"]
+    for t in texts:
+        text = t.strip() if isinstance(t, str) else t
+        if not text:
+            continue
+        if text.lower() in labels_to_skip:
+            continue
+        filtered.append(text)
+    if not filtered:
+        return None
+    if label_type == "ip":
+        for text in filtered:
+            match = IP_REGEX.search(text)
+            if match:
+                return match.group()
+        for text in filtered:
+            if any(c.isdigit() for c in text) and "." in text:
+                return text
+    elif label_type == "pays":
+        for text in filtered:
+            if len(text) <= 30 and not any(c.isdigit() for c in text):
+                if text.lower() not in labels_to_skip:
+                    return text
+    elif label_type == "fournisseur":
+        for text in filtered:
+            if len(text) <= 50:
+                if text.lower() not in labels_to_skip:
+                    return text
+    return filtered[0] if filtered else None
+
+
+def location_buttons(root):
+    return [n for n in uia_snapshot.find_nodes(root, uia_snapshot.is_button)
+            if classification.classify_overlay(wrap(n)) is overlays.ProtonVPNLocationDetailsButton]
+
+
+def bench_value_selection(texts_by_button, repeat=2000):
+    cases = [(texts, label_type) for texts in texts_by_button for label_type in ("ip", "pays", "fournisseur")]
+    for texts, label_type in cases:
+        expected = legacy_extract_value_for_label_type(texts, label_type)
+        actual = extractors.extract_value_for_label_type(texts, label_type)
+        assert expected == actual, (texts, label_type, expected, actual)
+    for label, func in (("legacy", legacy_extract_value_for_label_type),
+                        ("classifier", extractors.extract_value_for_label_type)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for texts, label_type in cases:
+                func(texts, label_type)
+        elapsed = time.perf_counter() - start
+        print(f"extract_value_for_label_type {label:<11} {elapsed / (repeat * len(cases)) * 1e6:6.2f} us/call")
+
+
+def bench_location_names(buttons, focuses=50):
+    cls = overlays.ProtonVPNLocationDetailsButton
+    shared = cls._get_page_value
+    names = {}
+    round_trips = {}
+    for label, page_value in (("per-button", lambda self, index: extractors.extract_dynamic_value(self, index)),
+                              ("shared page record", shared)):
+        cls._get_page_value = page_value
+        ROUND_TRIPS.reset()
+        start = time.perf_counter()
+        for _ in range(focuses):
+            overlays.overlay_text_cache.clear()
+            names[label] = [wrap(n, cls).name for n in buttons]
+        elapsed = time.perf_counter() - start
+        round_trips[label] = ROUND_TRIPS.total / focuses
+        print(f"location names {label:<19} round-trips/focus={ROUND_TRIPS.total / focuses:6.1f} "
+              f"{elapsed / focuses * 1e6:8.1f} us/focus  {names[label]}")
+    cls._get_page_value = shared
+    assert names["per-button"] == names["shared page record"], names
+    # L'enregistrement n'a d'intérêt que s'il coûte moins d'allers-retours que l'extraction par bouton
+    assert round_trips["shared page record"] < round_trips["per-button"], round_trips
+    # Une seule entrée pour la page (sous le RuntimeId du parent), plus le nom de chaque bouton
+    records = [key for key in overlays.overlay_text_cache._entries if key[2] == "location_page"]
+    assert len(records) == 1 and records[0][0] == buttons[0].parent.runtimeId, records
+
+
+def show_tokens():
+    for text in ("203.0.113.42", "IP : 2001:db8::8a2e:370:7334", "12:30:45", "416 o/s", "12,4 Mo",
+                 "Trafic actuel (Ko/s)", "Pays", "France", "Orange", "Vitesses jusqu'à 10 Gbit/s", "12 mo"):
+        token = textclassifier.classify_text(text)
+        print(f"  {text!r:<32} {token.kind:<10} value={token.value!r} label={token.is_label}")
+    assert textclassifier.classify_text("IP : 2001:db8::8a2e:370:7334").kind == textclassifier.IPV6
+    assert textclassifier.classify_text("12:30:45").kind == textclassifier.TEXT
+    # Pays reconnu sans libellé ; mesures seules et unités sensibles à la casse
+    assert textclassifier.classify_text("France").kind == textclassifier.COUNTRY
+    assert textclassifier.classify_text("United Kingdom").kind == textclassifier.COUNTRY
+    assert textclassifier.classify_text("Vitesses jusqu'à 10 Gbit/s").kind == textclassifier.TEXT
+    assert textclassifier.classify_text("10 Gbit/s").kind == textclassifier.THROUGHPUT
+    assert textclassifier.classify_text("12 mo").kind == textclassifier.TEXT
+    assert textclassifier.classify_text("10 Gb").kind == textclassifier.TEXT
+    assert textclassifier.classify_text("↓ 416 o/s").kind == textclassifier.THROUGHPUT
+
+
+def main():
+    root = uia_snapshot.build_dashboard(False)
+    FOREGROUND["obj"] = wrap(root)
+    buttons = location_buttons(root)
+    texts_by_button = [[t for t, _rect in uiautils.get_text_descendants(wrap(n))] for n in buttons]
+    texts_by_button.append(["Adresse IP", "IP: 198.51.100.7 (NAT)"])
+    bench_value_selection(texts_by_button)
+    bench_location_names(buttons)
+    record = textclassifier.extract_location_page_record(wrap(buttons[0]))
+    print(f"page record fields: {record.fields}")
+    print(f"page record entries: {record.entries}")
+    show_tokens()
+
+
+if __name__ == "__main__":
+    main()
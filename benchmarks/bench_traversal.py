@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : parcours borné (traversal.walk).
+
+1. mêmes textes que les parcours récursifs d'origine (instantané, children) ;
+2. ordre en profondeur / en largeur ;
+3. parcours children sur un arbre lent (latence COM simulée par noeud) : durée sans
+   limite contre durée avec TRAVERSAL_MAX_TIME_MS, textes partiels et indicateur "truncated" ;
+4. passe de fond sur la fenêtre tronquée : résultats partiels, instantané non réutilisé.
+
+Usage:
+    python benchmarks/bench_traversal.py [tailles...]
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+import fake_nvda
+from fake_nvda import FOREGROUND, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from fake_nvda import node, text  # noqa: E402
+from protonvpnservice import config, traversal, uiautils, windowscan  # noqa: E402
+from protonvpnservice.uiautils import get_bounding_rect, get_control_type  # noqa: E402
+
+SIZES = (1000, 10000)
+COM_LATENCY_S = 0.0002
+
+
+def legacy_text_descendants_from_snapshot(snapshot, max_depth=5):
+    texts = []
+
+    def recurse(node, depth):
+        if depth > max_depth:
+            return
+        if node.controlType == config.UIA_TEXT_CONTROL_TYPE and node.name and node.name.strip():
+            texts.append((node.name.strip(), node.rect))
+        for child in node.children:
+            recurse(child, depth + 1)
+
+    for child in snapshot.children:
+        recurse(child, 1)
+    return texts
+
+
+def legacy_text_descendants_by_children(obj, max_depth=5):
+    texts = []
+
+    def recurse(node, depth):
+        if depth > max_depth:
+            return
+        if get_control_type(node) == config.UIA_TEXT_CONTROL_TYPE and node.name and node.name.strip():
+            texts.append((node.name.strip(), get_bounding_rect(node)))
+        for child in node.children:
+            recurse(child, depth + 1)
+
+    for child in obj.children:
+        recurse(child, 1)
+    return texts
+
+
+@contextmanager
+def unbounded():
+    """Parcours du thread principal sans budget (comparaison avec les parcours d'origine)."""
+    budget = config.TRAVERSAL_MAX_NODES, config.TRAVERSAL_MAX_TIME_MS
+    config.TRAVERSAL_MAX_NODES = config.TRAVERSAL_MAX_TIME_MS = 0
+    try:
+        yield
+    finally:
+        config.TRAVERSAL_MAX_NODES, config.TRAVERSAL_MAX_TIME_MS = budget
+
+
+class SlowChildren:
+    """Ajoute une latence à chaque lecture de .children (appel COM distant simulé)."""
+
+    def __enter__(self):
+        self._children = fake_nvda.FakeUIA.children
+
+        def children(obj):
+            time.sleep(COM_LATENCY_S)
+            return self._children.fget(obj)
+
+        fake_nvda.FakeUIA.children = property(children)
+        return self
+
+    def __exit__(self, *exc):
+        fake_nvda.FakeUIA.children = self._children
+
+
+def check_order():
+    root = node(name="root", children=[
+        node(name="a", children=[text("a1"), text("a2")]),
+        node(name="b", children=[text("b1")]),
+    ])
+    for order, expected in ((traversal.DEPTH_FIRST, ["root", "a", "a1", "a2", "b", "b1"]),
+                            (traversal.BREADTH_FIRST, ["root", "a", "b", "a1", "a2", "b1"])):
+        seen = []
+        traversal.walk(root, lambda n: n.children, lambda n, depth, context: seen.append(n.name), order=order)
+        assert seen == expected, (order, seen)
+    seen = []
+    result = traversal.walk(root, lambda n: n.children, lambda n, depth, context: seen.append(n.name),
+                            order=traversal.BREADTH_FIRST, max_nodes=3)
+    assert seen == ["root", "a", "b"] and result.truncated and result.reason == "nodes", (seen, result)
+    print(f"order: depth-first and breadth-first ok; max_nodes=3 -> {seen} {result}")
+
+
+def run(size):
+    root = uia_snapshot.build_synthetic_tree(size, True)
+    obj = wrap(root)
+    FOREGROUND["obj"] = obj
+    print(f"=== synthetic {uia_snapshot.count_nodes(root)} nodes connected ===")
+    with unbounded():
+        snapshot = uiautils.get_subtree_snapshot(obj, 12)
+        assert uiautils.get_text_descendants_from_snapshot(snapshot, 12) == legacy_text_descendants_from_snapshot(snapshot, 12)
+    with SlowChildren():
+        start = time.perf_counter()
+        legacy = legacy_text_descendants_by_children(obj, 12)
+        legacy_ms = (time.perf_counter() - start) * 1000
+        with unbounded():
+            start = time.perf_counter()
+            full = uiautils.get_text_descendants_by_children(obj, 12)
+            full_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        bounded = uiautils.get_text_descendants_by_children(obj, 12)
+        bounded_ms = (time.perf_counter() - start) * 1000
+    assert full == legacy
+    assert bounded == legacy[:len(bounded)]
+    calls, nodes, truncated = traversal.traversal_stats.get("text_descendants_children")
+    print(f"  children walk ({COM_LATENCY_S * 1e6:.0f} us/children): legacy {legacy_ms:7.1f} ms {len(legacy)} texts | "
+          f"no budget {full_ms:7.1f} ms | {config.TRAVERSAL_MAX_TIME_MS} ms budget {bounded_ms:7.1f} ms "
+          f"{len(bounded)} texts, truncated walks so far={truncated}")
+
+    client = fake_nvda.sys.modules["UIAHandler"].handler.clientObject
+    element = client.ElementFromHandle(0)
+    full_scan = windowscan.scan_window(client, element, _InlineJob())
+    max_nodes = config.WINDOW_SCAN_MAX_NODES
+    # Budget : moitié des noeuds des sous-arbres de conteneurs (les éléments trouvés n'en consomment pas)
+    config.WINDOW_SCAN_MAX_NODES = (full_scan["nodes"] - full_scan["matches"]) // 2
+    partial = windowscan.scan_window(client, element, _InlineJob())
+    assert (partial["truncated"] and not full_scan["truncated"]
+            and partial["nodes"] == partial["matches"] + config.WINDOW_SCAN_MAX_NODES)
+    windowscan.window_scanner.clear()
+    generations = []
+    windowscan.window_scanner.request(lambda snapshot: generations.append(snapshot.generation))
+    windowscan.window_scanner.request(lambda snapshot: generations.append(snapshot.generation))
+    config.WINDOW_SCAN_MAX_NODES = max_nodes
+    assert generations[1] == generations[0] + 1, generations
+    print(f"  window scan: full {full_scan['nodes']} nodes; budget {partial['nodes']} -> truncated, "
+          f"{len(partial['widgets']) + len(partial['location_buttons'])}/"
+          f"{len(full_scan['widgets']) + len(full_scan['location_buttons'])} widgets and location buttons, "
+          f"snapshot not reused")
+
+
+class _InlineJob:
+    cancelled = False
+
+    def check(self):
+        pass
+
+
+def main(argv):
+    sys.setrecursionlimit(10000)
+    check_order()
+    for size in tuple(int(arg) for arg in argv) or SIZES:
+        run(size)
+    print(traversal.traversal_stats.format_stats())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
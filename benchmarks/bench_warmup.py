@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : préchauffage des caches au retour dans ProtonVPN (warmup).
+
+Pour chaque taille d'arbre, premier geste après event_appModule_gainFocus :
+1. sans préchauffage (caches froids) ;
+2. avec préchauffage mené à terme (minuteurs du préchauffage exécutés avant l'appui) ;
+3. appui pendant le préchauffage : annulation, le geste passe avant les étapes restantes.
+
+Vérifie aussi que le modèle de ConnectionDetailsPage, rattaché par le préchauffage, se met
+à jour depuis ses boutons gardés quand une autre fenêtre est au premier plan (aucune
+recherche dans cette fenêtre), et qu'à la perte du focus il est détaché, l'échantillonnage
+du débit arrêté et les handlers d'événements UIA (fenêtre et page) retirés.
+
+Latence mesurée par instrumentation.first_gesture (clés "first_gesture.<état>"), et
+allers-retours COM du geste. Sans comtypes, la passe de fond s'exécute sur le thread courant.
+
+Usage:
+    python benchmarks/bench_warmup.py [tailles...]
+"""
+
+import sys
+
+import fake_nvda
+from fake_nvda import EVENT_HANDLERS, FOREGROUND, ROUND_TRIPS, SPOKEN, FakeCallLater, raise_name_changed, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import AppModule, classification, config, overlays  # noqa: E402
+from protonvpnservice.instrumentation import latency  # noqa: E402
+from protonvpnservice.live import connection_details  # noqa: E402
+from protonvpnservice.scanning import automation_id_index  # noqa: E402
+from protonvpnservice.throughput import throughput_sampler  # noqa: E402
+from protonvpnservice.warmup import cache_warmup  # noqa: E402
+from protonvpnservice.widgets import widget_registry  # noqa: E402
+from protonvpnservice.windowscan import window_scanner  # noqa: E402
+
+SIZES = (1000, 10000, 50000)
+GESTURES = ("announceWidgets", "openCountrySelector", "toggleVPN")
+
+
+def warmup_timers():
+    return [timer for timer in FakeCallLater.pending
+            if timer.running and getattr(timer._call[0], "__self__", None) is cache_warmup]
+
+
+def run_warmup(max_steps=None):
+    """Exécute les minuteurs du préchauffage ; retourne le nombre de minuteurs exécutés."""
+    fired = 0
+    while max_steps is None or fired < max_steps:
+        timers = warmup_timers()
+        if not timers:
+            break
+        timers[0].fire()
+        fired += 1
+    return fired
+
+
+def cool_down(app):
+    app.event_appModule_loseFocus()
+    window_scanner.clear()
+    widget_registry.clear()
+    automation_id_index.clear()
+    connection_details.detach()
+    classification.classification_cache.clear()
+    overlays.overlay_text_cache.clear()
+
+
+def press(app, gesture):
+    ROUND_TRIPS.reset()
+    SPOKEN.clear()
+    script = app.getScript(gesture)
+    script(None)
+    return ROUND_TRIPS.total
+
+
+def first_gesture_ms(state):
+    for key, count, mean, *_ in latency.summary():
+        if key == f"first_gesture.{state}":
+            return mean * 1000
+    return float("nan")
+
+
+def run(app, size):
+    FOREGROUND["obj"] = wrap(uia_snapshot.build_synthetic_tree(size, True))
+    print(f"=== synthetic {size} nodes connected ===")
+    for gesture in GESTURES:
+        latency.reset()
+        cool_down(app)
+        config.WARMUP_ENABLED = False
+        app.event_appModule_gainFocus()
+        cold_trips = press(app, gesture)
+        cold_ms = first_gesture_ms(cache_warmup.COLD)
+
+        cool_down(app)
+        config.WARMUP_ENABLED = True
+        app.event_appModule_gainFocus()
+        ROUND_TRIPS.reset()
+        steps = run_warmup()
+        warmup_trips = ROUND_TRIPS.total
+        assert cache_warmup.completed, cache_warmup.state
+        warm_trips = press(app, gesture)
+        warm_ms = first_gesture_ms(cache_warmup.WARM)
+        print(f"  {gesture:<20} cold: {cold_ms:7.2f} ms {cold_trips:>3} trips | "
+              f"warm: {warm_ms:7.2f} ms {warm_trips:>3} trips (warm-up: {steps} ticks, {warmup_trips} trips)")
+
+    # Appui pendant le préchauffage : annulation immédiate
+    cool_down(app)
+    app.event_appModule_gainFocus()
+    run_warmup(max_steps=2)
+    assert cache_warmup.running
+    cancellations = cache_warmup.cancellations
+    press(app, "announceWidgets")
+    assert not cache_warmup.running and cache_warmup.cancellations == cancellations + 1
+    assert not warmup_timers(), warmup_timers()
+    print(f"  keypress during warm-up: cancelled after 2 ticks, first_gesture.partial="
+          f"{first_gesture_ms(cache_warmup.PARTIAL):.2f} ms, spoken={SPOKEN[:1]}")
+
+
+def check_background_model(app):
+    """Ré-extraction après un NameChanged de la page, une autre application étant au premier plan."""
+    FOREGROUND["obj"] = wrap(uia_snapshot.build_dashboard(True))
+    cool_down(app)
+    app.event_appModule_gainFocus()
+    run_warmup()
+    assert connection_details.attached and connection_details.get("vpn_ip"), connection_details.get("vpn_ip")
+    ip_button = next(n for n in FOREGROUND["obj"]._node.iter_subtree() if n.automationId == "ShowIpFlyoutButton")
+    assert sorted(kind for kind, n, h in EVENT_HANDLERS) == ["property", "structure", "structure"], EVENT_HANDLERS
+    value = [n for n in ip_button.iter_subtree() if uia_snapshot.is_text(n)][-1]
+    value.name = "10.2.0.2"
+    FOREGROUND["obj"] = wrap(uia_snapshot.build_synthetic_tree(1000, False))
+    ROUND_TRIPS.reset()
+    raise_name_changed(value)
+    for timer in [t for t in FakeCallLater.pending if t.running and getattr(t._call[0], "__self__", None) is connection_details]:
+        timer.fire()
+    assert "FindAll" not in ROUND_TRIPS.byKind, ROUND_TRIPS.byKind
+    assert connection_details.get("vpn_ip").values == ["10.2.0.2"], connection_details.get("vpn_ip").values
+    print(f"background refresh: {connection_details.get('vpn_ip').as_text()!r}, round-trips={dict(ROUND_TRIPS.byKind)}")
+    assert throughput_sampler.running
+    app.event_appModule_loseFocus()
+    assert not connection_details.attached and not throughput_sampler.running
+    assert not EVENT_HANDLERS, EVENT_HANDLERS
+    print("loseFocus: ConnectionDetailsPage model detached, throughput sampler stopped, event handlers removed")
+
+
+def main(argv):
+    app = AppModule()
+    for size in tuple(int(arg) for arg in argv) or SIZES:
+        run(app, size)
+    check_background_model(app)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
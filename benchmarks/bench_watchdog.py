@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : surveillance de la connexion (live.connection_watchdog).
+
+1. état stable : intervalles de sondage successifs, allers-retours COM par sondage et
+   sondages par heure, contre un sondage fixe à CONNECTION_WATCHDOG_MIN_INTERVAL_MS ;
+2. coupure (Disconnect -> Connect, StructureChanged) : sondage avancé, annonce ;
+3. reconnexion sur un autre serveur : annonce de la nouvelle IP ;
+4. changement demandé par Ctrl+Shift+D : annoncé une seule fois (confirmation).
+
+Usage:
+    python benchmarks/bench_watchdog.py [tailles...]
+"""
+
+import sys
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, SPOKEN, FakeCallLater, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import AppModule, config  # noqa: E402
+from protonvpnservice.events import uia_events  # noqa: E402
+from protonvpnservice.live import connection_watchdog, vpn_state_waiter  # noqa: E402
+
+SIZES = (1000, 10000)
+HOUR_MS = 3600 * 1000
+
+
+def watchdog_timer():
+    timers = [timer for timer in FakeCallLater.pending
+              if timer.running and getattr(timer._call[0], "__self__", None) is connection_watchdog]
+    return timers[0] if timers else None
+
+
+def poll():
+    """Exécute le prochain sondage ; retourne son délai (ms)."""
+    timer = watchdog_timer()
+    delay = timer.delay
+    timer.fire()
+    return delay
+
+
+def find(root, automation_id):
+    return uia_snapshot.find_nodes(root, lambda n: n.automationId == automation_id)[0]
+
+
+def set_connected(root, connected, ip=None):
+    card_button = find(root, "ConnectionCardDisconnectButton" if not connected else "ConnectionCardConnectButton")
+    card_button.automationId = "ConnectionCardDisconnectButton" if connected else "ConnectionCardConnectButton"
+    if ip:
+        ip_text = [n for n in find(root, "ShowIpFlyoutButton").iter_subtree() if n.name.count(".") == 3][0]
+        ip_text.name = ip
+
+
+def run(app, size):
+    root = uia_snapshot.build_synthetic_tree(size, True)
+    FOREGROUND["obj"] = wrap(root)
+    print(f"=== synthetic {size} nodes connected ===")
+    connection_watchdog.stop()
+    app._watchdog_enabled = True
+    app.event_appModule_gainFocus()
+    SPOKEN.clear()
+
+    # 1. Etat stable
+    ROUND_TRIPS.reset()
+    elapsed, delays = 0, []
+    while elapsed < HOUR_MS:
+        delay = poll()
+        delays.append(delay)
+        elapsed += delay
+    print(f"  first intervals (ms): {delays[:9]}")
+    print(f"  idle hour: {len(delays)} polls, {ROUND_TRIPS.total / len(delays):.1f} round-trips/poll "
+          f"(fixed {config.CONNECTION_WATCHDOG_MIN_INTERVAL_MS} ms polling: "
+          f"{HOUR_MS // config.CONNECTION_WATCHDOG_MIN_INTERVAL_MS} polls)")
+    assert connection_watchdog.connected is True and connection_watchdog.vpn_ip == "37.19.199.137"
+    assert not SPOKEN, SPOKEN
+    # Retour sur la même fenêtre : l'intervalle atteint est conservé
+    interval_ms = connection_watchdog.interval_ms
+    app.event_appModule_gainFocus()
+    assert connection_watchdog.interval_ms == interval_ms, (connection_watchdog.interval_ms, interval_ms)
+
+    # 2. Coupure silencieuse (kill switch, perte de réseau)
+    set_connected(root, False)
+    uia_events.notify_structure_changed()
+    delay = poll()
+    print(f"  drop: announced after {delay} ms: {SPOKEN}")
+    assert SPOKEN == ["VPN déconnecté"], SPOKEN
+
+    # 3. Reconnexion sur un autre serveur
+    SPOKEN.clear()
+    set_connected(root, True, "185.159.157.20")
+    delay = poll()
+    print(f"  reconnect (no event): announced after {delay} ms: {SPOKEN}")
+    assert SPOKEN == ["VPN connecté, adresse IP du VPN : 185.159.157.20"], SPOKEN
+
+    # 4. Ctrl+Shift+D : la confirmation annonce, la surveillance se tait
+    SPOKEN.clear()
+    vpn_state_waiter.start(True)
+    set_connected(root, False)
+    uia_events.notify_structure_changed()
+    for timer in [t for t in FakeCallLater.pending if t.running and t._call[0] == vpn_state_waiter._check]:
+        timer.fire()
+    poll()
+    print(f"  Ctrl+Shift+D disconnect: {SPOKEN}")
+    assert SPOKEN == ["VPN déconnecté"], SPOKEN
+    vpn_state_waiter.cancel()
+    connection_watchdog.stop()
+
+
+def main(argv):
+    app = AppModule()
+    for size in tuple(int(arg) for arg in argv) or SIZES:
+        run(app, size)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : registre des widgets de la colonne droite (widgets).
+
+Colonne dont l'ordre ne correspond pas à l'ordre supposé (Kill switch en premier) :
+1. identification (mots-clés des textes) et lecture de l'état (TogglePattern ou texte) ;
+2. basculement du Kill Switch répété : index des AutomationId + widgets[1] (comme auparavant)
+   contre consultation du registre, en appels UIA par appui ;
+3. annonce du nouvel état à l'arrivée de l'événement StateChanged ;
+4. StructureChanged : seuls le conteneur des widgets et ses parents périment le registre.
+
+Usage:
+    python benchmarks/bench_widgets.py
+"""
+
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, SPOKEN, wrap
+
+fake_nvda.install()
+
+from fake_nvda import CONTROL_TYPE_WINDOW, button, node, text  # noqa: E402
+from protonvpnservice import AppModule, overlays, widgets  # noqa: E402
+from protonvpnservice.events import uia_events  # noqa: E402
+from protonvpnservice.scanning import automation_id_index  # noqa: E402
+from protonvpnservice.widgets import widget_registry  # noqa: E402
+from protonvpnservice.windowscan import window_scanner  # noqa: E402
+
+
+def build_window():
+    column = node(automationId="WidgetsColumn", children=[
+        button("", "WidgetButton", children=[text("Kill switch"), text("Désactivé")], toggleState=0),
+        button("", "WidgetButton", children=[text("NetShield"), text("Activé")]),
+        button("", "WidgetButton", children=[node(children=[text("Split tunneling"), text("Off")])]),
+        button("", "PortForwardingWidgetButton", children=[text("Redirection de port")]),
+    ])
+    filler = [node(children=[text(f"Pays {i}"), button(f"Connecter {i}")]) for i in range(40)]
+    return node(name="Proton VPN", controlType=CONTROL_TYPE_WINDOW, children=[
+        node(automationId="ContentFrame", children=filler + [column]),
+    ]), column
+
+
+def check_registry(column):
+    automation_id_index.invalidate()
+    window_scanner.clear()
+    widget_registry.clear()
+    ROUND_TRIPS.reset()
+    widget_registry.request(lambda: None)
+    print(f"cold resolve (window scan + registry): round-trips={ROUND_TRIPS.total}")
+    states = {info.key: (info.state, info.state_source) for info in widget_registry.all()}
+    print(f"  {states}")
+    assert states == {
+        widgets.KILL_SWITCH: (False, "toggle"),
+        widgets.NETSHIELD: (True, "text"),
+        widgets.SPLIT_TUNNELING: (False, "text"),
+        widgets.PORT_FORWARDING: (None, "text"),
+    }, states
+    kill_switch = column.children[0]
+    name = wrap(kill_switch, overlays.ProtonVPNWidgetButton).name
+    assert name == widgets.WIDGET_LABELS[widgets.KILL_SWITCH], name
+    print(f"  first WidgetButton name: {name!r} (sibling index would say 'NetShield')")
+
+
+def legacy_toggle(app):
+    buttons = automation_id_index.find_all("WidgetButton")
+    if len(buttons) >= 2:
+        app._invoke_element(buttons[1])
+
+
+def registry_toggle(app):
+    app._toggle_widget(widgets.KILL_SWITCH)
+    # StateChanged du widget basculé
+    uia_events.notify_state_changed(column_node.children[0].runtimeId)
+
+
+def bench_toggles(app, presses=50):
+    for label, toggle in (("index + widgets[1]", legacy_toggle), ("registry", registry_toggle)):
+        SPOKEN.clear()
+        ROUND_TRIPS.reset()
+        start = time.perf_counter()
+        for _ in range(presses):
+            toggle(app)
+        elapsed = time.perf_counter() - start
+        print(f"toggle {label:<19} round-trips/press={ROUND_TRIPS.total / presses:5.1f} "
+              f"{elapsed / presses * 1e6:8.1f} us/press  {dict(ROUND_TRIPS.byKind)}")
+    legacy_target = automation_id_index.find_all("WidgetButton")[1]
+    print(f"  widgets[1] is {[t.name for t in legacy_target._node.iter_subtree() if t.name]} (wrong widget, state unknown)")
+    print(f"  spoken after registry toggles: {SPOKEN[:4]}")
+    assert SPOKEN[1] == "Arrêt d'urgence (Kill switch) activé", SPOKEN
+    assert SPOKEN[3] == "Arrêt d'urgence (Kill switch) désactivé", SPOKEN
+
+
+def check_structure_events():
+    """Registre conservé pour un StructureChanged ailleurs dans la fenêtre, périmé pour la colonne."""
+    widget_registry.request(lambda: None)
+    unrelated = root.children[0].children[0].runtimeId
+    for runtime_id in (unrelated, None, column_node.children[1].children[1].runtimeId):
+        uia_events.notify_structure_changed(runtime_id)
+        assert widget_registry.is_fresh(), runtime_id
+    for runtime_id in (column_node.runtimeId, root.children[0].runtimeId):
+        uia_events.notify_structure_changed(runtime_id)
+        assert not widget_registry.is_fresh(), runtime_id
+        widget_registry.request(lambda: None)
+    print("structure changes: registry kept for other nodes, stale for the column and its parents")
+
+
+root, column_node = build_window()
+
+
+def main():
+    FOREGROUND["obj"] = wrap(root)
+    app = AppModule()
+    check_registry(column_node)
+    check_structure_events()
+    bench_toggles(app)
+    ROUND_TRIPS.reset()
+    SPOKEN.clear()
+    app._announce_widgets()
+    print(f"announce widgets: round-trips={ROUND_TRIPS.total}  {SPOKEN}")
+
+
+if __name__ == "__main__":
+    main()
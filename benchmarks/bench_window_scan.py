@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark : passe unique sur la fenêtre (windowscan) contre une recherche par script.
+
+Une séquence de gestes (connexion, sélecteur de pays, widgets) :
+1. une recherche native par geste (index des AutomationId, boutons de LocationDetailsPage,
+   bouton de connexion par sous-chaîne du nom) ;
+2. l'ancienne passe : sous-arbre complet de la fenêtre en cache (BuildUpdatedCache), chaque
+   noeud lu en Python ;
+3. scan_window : un FindAll sur l'OR des conditions des collecteurs, puis le sous-arbre des
+   seuls conteneurs ; l'instantané sert aux gestes suivants tant qu'il n'est ni périmé
+   (WINDOW_SNAPSHOT_REUSE_S) ni invalidé par StructureChanged.
+
+Les résultats des collecteurs doivent être ceux des recherches séparées, avec ou sans
+recherche par sous-chaîne. Le fournisseur factice évalue conditions et cache en Python :
+les allers-retours et le nombre d'éléments ramenés sont représentatifs, les durées ne le
+sont qu'en ordre de grandeur.
+
+Usage:
+    python benchmarks/bench_window_scan.py [tailles...]
+"""
+
+import sys
+import time
+
+import fake_nvda
+from fake_nvda import FOREGROUND, ROUND_TRIPS, wrap
+
+fake_nvda.install()
+
+import uia_snapshot  # noqa: E402
+from protonvpnservice import config, keywords, scanning, search, windowscan  # noqa: E402
+from protonvpnservice.events import uia_events  # noqa: E402
+from protonvpnservice.keywords import scan_keywords  # noqa: E402
+from protonvpnservice.traversal import cached_children, walk  # noqa: E402
+
+SIZES = (1000, 10000, 50000)
+
+
+class _InlineJob:
+    cancelled = False
+
+    def check(self):
+        pass
+
+
+def legacy_location_buttons(client, root):
+    request = scanning._create_scan_cache_request(client)
+    page = search.find_first(root, search.element_condition(client, automation_id="LocationDetailsPage"), request)
+    if not page:
+        return []
+    condition = search.element_condition(client, automation_id="", control_type=config.UIA_BUTTON_CONTROL_TYPE,
+                                         framework_id="XAML")
+    return search.find_all(page, condition, request)
+
+
+def _connect_button_state(element):
+    concepts = scan_keywords(element.cachedName or "")
+    if keywords.DISCONNECT in concepts:
+        return element, True
+    if keywords.CONNECT in concepts:
+        return element, False
+    return None
+
+
+def legacy_connect_button(client, root):
+    """Bouton de connexion par AutomationId, sinon premier bouton dont le nom convient."""
+    request = scanning._create_scan_cache_request(client)
+    for automation_id, is_disconnecting in (("ConnectionCardDisconnectButton", True), ("ConnectionCardConnectButton", False)):
+        element = search.find_first(root, search.element_condition(client, automation_id=automation_id), request)
+        if element:
+            return element, is_disconnecting
+    button = search.element_condition(client, control_type=config.UIA_BUTTON_CONTROL_TYPE)
+    phrases = keywords.get_phrases(keywords.DISCONNECT) + keywords.get_phrases(keywords.CONNECT)
+    name_condition = search.name_contains_condition(client, phrases)
+    if name_condition is not None:
+        element = search.find_first(root, search.all_of(client, button, name_condition), request)
+        return _connect_button_state(element) if element else None
+    for element in search.find_all(root, button, request):
+        result = _connect_button_state(element)
+        if result is not None:
+            return result
+    return None
+
+
+def legacy_gestures(client, root):
+    """Chaque geste refait sa propre recherche native."""
+    return {
+        "automation_ids": scanning.find_automation_ids(client, root),
+        "location_buttons": legacy_location_buttons(client, root),
+        "connect_button": legacy_connect_button(client, root),
+    }
+
+
+def full_subtree_pass(client, root):
+    """Ancienne passe : toute la fenêtre en cache, chaque noeud lu une fois."""
+    collectors = [collector_class() for collector_class in windowscan.COLLECTORS]
+    request = windowscan._create_window_cache_request(client, collectors, True)
+    cached = root.BuildUpdatedCache(request)
+    return walk(cached, cached_children, lambda element, depth, context: windowscan.ScanFrame(element),
+                "full_subtree_pass", max_nodes=0, max_time_ms=0).nodes
+
+
+def measure(label, func):
+    ROUND_TRIPS.reset()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} round-trips={ROUND_TRIPS.total:>6} {elapsed * 1000:8.1f} ms")
+    return result
+
+
+def nodes(elements):
+    """RuntimeId des éléments (recherches séparées) ou des ElementRef (instantané)."""
+    return [element.runtime_id if isinstance(element, scanning.ElementRef) else element._node.runtimeId
+            for element in elements]
+
+
+def check(legacy, results):
+    assert ({key: nodes(value) for key, value in legacy["automation_ids"].items()}
+            == {key: nodes(value) for key, value in results["automation_ids"].items()})
+    assert nodes(legacy["location_buttons"]) == nodes(results["location_buttons"])
+    expected = legacy["connect_button"]
+    found = results["connect_button"]
+    assert (expected is None) == (found is None) and (expected is None or
+                                                      (nodes([expected[0]]), expected[1]) == (nodes([found[0]]), found[1]))
+
+
+def run(size, connected):
+    root = uia_snapshot.build_synthetic_tree(size, connected)
+    FOREGROUND["obj"] = wrap(root)
+    client = fake_nvda.sys.modules["UIAHandler"].handler.clientObject
+    element = client.ElementFromHandle(0)
+    print(f"=== synthetic {uia_snapshot.count_nodes(root)} nodes {'connected' if connected else 'disconnected'} ===")
+    legacy = measure("one native search per gesture (3)", lambda: legacy_gestures(client, element))
+    full = measure("full subtree cache (previous pass)", lambda: full_subtree_pass(client, element))
+    results = measure("scan_window (one FindAll)", lambda: windowscan.scan_window(client, element, _InlineJob()))
+    print(f"  elements brought back: full pass {full}, scan_window {results['nodes']} "
+          f"({results['matches']} matches + container subtrees)")
+    check(legacy, results)
+    assert [kind for ref, kind, texts in results["promo_cards"]] == ["vpn_plus", "overlay"], results["promo_cards"]
+    # RuntimeId recyclé ou introuvable : resolve_ref se replie sur l'AutomationId
+    ref, _ = results["connect_button"]
+    stale = scanning.ElementRef((0, 0), ref.automation_id)
+    assert scanning.resolve_ref(stale, element).UIAElement._node.runtimeId == ref.runtime_id
+
+    # Sans recherche par sous-chaîne (Windows antérieur à 1809) : noms filtrés en Python
+    client.substringConditions = False
+    search._substring_supported = False
+    try:
+        fallback = windowscan.scan_window(client, element, _InlineJob())
+        check(legacy_gestures(client, element), fallback)
+        print(f"  without substring conditions: {fallback['matches']} matches, "
+              f"promo cards {[kind for ref, kind, texts in fallback['promo_cards']]}")
+    finally:
+        client.substringConditions = True
+        search._substring_supported = True
+
+    scanner = windowscan.window_scanner
+    scanner.clear()
+    snapshots = []
+    measure("scanner: 3 gestures within reuse delay", lambda: [scanner.request(snapshots.append) for _ in range(3)])
+    assert len({snapshot.generation for snapshot in snapshots}) == 1, snapshots
+    uia_events.notify_structure_changed()
+    measure("scanner: gesture after StructureChanged", lambda: scanner.request(snapshots.append))
+    assert snapshots[-1].generation == snapshots[0].generation + 1
+    print(f"  scans={scanner.scans} reuses={scanner.reuses}")
+
+
+def main(argv):
+    for size in tuple(int(arg) for arg in argv) or SIZES:
+        for connected in (False, True):
+            run(size, connected)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,648 @@
+# -*- coding: utf-8 -*-
+"""
+Environnement NVDA / UIA factice pour exécuter le module d'application hors de NVDA.
+
+Chaque accès qui, dans NVDA, provoque un appel COM inter-processus vers
+ProtonVPN.Client.exe (propriété current*, name, children, parent...) incrémente
+ROUND_TRIPS, ce qui permet de comparer le coût des parcours d'arbre.
+
+Usage:
+    import fake_nvda
+    fake_nvda.install()
+    import protonvpnservice
+"""
+
+import os
+import sys
+import types
+from array import array
+from enum import Enum
+
+
+# ============================================================================
+# COMPTEUR D'ALLERS-RETOURS COM
+# ============================================================================
+
+class RoundTripCounter:
+    """Compte les appels COM simulés, par type d'accès."""
+
+    def __init__(self):
+        self.total = 0
+        self.byKind = {}
+
+    def hit(self, kind, count=1):
+        self.total += count
+        self.byKind[kind] = self.byKind.get(kind, 0) + count
+
+    def reset(self):
+        self.total = 0
+        self.byKind = {}
+
+
+ROUND_TRIPS = RoundTripCounter()
+
+# Langue de NVDA renvoyée par languageHandler.getLanguage()
+LANGUAGE = {"code": "fr_FR"}
+
+
+# ============================================================================
+# ARBRE UIA FACTICE
+# ============================================================================
+
+CONTROL_TYPE_BUTTON = 50000
+CONTROL_TYPE_TEXT = 50020
+CONTROL_TYPE_CUSTOM = 50025
+CONTROL_TYPE_GROUP = 50026
+CONTROL_TYPE_WINDOW = 50032
+CONTROL_TYPE_PANE = 50033
+
+
+class Role(Enum):
+    UNKNOWN = 0
+    BUTTON = 9
+    STATICTEXT = 7
+    GROUPING = 56
+    WINDOW = 1
+    PANE = 13
+    TOGGLEBUTTON = 133
+
+
+CONTROL_TYPE_TO_ROLE = {
+    CONTROL_TYPE_BUTTON: Role.BUTTON,
+    CONTROL_TYPE_TEXT: Role.STATICTEXT,
+    CONTROL_TYPE_GROUP: Role.GROUPING,
+    CONTROL_TYPE_WINDOW: Role.WINDOW,
+    CONTROL_TYPE_PANE: Role.PANE,
+}
+
+
+class FakeRect:
+    def __init__(self, left, top, right, bottom):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+
+
+class FakeNode:
+    """Données brutes d'un élément UIA (côté fournisseur, sans coût)."""
+
+    _nextRuntimeId = 1
+
+    def __init__(self, name="", controlType=CONTROL_TYPE_PANE, automationId="",
+                 frameworkId="XAML", rect=(0, 0, 0, 0), children=None, toggleState=None):
+        self.name = name
+        self.controlType = controlType
+        self.automationId = automationId
+        self.frameworkId = frameworkId
+        self.rect = rect
+        # UIA ToggleState (0 / 1 / 2) ; None si TogglePattern n'est pas pris en charge
+        self.toggleState = toggleState
+        self.parent = None
+        self.children = []
+        self.runtimeId = (42, FakeNode._nextRuntimeId)
+        FakeNode._nextRuntimeId += 1
+        for child in children or ():
+            self.append(child)
+
+    def append(self, child):
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    def iter_subtree(self):
+        yield self
+        for child in self.children:
+            yield from child.iter_subtree()
+
+
+def node(name="", controlType=CONTROL_TYPE_PANE, automationId="", children=None, **kwargs):
+    """Raccourci de construction d'un FakeNode."""
+    return FakeNode(name, controlType, automationId, children=children, **kwargs)
+
+
+def text(name, **kwargs):
+    return FakeNode(name, CONTROL_TYPE_TEXT, **kwargs)
+
+
+def button(name="", automationId="", children=None, **kwargs):
+    return FakeNode(name, CONTROL_TYPE_BUTTON, automationId, children=children, **kwargs)
+
+
+class FakeElementArray:
+    def __init__(self, elements):
+        self._elements = elements
+        self.Length = len(elements)
+
+    def GetElement(self, index):
+        return self._elements[index]
+
+
+class FakeCacheRequest:
+    def __init__(self):
+        self.properties = []
+        self.TreeScope = 1
+        self.TreeFilter = None
+        self.AutomationElementMode = 1
+
+    def AddProperty(self, propertyId):
+        self.properties.append(propertyId)
+
+
+_NODE_PROPERTIES = {30005: "name", 30003: "controlType", 30011: "automationId", 30024: "frameworkId", 30000: "runtimeId"}
+
+
+class FakeCondition:
+    """Condition UIA factice : prédicat évalué côté fournisseur (sans aller-retour par noeud)."""
+
+    def __init__(self, predicate):
+        self.matches = predicate
+
+
+class FakeUIAElement:
+    """IUIAutomationElement factice : chaque lecture current* est un aller-retour."""
+
+    def __init__(self, fakeNode):
+        self._node = fakeNode
+
+    # Propriétés du cache de base de NVDA (baseCacheRequest), lues sans aller-retour
+    @property
+    def cachedControlType(self):
+        return self._node.controlType
+
+    @property
+    def cachedAutomationId(self):
+        return self._node.automationId
+
+    @property
+    def currentName(self):
+        ROUND_TRIPS.hit("currentName")
+        return self._node.name
+
+    @property
+    def currentControlType(self):
+        ROUND_TRIPS.hit("currentControlType")
+        return self._node.controlType
+
+    @property
+    def currentAutomationId(self):
+        ROUND_TRIPS.hit("currentAutomationId")
+        return self._node.automationId
+
+    @property
+    def currentFrameworkId(self):
+        ROUND_TRIPS.hit("currentFrameworkId")
+        return self._node.frameworkId
+
+    @property
+    def currentBoundingRectangle(self):
+        ROUND_TRIPS.hit("currentBoundingRectangle")
+        return FakeRect(*self._node.rect)
+
+    def GetRuntimeId(self):
+        ROUND_TRIPS.hit("GetRuntimeId")
+        return self._node.runtimeId
+
+    def BuildUpdatedCache(self, request):
+        ROUND_TRIPS.hit("BuildUpdatedCache")
+        includeChildren = bool(request.TreeScope & (TREE_SCOPE_CHILDREN | TREE_SCOPE_DESCENDANTS))
+        return FakeCachedElement(self._node, request, includeChildren)
+
+    def GetCurrentPattern(self, patternId):
+        ROUND_TRIPS.hit("GetCurrentPattern")
+        return None
+
+    def _find(self, scope, condition):
+        if not scope & TREE_SCOPE_DESCENDANTS:
+            nodes = ([self._node] if scope & TREE_SCOPE_ELEMENT else []) + list(self._node.children)
+            return (n for n in nodes if condition.matches(n))
+        nodes = self._node.iter_subtree()
+        if not scope & TREE_SCOPE_ELEMENT:
+            next(nodes)
+        return (n for n in nodes if condition.matches(n))
+
+    def FindFirstBuildCache(self, scope, condition, request):
+        ROUND_TRIPS.hit("FindFirst")
+        found = next(self._find(scope, condition), None)
+        includeChildren = bool(request.TreeScope & (TREE_SCOPE_CHILDREN | TREE_SCOPE_DESCENDANTS))
+        return FakeCachedElement(found, request, includeChildren) if found is not None else None
+
+    def FindAllBuildCache(self, scope, condition, request):
+        ROUND_TRIPS.hit("FindAll")
+        includeChildren = bool(request.TreeScope & (TREE_SCOPE_CHILDREN | TREE_SCOPE_DESCENDANTS))
+        return FakeElementArray([FakeCachedElement(n, request, includeChildren) for n in self._find(scope, condition)])
+
+
+class FakeCachedElement(FakeUIAElement):
+    """Élément renvoyé par BuildUpdatedCache : les lectures cached* sont locales."""
+
+    def __init__(self, fakeNode, request, includeChildren=False):
+        super().__init__(fakeNode)
+        self._request = request
+        self._includeChildren = includeChildren
+
+    @property
+    def cachedName(self):
+        return self._node.name
+
+    @property
+    def cachedControlType(self):
+        return self._node.controlType
+
+    @property
+    def cachedAutomationId(self):
+        return self._node.automationId
+
+    @property
+    def cachedFrameworkId(self):
+        return self._node.frameworkId
+
+    @property
+    def cachedBoundingRectangle(self):
+        return FakeRect(*self._node.rect)
+
+    def GetCachedPropertyValue(self, propertyId):
+        if propertyId == 30000:  # UIA_RuntimeIdPropertyId
+            return self._node.runtimeId
+        if propertyId == 30086:  # UIA_ToggleToggleStatePropertyId
+            if self._node.toggleState is None:
+                raise NotImplementedError(propertyId)
+            return self._node.toggleState
+        raise NotImplementedError(propertyId)
+
+    def GetCachedChildren(self):
+        if not self._includeChildren:
+            return None
+        subtree = self._request.TreeScope & TREE_SCOPE_DESCENDANTS
+        return FakeElementArray([
+            FakeCachedElement(child, self._request, bool(subtree))
+            for child in self._node.children
+        ])
+
+
+TREE_SCOPE_ELEMENT = 1
+TREE_SCOPE_CHILDREN = 2
+TREE_SCOPE_DESCENDANTS = 4
+TREE_SCOPE_SUBTREE = 7
+
+
+class FakeTreeWalker:
+    """Chaque déplacement du walker est un aller-retour."""
+
+    def GetParentElement(self, element):
+        ROUND_TRIPS.hit("walker")
+        parentNode = element._node.parent
+        return FakeUIAElement(parentNode) if parentNode else None
+
+    def GetParentElementBuildCache(self, element, request):
+        ROUND_TRIPS.hit("walker")
+        parentNode = element._node.parent
+        if not parentNode:
+            return None
+        includeChildren = bool(request.TreeScope & (TREE_SCOPE_CHILDREN | TREE_SCOPE_DESCENDANTS))
+        return FakeCachedElement(parentNode, request, includeChildren)
+
+    def GetFirstChildElementBuildCache(self, element, request):
+        ROUND_TRIPS.hit("walker")
+        children = element._node.children
+        return FakeCachedElement(children[0], request) if children else None
+
+    def GetNextSiblingElementBuildCache(self, element, request):
+        ROUND_TRIPS.hit("walker")
+        parentNode = element._node.parent
+        if not parentNode:
+            return None
+        index = parentNode.children.index(element._node) + 1
+        if index < len(parentNode.children):
+            return FakeCachedElement(parentNode.children[index], request)
+        return None
+
+
+class FakeUIAClient:
+    RawViewCondition = FakeCondition(lambda n: True)
+    ControlViewCondition = FakeCondition(lambda n: True)
+    RawViewWalker = FakeTreeWalker()
+    # False : CreatePropertyConditionEx indisponible (Windows antérieur à 1809)
+    substringConditions = True
+
+    def CreateCacheRequest(self):
+        return FakeCacheRequest()
+
+    def CreateTrueCondition(self):
+        return self.RawViewCondition
+
+    def CreatePropertyCondition(self, propertyId, value):
+        attribute = _NODE_PROPERTIES[propertyId]
+        if isinstance(value, array):
+            # SAFEARRAY (RuntimeId) : comparé comme le tuple renvoyé par GetRuntimeId
+            value = tuple(value)
+        return FakeCondition(lambda n: getattr(n, attribute) == value)
+
+    def CreatePropertyConditionEx(self, propertyId, value, flags):
+        if not self.substringConditions:
+            raise NotImplementedError("PropertyConditionFlags_MatchSubstring")
+        attribute = _NODE_PROPERTIES[propertyId]
+        if flags & 1:
+            value = value.lower()
+            return FakeCondition(lambda n: value in (getattr(n, attribute) or "").lower() if flags & 2
+                                 else (getattr(n, attribute) or "").lower() == value)
+        return FakeCondition(lambda n: value in getattr(n, attribute) if flags & 2 else getattr(n, attribute) == value)
+
+    def CreateAndCondition(self, first, second):
+        return FakeCondition(lambda n: first.matches(n) and second.matches(n))
+
+    def CreateOrCondition(self, first, second):
+        return FakeCondition(lambda n: first.matches(n) or second.matches(n))
+
+    def CreateNotCondition(self, condition):
+        return FakeCondition(lambda n: not condition.matches(n))
+
+    def AddStructureChangedEventHandler(self, element, scope, cacheRequest, handler):
+        ROUND_TRIPS.hit("AddEventHandler")
+        EVENT_HANDLERS.append(("structure", element._node, handler))
+
+    def AddPropertyChangedEventHandler(self, element, scope, cacheRequest, handler, propertyIds):
+        ROUND_TRIPS.hit("AddEventHandler")
+        EVENT_HANDLERS.append(("property", element._node, handler))
+
+    def RemoveStructureChangedEventHandler(self, element, handler):
+        ROUND_TRIPS.hit("RemoveEventHandler")
+        _remove_handler("structure", element._node, handler)
+
+    def RemovePropertyChangedEventHandler(self, element, handler):
+        ROUND_TRIPS.hit("RemoveEventHandler")
+        _remove_handler("property", element._node, handler)
+
+    def ElementFromHandle(self, windowHandle):
+        ROUND_TRIPS.hit("ElementFromHandle")
+        root = FOREGROUND["obj"]
+        return FakeUIAElement(root._node) if root is not None else None
+
+
+# Handlers d'événements enregistrés : (type, noeud, handler)
+EVENT_HANDLERS = []
+
+
+def _remove_handler(kind, fakeNode, handler):
+    for entry in EVENT_HANDLERS:
+        if entry[0] == kind and entry[1] is fakeNode and entry[2] is handler:
+            EVENT_HANDLERS.remove(entry)
+            return
+    raise ValueError("event handler not registered")
+
+
+def raise_name_changed(fakeNode):
+    """Simule un PropertyChanged (Name) du fournisseur : handlers dont le sous-arbre contient le noeud."""
+    for kind, root, handler in list(EVENT_HANDLERS):
+        if kind == "property" and any(n is fakeNode for n in root.iter_subtree()):
+            handler.IUIAutomationPropertyChangedEventHandler_HandlePropertyChangedEvent(FakeUIAElement(fakeNode), 30005, fakeNode.name)
+
+
+# ============================================================================
+# NVDAOBJECT FACTICE
+# ============================================================================
+
+class FakeUIA:
+    """Remplace NVDAObjects.UIA.UIA : chaque propriété NVDA coûte un appel COM."""
+
+    def __init__(self, fakeNode=None, UIAElement=None, **kwargs):
+        if fakeNode is None and UIAElement is not None:
+            fakeNode = UIAElement._node
+        self._node = fakeNode
+        self.UIAElement = FakeUIAElement(fakeNode)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUIA) and other._node is self._node
+
+    def __hash__(self):
+        return hash(id(self._node))
+
+    @property
+    def name(self):
+        ROUND_TRIPS.hit("name")
+        return self._node.name
+
+    @property
+    def description(self):
+        return ""
+
+    @property
+    def role(self):
+        ROUND_TRIPS.hit("role")
+        return CONTROL_TYPE_TO_ROLE.get(self._node.controlType, Role.UNKNOWN)
+
+    @property
+    def UIAAutomationId(self):
+        ROUND_TRIPS.hit("UIAAutomationId")
+        return self._node.automationId
+
+    @property
+    def location(self):
+        ROUND_TRIPS.hit("location")
+        left, top, right, bottom = self._node.rect
+        return types.SimpleNamespace(left=left, top=top, width=right - left, height=bottom - top)
+
+    @property
+    def windowHandle(self):
+        return 0x1234
+
+    @property
+    def children(self):
+        ROUND_TRIPS.hit("children", max(1, len(self._node.children)))
+        return [wrap(child) for child in self._node.children]
+
+    @property
+    def parent(self):
+        ROUND_TRIPS.hit("parent")
+        return wrap(self._node.parent) if self._node.parent else None
+
+    def _sibling(self, offset):
+        parentNode = self._node.parent
+        if not parentNode:
+            return None
+        index = parentNode.children.index(self._node) + offset
+        if 0 <= index < len(parentNode.children):
+            return wrap(parentNode.children[index])
+        return None
+
+    @property
+    def previous(self):
+        ROUND_TRIPS.hit("previous")
+        return self._sibling(-1)
+
+    @property
+    def next(self):
+        ROUND_TRIPS.hit("next")
+        return self._sibling(1)
+
+    def doAction(self):
+        ROUND_TRIPS.hit("doAction")
+        if self._node.toggleState is not None:
+            self._node.toggleState = 1 - self._node.toggleState
+
+    def setFocus(self):
+        pass
+
+
+def wrap(fakeNode, cls=None):
+    """Crée un NVDAObject factice (ou une instance d'overlay) pour le noeud."""
+    return (cls or FakeUIA)(fakeNode)
+
+
+# ============================================================================
+# MODULES NVDA FACTICES
+# ============================================================================
+
+class _FakeLog:
+    def __init__(self):
+        self.records = []
+
+    def _record(self, level, msg, *args, **kwargs):
+        self.records.append((level, msg))
+
+    def info(self, msg, *args, **kwargs):
+        self._record("info", msg)
+
+    def debug(self, msg, *args, **kwargs):
+        self._record("debug", msg)
+
+    def warning(self, msg, *args, **kwargs):
+        self._record("warning", msg)
+
+    def error(self, msg, *args, **kwargs):
+        self._record("error", msg)
+
+    def debugWarning(self, msg, *args, **kwargs):
+        self._record("debugWarning", msg)
+
+
+SPOKEN = []
+FOREGROUND = {"obj": None}
+
+
+class FakeCallLater:
+    """wx.CallLater factice : les minuteurs ne se déclenchent jamais seuls ; fire() les exécute."""
+
+    pending = []
+
+    def __init__(self, delay, func, *args, **kwargs):
+        self.delay = delay
+        self._call = (func, args, kwargs)
+        self.running = True
+        FakeCallLater.pending.append(self)
+
+    def Stop(self):
+        self.running = False
+
+    def Restart(self, delay=None):
+        self.running = True
+        if self not in FakeCallLater.pending:
+            FakeCallLater.pending.append(self)
+
+    def IsRunning(self):
+        return self.running
+
+    def fire(self):
+        self.running = False
+        if self in FakeCallLater.pending:
+            FakeCallLater.pending.remove(self)
+        func, args, kwargs = self._call
+        return func(*args, **kwargs)
+
+
+class FakeConfig(dict):
+    """config.conf : sections créées à l'enregistrement de leur spec, valeurs par défaut comprises."""
+
+    def __init__(self):
+        super().__init__()
+        self.spec = _FakeSpec(self)
+
+
+class _FakeSpec(dict):
+    def __init__(self, conf):
+        super().__init__()
+        self._conf = conf
+
+    def __setitem__(self, section, spec):
+        super().__setitem__(section, spec)
+        defaults = {}
+        for key, value in spec.items():
+            if value.startswith("boolean(default="):
+                defaults[key] = value[len("boolean(default="):-1] == "True"
+        self._conf.setdefault(section, defaults)
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Installe les modules NVDA factices dans sys.modules et rend le module importable."""
+    if "logHandler" in sys.modules and getattr(sys.modules["logHandler"], "_fake", False):
+        return
+
+    _module("logHandler", log=_FakeLog(), _fake=True)
+
+    class AppModule:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def chooseNVDAObjectOverlayClasses(self, obj, clsList):
+            pass
+
+        def getScript(self, gesture):
+            # Geste factice : nom du script ("toggleVPN" -> script_toggleVPN)
+            return getattr(self, f"script_{gesture}", None)
+
+        def terminate(self):
+            pass
+
+    _module(
+        "appModuleHandler",
+        AppModule=AppModule,
+        registerExecutableWithAppModule=lambda exe, mod: None,
+        unregisterExecutable=lambda exe: None,
+    )
+    _module("controlTypes", Role=Role)
+    nvdaObjects = _module("NVDAObjects", NVDAObject=FakeUIA)
+    nvdaObjects.UIA = _module("NVDAObjects.UIA", UIA=FakeUIA)
+    _module("ui", message=lambda text, *args, **kwargs: SPOKEN.append(text))
+    _module("api", getForegroundObject=lambda: FOREGROUND["obj"], getFocusObject=lambda: FOREGROUND["obj"])
+    _module("speech")
+    _module("addonHandler", initTranslation=lambda: None, getCodeAddon=lambda: None)
+    _module("config", conf=FakeConfig())
+    _module("languageHandler", getLanguage=lambda: LANGUAGE["code"])
+    _module(
+        "UIAHandler",
+        handler=types.SimpleNamespace(clientObject=FakeUIAClient(), baseCacheRequest=FakeCacheRequest()),
+        UIA_NamePropertyId=30005,
+        UIA_ControlTypePropertyId=30003,
+        UIA_AutomationIdPropertyId=30011,
+        UIA_FrameworkIdPropertyId=30024,
+        UIA_BoundingRectanglePropertyId=30001,
+        UIA_RuntimeIdPropertyId=30000,
+        UIA_ToggleToggleStatePropertyId=30086,
+        UIA_InvokePatternId=10000,
+        TreeScope_Element=TREE_SCOPE_ELEMENT,
+        TreeScope_Children=TREE_SCOPE_CHILDREN,
+        TreeScope_Descendants=TREE_SCOPE_DESCENDANTS,
+        TreeScope_Subtree=TREE_SCOPE_SUBTREE,
+        AutomationElementMode_None=0,
+        AutomationElementMode_Full=1,
+        IUIAutomationStructureChangedEventHandler=object,
+        IUIAutomationPropertyChangedEventHandler=object,
+    )
+    # Handlers COM des événements : objets Python appelés par raise_name_changed
+    _module("comtypes", COMObject=object)
+    _module(
+        "wx",
+        CallAfter=lambda func, *args, **kwargs: func(*args, **kwargs),
+        CallLater=FakeCallLater,
+    )
+
+    appModulesDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addon", "appModules")
+    if appModulesDir not in sys.path:
+        sys.path.insert(0, appModulesDir)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Instantanés d'arbre UIA ProtonVPN : chargement, écriture et génération synthétique.
+
+Le format est celui produit dans NVDA par le script saveTreeSnapshot du module
+d'application (Ctrl+Shift+Alt+U) :
+
+    {
+        "format": "protonvpn-uia-snapshot",
+        "version": 1,
+        "captured": "2026-01-01T12:00:00",
+        "root": {"name": ..., "controlType": ..., "automationId": ..., "frameworkId": ...,
+                 "rect": [left, top, right, bottom], "children": [...]}
+    }
+
+Les arbres chargés sont des fake_nvda.FakeNode : le module s'exécute dessus sans modification.
+"""
+
+import json
+import os
+import random
+
+from fake_nvda import (
+    CONTROL_TYPE_BUTTON,
+    CONTROL_TYPE_GROUP,
+    CONTROL_TYPE_PANE,
+    CONTROL_TYPE_TEXT,
+    CONTROL_TYPE_WINDOW,
+    FakeNode,
+    button,
+    node,
+    text,
+)
+
+SNAPSHOT_FORMAT = "protonvpn-uia-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+
+# ============================================================================
+# LECTURE / ECRITURE
+# ============================================================================
+
+def node_from_dict(data):
+    rect = data.get("rect") or (0, 0, 0, 0)
+    return FakeNode(
+        data.get("name") or "",
+        data.get("controlType"),
+        data.get("automationId") or "",
+        frameworkId=data.get("frameworkId") or "",
+        rect=tuple(rect),
+        children=[node_from_dict(child) for child in data.get("children", ())],
+    )
+
+
+def node_to_dict(fakeNode):
+    return {
+        "name": fakeNode.name,
+        "controlType": fakeNode.controlType,
+        "automationId": fakeNode.automationId,
+        "frameworkId": fakeNode.frameworkId,
+        "rect": list(fakeNode.rect),
+        "children": [node_to_dict(child) for child in fakeNode.children],
+    }
+
+
+def load_snapshot(path):
+    """Charge un fichier d'instantané et retourne la racine FakeNode."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != SNAPSHOT_FORMAT or data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: unsupported snapshot format")
+    return node_from_dict(data["root"])
+
+
+def save_snapshot(root, path, captured="synthetic"):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "captured": captured,
+            "root": node_to_dict(root),
+        }, f, ensure_ascii=False, indent=1)
+
+
+def recorded_snapshots():
+    """Retourne [(nom, racine)] pour chaque fichier de benchmarks/snapshots/."""
+    result = []
+    if os.path.isdir(SNAPSHOTS_DIR):
+        for filename in sorted(os.listdir(SNAPSHOTS_DIR)):
+            if filename.endswith(".json"):
+                result.append((filename[:-5], load_snapshot(os.path.join(SNAPSHOTS_DIR, filename))))
+    return result
+
+
+def count_nodes(root):
+    return sum(1 for _ in root.iter_subtree())
+
+
+# ============================================================================
+# TABLEAU DE BORD SYNTHETIQUE
+# ============================================================================
+
+def _info_button(label, values, rect, automationId=""):
+    return button(automationId=automationId, rect=rect, children=[
+        node(controlType=CONTROL_TYPE_GROUP, rect=rect, children=[
+            text(label, rect=rect),
+            node(rect=rect, children=[text(value, rect=rect) for value in values]),
+        ]),
+    ])
+
+
+def build_dashboard(connected=False):
+    """Fenêtre ProtonVPN reconstituée à partir de la structure ciblée par les détecteurs."""
+    content = node(name="Contenu", automationId="ContentFrame")
+    window = node(name="Proton VPN", controlType=CONTROL_TYPE_WINDOW, rect=(0, 0, 1920, 1400), children=[
+        node(automationId="TitleBar", children=[button("", "TitleBarMenuButton", rect=(0, 0, 40, 40))]),
+        content,
+    ])
+
+    card = content.append(node(automationId="ConnectionCard", children=[
+        text("Connecté" if connected else "Vous n'êtes pas protégé"),
+    ]))
+    if connected:
+        card.append(button("Déconnecter", "ConnectionCardDisconnectButton", rect=(400, 300, 700, 360)))
+        content.append(node(automationId="ConnectionDetailsPage", children=[node(children=[
+            _info_button("Adresse IP du VPN", ["37.19.199.137"], (400, 1000, 800, 1100), "ShowIpFlyoutButton"),
+            _info_button("Trafic total", ["12,4 Mo"], (800, 1000, 1200, 1100), "ShowVolumeFlyoutButton"),
+            _info_button("Trafic actuel", ["416 o/s", "0 o/s"], (1200, 1000, 1600, 1100), "E"),
+        ])]))
+    else:
+        card.append(button("Connecter", "ConnectionCardConnectButton", rect=(400, 300, 700, 360)))
+        content.append(node(automationId="LocationDetailsPage", children=[node(children=[
+            _info_button("Votre adresse IP", ["203.0.113.42"], (400, 1000, 800, 1100)),
+            _info_button("Pays", ["France"], (800, 1000, 1200, 1100)),
+            _info_button("Fournisseur", ["Orange"], (1200, 1000, 1600, 1100)),
+        ])]))
+
+    content.append(node(automationId="WidgetsColumn", children=[
+        button("", "WidgetButton", rect=(1700, 100, 1900, 180)),
+        button("", "WidgetButton", rect=(1700, 300, 1900, 380)),
+        button("", "WidgetButton", rect=(1700, 500, 1900, 580)),
+        button("", "PortForwardingWidgetButton", rect=(1700, 700, 1900, 780)),
+        button("", "SettingsButton", rect=(1700, 900, 1900, 980)),
+    ]))
+
+    content.append(node(name="Offre gratuite", children=[node(children=[
+        button(children=[node(children=[
+            text("VPN Plus"),
+            text("Accédez à plus de 110 pays"),
+            text("Vitesses jusqu'à 10 Gbit/s"),
+        ])]),
+    ])]))
+
+    content.append(node(automationId="OverlayMessage", children=[node(children=[
+        button(children=[node(children=[
+            text("Passez à VPN Plus"),
+            text("Débloquez le streaming"),
+            text("Profitez de NetShield"),
+        ])]),
+    ])]))
+    return window
+
+
+def build_synthetic_tree(total_nodes, connected=False, seed=1, max_depth=12):
+    """
+    Tableau de bord + conteneurs, textes et boutons de remplissage jusqu'à total_nodes noeuds.
+    Le remplissage reste sous max_depth pour que les parcours (profondeur 15) le visitent.
+    """
+    rng = random.Random(seed)
+    window = build_dashboard(connected)
+    content = window.children[1]
+    containers = [(content, 2)]
+    count = count_nodes(window)
+    while count < total_nodes:
+        parent, depth = containers[rng.randrange(len(containers))]
+        kind = rng.random()
+        if kind < 0.45 and depth < max_depth:
+            child = parent.append(node(controlType=rng.choice((CONTROL_TYPE_PANE, CONTROL_TYPE_GROUP))))
+            containers.append((child, depth + 1))
+        elif kind < 0.85:
+            parent.append(text(f"Texte {count}"))
+        else:
+            parent.append(button("" if rng.random() < 0.3 else f"Action {count}"))
+        count += 1
+    return window
+
+
+def find_nodes(root, predicate):
+    return [candidate for candidate in root.iter_subtree() if predicate(candidate)]
+
+
+def is_button(fakeNode):
+    return fakeNode.controlType == CONTROL_TYPE_BUTTON
+
+
+def is_text(fakeNode):
+    return fakeNode.controlType == CONTROL_TYPE_TEXT
+
+
+if __name__ == "__main__":
+    # Régénère les instantanés de référence de benchmarks/snapshots/
+    os.makedirs(SNAPSHOTS_DIR, exist_ok=True)
+    save_snapshot(build_dashboard(False), os.path.join(SNAPSHOTS_DIR, "dashboard_disconnected.json"))
+    save_snapshot(build_dashboard(True), os.path.join(SNAPSHOTS_DIR, "dashboard_connected.json"))
@@ -38,6 +38,7 @@ Projet communautaire non affilié à Proton AG.""",
 # Fichiers source Python à inclure
 pythonSources = [
     "addon/appModules/*.py",
+    "addon/appModules/*/*.py",
 ]
 
 # Fichiers à traduire